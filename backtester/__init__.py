@@ -2,8 +2,9 @@
 
 from .backtest import Backtester
 from .config import BacktestConfig
+from .frame import CandleFrame
 
-__all__ = ["Backtester", "BacktestConfig", "fetch_candles"]
+__all__ = ["Backtester", "BacktestConfig", "CandleFrame", "fetch_candles"]
 
 
 def fetch_candles(*args, **kwargs):
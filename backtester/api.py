@@ -2,20 +2,93 @@
 from __future__ import annotations
 
 import logging
+import time
 from datetime import datetime
-from typing import Iterable, List
+from typing import Iterator, List, Tuple
 
-import requests
-
-from .models import Candle
+from .fetcher import DERIBIT_API_URL, ChartDataFetcher, default_fetcher
+from .frame import CandleFrame
+from .singleflight import default_single_flight
+from .store import CandleStore, Columns, default_store, merge_ranges, normalize_columns
+from .timeutils import resolution_to_ms, to_epoch_ms
 
 LOGGER = logging.getLogger(__name__)
 
-DERIBIT_API_URL = "https://www.deribit.com/api/v2/public/get_tradingview_chart_data"
+__all__ = ["BASE_RESOLUTION", "DERIBIT_API_URL", "fetch_candles", "iter_candle_pages"]
+
+# Finest resolution Deribit offers; every other resolution can be aggregated from it.
+BASE_RESOLUTION = "1"
+
+
+def _download(
+    instrument_name: str,
+    resolution: str,
+    start_ms: int | None,
+    end_ms: int | None,
+) -> Columns:
+    fetcher = default_fetcher()
+    if start_ms is not None and end_ms is not None:
+        # Concurrent requests for overlapping ranges share one download per range.
+        return default_single_flight().fetch(
+            (instrument_name, resolution),
+            start_ms,
+            end_ms,
+            lambda lo, hi: fetcher.fetch(instrument_name, resolution, lo, hi),
+        )
+    return normalize_columns(fetcher.fetch_window(instrument_name, resolution, start_ms, end_ms))
 
 
-def _to_datetime(timestamp_ms: int) -> datetime:
-    return datetime.utcfromtimestamp(timestamp_ms / 1000)
+def _fetch_through_store(
+    store: CandleStore,
+    instrument_name: str,
+    resolution: str,
+    start_ms: int,
+    end_ms: int,
+) -> Columns:
+    # Only closed buckets are marked as covered; the bar that is still forming
+    # is stored but will be downloaded again on the next request.
+    bucket_ms = resolution_to_ms(resolution)
+    closed_until = int(time.time() * 1000) // bucket_ms * bucket_ms
+    for gap_start, gap_end in store.missing_ranges(instrument_name, resolution, start_ms, end_ms):
+        LOGGER.debug("Candle store miss for %s/%s [%s, %s)", instrument_name, resolution, gap_start, gap_end)
+        columns = _download(instrument_name, resolution, gap_start, gap_end)
+        covered_end = min(gap_end, closed_until)
+        store.write(
+            instrument_name,
+            resolution,
+            columns,
+            covered=(gap_start, covered_end) if covered_end > gap_start else None,
+        )
+    return store.read(instrument_name, resolution, start_ms, end_ms)
+
+
+def _derive_from_base(
+    store: CandleStore,
+    instrument_name: str,
+    resolution: str,
+    start_ms: int,
+    end_ms: int,
+) -> CandleFrame | None:
+    """Aggregate the requested candles from stored base candles, if the store covers them.
+
+    Buckets are aligned to the epoch like Deribit's, so the candles with
+    ``start_ms <= tick < end_ms`` need the base candles of ``[first, last)``
+    bucket boundaries inside the range.  Returns ``None`` when any of those
+    base candles is missing or still forming.
+    """
+
+    bucket_ms = resolution_to_ms(resolution)
+    if resolution == BASE_RESOLUTION or bucket_ms % resolution_to_ms(BASE_RESOLUTION):
+        return None
+    first_bucket = -(-start_ms // bucket_ms) * bucket_ms
+    last_bucket_end = -(-end_ms // bucket_ms) * bucket_ms
+    if first_bucket >= last_bucket_end:
+        return None
+    if store.missing_ranges(instrument_name, BASE_RESOLUTION, first_bucket, last_bucket_end):
+        return None
+    LOGGER.debug("Deriving %s/%s candles from %s-minute candles", instrument_name, resolution, BASE_RESOLUTION)
+    base = CandleFrame.from_columns(store.read(instrument_name, BASE_RESOLUTION, first_bucket, last_bucket_end))
+    return base.resample(bucket_ms).between(start_ms, end_ms)
 
 
 def fetch_candles(
@@ -23,58 +96,114 @@ def fetch_candles(
     resolution: str,
     start: datetime | None = None,
     end: datetime | None = None,
-) -> List[Candle]:
+    *,
+    store: CandleStore | None = None,
+    use_store: bool = True,
+) -> CandleFrame:
     """Fetch candles from the Deribit TradingView chart API.
 
+    When both *start* and *end* are given the local :class:`CandleStore` is
+    consulted first.  Coarser resolutions whose range is fully covered by
+    stored 1-minute candles are aggregated from those without any download;
+    otherwise only the sub-ranges the store does not cover yet are downloaded
+    and merged in.  Bounded ranges are split into API-sized windows and
+    downloaded concurrently by the shared :class:`ChartDataFetcher`.
+
     Args:
         instrument_name: Spot instrument identifier.
         resolution: Candle resolution (Deribit-compatible string).
         start: Optional inclusive UTC datetime for the first candle.
         end: Optional exclusive UTC datetime for the final candle.
+        store: Candle store to use instead of :func:`default_store`.
+        use_store: Set to ``False`` to always download from the API.
 
     Returns:
-        A list of :class:`Candle` instances ordered by timestamp.
+        A :class:`CandleFrame` ordered by timestamp.  Iterating it yields
+        :class:`Candle` rows.
     """
 
-    params = {
-        "instrument_name": instrument_name,
-        "resolution": resolution,
-    }
-    if start is not None:
-        params["start_timestamp"] = int(start.timestamp() * 1000)
-    if end is not None:
-        params["end_timestamp"] = int(end.timestamp() * 1000)
-
-    LOGGER.debug("Fetching candles with params %s", params)
-    response = requests.get(DERIBIT_API_URL, params=params, timeout=10)
-    response.raise_for_status()
-    payload = response.json()
-    if payload.get("result") is None:
-        raise ValueError(f"Unexpected API response: {payload}")
-
-    result = payload["result"]
-    timestamps = result.get("ticks") or []
-
-    def safe_iter(values: Iterable | None) -> Iterable:
-        return values or []
-
-    candles: List[Candle] = []
-    for ts, o, h, l, c, v in zip(
-        timestamps,
-        safe_iter(result.get("open")),
-        safe_iter(result.get("high")),
-        safe_iter(result.get("low")),
-        safe_iter(result.get("close")),
-        safe_iter(result.get("volume")),
-    ):
-        candle = Candle(
-            timestamp=_to_datetime(ts),
-            open=float(o),
-            high=float(h),
-            low=float(l),
-            close=float(c),
-            volume=float(v),
-        )
-        candles.append(candle)
+    start_ms = to_epoch_ms(start) if start is not None else None
+    end_ms = to_epoch_ms(end) if end is not None else None
+
+    if use_store and start_ms is not None and end_ms is not None:
+        store = store if store is not None else default_store()
+        if store is not None:
+            derived = _derive_from_base(store, instrument_name, resolution, start_ms, end_ms)
+            if derived is not None:
+                return derived
+            return CandleFrame.from_columns(
+                _fetch_through_store(store, instrument_name, resolution, start_ms, end_ms)
+            )
+
+    return CandleFrame.from_columns(_download(instrument_name, resolution, start_ms, end_ms))
+
+
+def iter_candle_pages(
+    instrument_name: str,
+    resolution: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    *,
+    store: CandleStore | None = None,
+    use_store: bool = True,
+) -> Iterator[CandleFrame]:
+    """Yield the candles of :func:`fetch_candles` as consecutive pages in tick order.
+
+    Bounded ranges are split into the fetcher's API-sized windows.  Windows
+    the local store already covers are read from disk, and the others are
+    downloaded a few at a time ahead of the consumer and merged into the
+    store, so the first page is available long before the whole range is.
+    Unbounded requests yield a single page.
+    """
 
-    return candles
+    if start is None or end is None:
+        yield fetch_candles(instrument_name, resolution, start, end, store=store, use_store=use_store)
+        return
+
+    start_ms = to_epoch_ms(start)
+    end_ms = to_epoch_ms(end)
+    store = (store if store is not None else default_store()) if use_store else None
+    if store is not None:
+        derived = _derive_from_base(store, instrument_name, resolution, start_ms, end_ms)
+        if derived is not None:
+            yield derived
+            return
+    bucket_ms = resolution_to_ms(resolution)
+    closed_until = int(time.time() * 1000) // bucket_ms * bucket_ms
+
+    fetcher = default_fetcher()
+    windows = fetcher.windows(resolution, start_ms, end_ms)
+    missing = [
+        window
+        for window in windows
+        if store is None or store.missing_ranges(instrument_name, resolution, *window)
+    ]
+    downloads = _iter_downloads(fetcher, instrument_name, resolution, missing)
+    to_download = set(missing)
+    for lo, hi in windows:
+        if (lo, hi) in to_download:
+            _, _, columns = next(downloads)
+            if store is not None:
+                covered_end = min(hi, closed_until)
+                store.write(
+                    instrument_name,
+                    resolution,
+                    columns,
+                    covered=(lo, covered_end) if covered_end > lo else None,
+                )
+            page = CandleFrame.from_columns(columns).between(lo, hi)
+        else:
+            page = CandleFrame.from_columns(store.read(instrument_name, resolution, lo, hi))  # type: ignore[union-attr]
+        if len(page):
+            yield page
+
+
+def _iter_downloads(
+    fetcher: ChartDataFetcher,
+    instrument_name: str,
+    resolution: str,
+    windows: List[Tuple[int, int]],
+) -> Iterator[Tuple[int, int, Columns]]:
+    # Windows are contiguous runs of the fetcher's own split, so each run is re-split identically.
+    for lo, hi in merge_ranges(windows):
+        yield from fetcher.iter_windows(instrument_name, resolution, lo, hi)
@@ -1,51 +1,140 @@
 """Backtesting engine for Deribit spot candles."""
 from __future__ import annotations
 
+import heapq
 import math
-from typing import Iterable, List
+from dataclasses import replace
+from typing import Iterable, List, Tuple
+
+import numpy as np
 
 from .config import BacktestConfig
+from .frame import CandleFrame, as_frame
+from .indicators import IndicatorCache, default_indicator_cache
+from .intrabar import IntrabarResolver, find_intrabar_exit
+from .ledger import TRADE_DTYPE, TradeLedger
 from .models import BacktestReport, Candle, Position, TradeResult
-from .strategy import crossover, simple_moving_average
+from .positions import PositionBook, first_level_hit
+from .strategy import RollingMean, crossover, crossover_mask
+from .timeutils import Timestamp
+
+ENGINES = ("loop", "vectorized")
+TIMESTAMP_MODES = ("datetime", "epoch")
+
+# Positions opened by the vectorized engine, in the order of its entry tuples.
+_ENTRY_DTYPE = np.dtype(
+    [
+        ("exit_index", np.int64),
+        ("entry_index", np.int64),
+        ("entry_price", np.float64),
+        ("take_profit", np.float64),
+        ("stop_loss", np.float64),
+        ("exit_price", np.float64),
+    ]
+)
+
+
+def _find_exit(closes: np.ndarray, entry_index: int, take_profit: float, stop_loss: float) -> int:
+    """Return the bar at which a position opened at *entry_index* is closed.
+
+    Positions are closed at the first later close that reaches either level,
+    or on the final bar.  A position opened on the final bar is never closed,
+    which is reported as ``len(closes)``.
+    """
+
+    size = closes.shape[0]
+    index = first_level_hit(closes, closes, entry_index + 1, take_profit, stop_loss)
+    if index < size:
+        return index
+    return size - 1 if entry_index < size - 1 else size
 
 
 class Backtester:
-    """Run a moving-average crossover backtest on Deribit candles."""
+    """Run a moving-average crossover backtest on Deribit candles.
 
-    def __init__(self, config: BacktestConfig):
+    Two engines produce identical reports: ``"loop"`` walks the candles one
+    bar at a time, while ``"vectorized"`` derives entry signals with array
+    operations and locates each position's exit with an array search.
+
+    For live or paper trading, :meth:`step` feeds one candle at a time into an
+    incremental engine and :meth:`snapshot` reports the result so far, matching
+    what :meth:`run` returns for the same sequence.  :meth:`feed` advances it
+    by a whole page of candles and :meth:`run_pages` backtests a sequence of
+    pages, such as one still being downloaded.
+
+    With ``timestamps="epoch"`` positions record integer epoch milliseconds
+    instead of :class:`~datetime.datetime` objects, which avoids building a
+    datetime per trade when the caller only serializes or aggregates them.
+    :meth:`step` always keeps the timestamps of the candles it is given.
+
+    Passing an :class:`~backtester.intrabar.IntrabarResolver` as *intrabar*
+    makes :meth:`run` exit positions when a bar's high or low reaches their
+    take-profit or stop-loss, filled at that level, and drill down into finer
+    candles for bars that reach both.  Both engines then use the vectorized
+    exit search.
+    """
+
+    def __init__(
+        self,
+        config: BacktestConfig,
+        engine: str = "loop",
+        indicator_cache: IndicatorCache | None = None,
+        timestamps: str = "datetime",
+        intrabar: IntrabarResolver | None = None,
+    ):
+        if engine not in ENGINES:
+            raise ValueError(f"engine must be one of {', '.join(ENGINES)}")
+        if timestamps not in TIMESTAMP_MODES:
+            raise ValueError(f"timestamps must be one of {', '.join(TIMESTAMP_MODES)}")
         self.config = config
         self.config.validate()
+        self.engine = engine
+        self.timestamps = timestamps
+        self.intrabar = intrabar
+        self.indicators = indicator_cache if indicator_cache is not None else default_indicator_cache()
+        self.reset()
+
+    def _moving_averages(self, frame: CandleFrame) -> Tuple[np.ndarray, np.ndarray]:
+        return (
+            self.indicators.sma(frame.close, self.config.short_window),
+            self.indicators.sma(frame.close, self.config.long_window),
+        )
+
+    def run(self, candles: Iterable[Candle] | CandleFrame) -> BacktestReport:
+        frame = as_frame(candles)
+        if self.engine == "vectorized" or self.intrabar is not None:
+            return self._run_vectorized(frame)
+        return self._run_loop(frame)
 
-    def run(self, candles: Iterable[Candle]) -> BacktestReport:
+    def _run_loop(self, frame: CandleFrame) -> BacktestReport:
         cash = self.config.initial_cash
-        open_positions: List[Position] = []
-        trades: List[TradeResult] = []
+        book = PositionBook()
+        trades = TradeLedger(epoch=self.timestamps == "epoch")
 
-        candles_list = list(candles)
-        closing_prices = [candle.close for candle in candles_list]
+        closing_prices = frame.close.tolist()
         if not closing_prices:
-            return BacktestReport(trades=[], final_cash=cash, wins=0, losses=0)
-
-        short_ma = simple_moving_average(closing_prices, self.config.short_window)
-        long_ma = simple_moving_average(closing_prices, self.config.long_window)
-
-        for index, candle in enumerate(candles_list):
-            # Update stops and exit positions.
-            for position in list(open_positions):
-                target_profit = position.take_profit
-                stop_price = position.stop_loss
-                current_price = candle.close
-
-                take_hit = target_profit is not None and current_price >= target_profit
-                stop_hit = stop_price is not None and current_price <= stop_price
-                if take_hit or stop_hit or index == len(candles_list) - 1:
-                    # close position at current price
-                    position.exit_price = current_price
-                    position.exit_time = candle.timestamp
-                    open_positions.remove(position)
-                    profit = (position.exit_price - position.entry_price) * position.size
-                    trades.append(TradeResult(position=position, profit=profit))
-                    cash += profit
+            return BacktestReport(trades=trades, final_cash=cash)
+
+        ticks = frame.ticks.tolist()
+        short_series, long_series = self._moving_averages(frame)
+        short_ma = short_series.tolist()
+        long_ma = long_series.tolist()
+
+        last_index = len(closing_prices) - 1
+        for index, current_price in enumerate(closing_prices):
+            # Exit positions whose stop or target was hit, or everything on the final bar.
+            exiting = book.pop_all() if index == last_index else book.pop_triggered(current_price)
+            for _, position in exiting:
+                # close position at current price; the book's positions carry epoch-ms entry times
+                cash += trades.append(
+                    position.entry_time,  # type: ignore[arg-type]
+                    ticks[index],
+                    position.entry_price,
+                    current_price,
+                    position.size,
+                    position.stop_loss,
+                    position.take_profit,
+                )
 
             # Evaluate new entries (skip until we have both MAs for current candle)
             if index == 0 or math.isnan(short_ma[index]) or math.isnan(long_ma[index]):
@@ -55,7 +144,7 @@ class Backtester:
             if math.isnan(short_ma[previous_index]) or math.isnan(long_ma[previous_index]):
                 continue
 
-            if len(open_positions) >= self.config.max_open_positions:
+            if len(book) >= self.config.max_open_positions:
                 continue
 
             if crossover(
@@ -64,15 +153,214 @@ class Backtester:
                 current_short=short_ma[index],
                 current_long=long_ma[index],
             ):
-                entry_price = candle.close
+                entry_price = current_price
                 position = Position(
                     entry_price=entry_price,
-                    entry_time=candle.timestamp,
+                    entry_time=ticks[index],
                     size=1.0,
                     take_profit=entry_price * (1 + self.config.take_profit),
                     stop_loss=entry_price * (1 - self.config.stop_loss),
                 )
-                open_positions.append(position)
+                book.add(position)
+
+        stats = trades.stats()
+        return BacktestReport(trades=trades, final_cash=cash, wins=stats.wins, losses=stats.losses)
+
+    def _run_vectorized(self, frame: CandleFrame) -> BacktestReport:
+        cash = self.config.initial_cash
+        closes = frame.close
+        if closes.shape[0] == 0:
+            return BacktestReport(trades=TradeLedger(epoch=self.timestamps == "epoch"), final_cash=cash)
+
+        short_ma, long_ma = self._moving_averages(frame)
+        signals = np.flatnonzero(crossover_mask(short_ma, long_ma))
+
+        # Only the signal bars need a Python-level step: exits of earlier
+        # positions free their slot before entries are evaluated on a bar.
+        open_exits: List[int] = []
+        entries: List[Tuple[int, int, float, float, float, float]] = []
+        for index in signals.tolist():
+            while open_exits and open_exits[0] <= index:
+                heapq.heappop(open_exits)
+            if len(open_exits) >= self.config.max_open_positions:
+                continue
+            entry_price = float(closes[index])
+            take_profit = entry_price * (1 + self.config.take_profit)
+            stop_loss = entry_price * (1 - self.config.stop_loss)
+            if self.intrabar is not None:
+                exit_index, exit_price = find_intrabar_exit(frame, index, take_profit, stop_loss, self.intrabar)
+            else:
+                exit_index = _find_exit(closes, index, take_profit, stop_loss)
+                exit_price = float(closes[exit_index]) if exit_index < closes.shape[0] else math.nan
+            heapq.heappush(open_exits, exit_index)
+            entries.append((exit_index, index, entry_price, take_profit, stop_loss, exit_price))
+
+        # Positions exiting on the same bar are closed in the order they were opened.
+        entries.sort()
+        records = np.array(entries, dtype=_ENTRY_DTYPE)
+        records = records[records["exit_index"] < closes.shape[0]]
+        ledger = np.empty(records.shape[0], dtype=TRADE_DTYPE)
+        ledger["entry_tick"] = frame.ticks[records["entry_index"]]
+        ledger["exit_tick"] = frame.ticks[records["exit_index"]]
+        for name in ("entry_price", "exit_price", "stop_loss", "take_profit"):
+            ledger[name] = records[name]
+        ledger["size"] = 1.0
+        ledger["profit"] = (ledger["exit_price"] - ledger["entry_price"]) * ledger["size"]
+        trades = TradeLedger.from_records(ledger, epoch=self.timestamps == "epoch")
+
+        # Accumulated in order, exactly like adding each trade's profit to the cash.
+        cash = float(np.cumsum(np.concatenate(([cash], ledger["profit"])))[-1])
+        stats = trades.stats()
+        return BacktestReport(trades=trades, final_cash=cash, wins=stats.wins, losses=stats.losses)
+
+    def reset(self) -> None:
+        """Discard the incremental state used by :meth:`step`."""
+
+        self._short_mean = RollingMean(self.config.short_window)
+        self._long_mean = RollingMean(self.config.long_window)
+        self._previous_ma = (math.nan, math.nan)
+        self._bars = 0
+        self._cash = self.config.initial_cash
+        self._book = PositionBook()
+        self._trades: List[TradeResult] = []
+        self._last_candle: Candle | None = None
+        # State at the start of the latest bar, needed to report that bar as final.
+        self._bar_start_cash = self._cash
+        self._bar_start_trades = 0
+        self._bar_closed: List[Tuple[int, Position]] = []
+        self._bar_opened: int | None = None
+
+    @property
+    def open_positions(self) -> List[Position]:
+        """Positions currently held by the incremental engine."""
+
+        return list(self._book)
+
+    def step(self, candle: Candle) -> List[TradeResult]:
+        """Advance the incremental engine by one candle.
+
+        Moving averages are updated in O(1) and positions, cash and trades are
+        kept between calls.
+
+        Returns:
+            The trades closed on this candle.
+        """
+
+        short_ma = self._short_mean.update(candle.close)
+        long_ma = self._long_mean.update(candle.close)
+        closed = self._advance(candle.close, candle.timestamp, short_ma, long_ma)
+        self._last_candle = candle
+        return closed
+
+    def feed(self, candles: Iterable[Candle] | CandleFrame) -> List[TradeResult]:
+        """Advance the incremental engine by a whole page of candles.
+
+        Equivalent to calling :meth:`step` for each candle, but the moving
+        averages of the page are computed in one vectorized pass and no
+        :class:`Candle` objects are built.  Timestamps follow the engine's
+        ``timestamps`` mode.
+
+        Returns:
+            The trades closed on the page.
+        """
+
+        frame = as_frame(candles)
+        if not len(frame):
+            return []
+        short_ma = self._short_mean.update_many(frame.close).tolist()
+        long_ma = self._long_mean.update_many(frame.close).tolist()
+        epoch = self.timestamps == "epoch"
+        timestamps = frame.ticks.tolist() if epoch else frame.ticks.astype("datetime64[ms]").tolist()
+        closed: List[TradeResult] = []
+        for price, timestamp, short, long in zip(frame.close.tolist(), timestamps, short_ma, long_ma):
+            closed.extend(self._advance(price, timestamp, short, long))
+        self._last_candle = frame.row(len(frame) - 1, epoch)
+        return closed
+
+    def run_pages(self, pages: Iterable[Iterable[Candle] | CandleFrame]) -> BacktestReport:
+        """Backtest candles that arrive as consecutive pages.
+
+        Each page is fed through the incremental engine as soon as it is
+        available, so a page source that downloads in the background
+        overlaps fetching with computing.  The report matches :meth:`run` on
+        the concatenated candles.
+        """
+
+        self.reset()
+        for page in pages:
+            self.feed(page)
+        return self.snapshot()
+
+    def _advance(
+        self,
+        current_price: float,
+        timestamp: Timestamp,
+        short_ma: float,
+        long_ma: float,
+    ) -> List[TradeResult]:
+        self._bar_start_cash = self._cash
+        self._bar_start_trades = len(self._trades)
+        self._bar_opened = None
+        self._bar_closed = self._book.pop_triggered(current_price)
+
+        closed: List[TradeResult] = []
+        for _, position in self._bar_closed:
+            position.exit_price = current_price
+            position.exit_time = timestamp
+            profit = (position.exit_price - position.entry_price) * position.size
+            trade = TradeResult(position=position, profit=profit)
+            self._trades.append(trade)
+            closed.append(trade)
+            self._cash += profit
+
+        previous_short, previous_long = self._previous_ma
+        self._previous_ma = (short_ma, long_ma)
+        index = self._bars
+        self._bars += 1
+
+        if index == 0 or math.isnan(short_ma) or math.isnan(long_ma):
+            return closed
+        if math.isnan(previous_short) or math.isnan(previous_long):
+            return closed
+        if len(self._book) >= self.config.max_open_positions:
+            return closed
+
+        if crossover(
+            previous_short=previous_short,
+            previous_long=previous_long,
+            current_short=short_ma,
+            current_long=long_ma,
+        ):
+            self._bar_opened = self._book.add(
+                Position(
+                    entry_price=current_price,
+                    entry_time=timestamp,
+                    size=1.0,
+                    take_profit=current_price * (1 + self.config.take_profit),
+                    stop_loss=current_price * (1 - self.config.stop_loss),
+                )
+            )
+        return closed
+
+    def snapshot(self) -> BacktestReport:
+        """Report the incremental run as if the latest candle were the last one.
+
+        Like :meth:`run`, every position that was open going into the latest
+        candle is closed at its close; the live state is left untouched.
+        """
+
+        last = self._last_candle
+        if last is None:
+            return BacktestReport(trades=[], final_cash=self._cash, wins=0, losses=0)
+
+        trades = self._trades[: self._bar_start_trades]
+        cash = self._bar_start_cash
+        still_open = [entry for entry in self._book.items() if entry[0] != self._bar_opened]
+        for _, position in heapq.merge(self._bar_closed, still_open):
+            closed = replace(position, exit_price=last.close, exit_time=last.timestamp)
+            profit = (closed.exit_price - closed.entry_price) * closed.size
+            trades.append(TradeResult(position=closed, profit=profit))
+            cash += profit
 
         wins = sum(1 for trade in trades if trade.profit > 0)
         losses = sum(1 for trade in trades if trade.profit <= 0)
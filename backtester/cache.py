@@ -0,0 +1,128 @@
+"""Content-addressed cache for HTTP API responses.
+
+Identical backtest requests are keyed by a digest of the normalized
+:class:`~backtester.config.BacktestConfig` and of the candle data, so the
+same key always denotes the same report and doubles as the response ETag.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Callable, Generic, Hashable, Tuple, TypeVar
+
+import numpy as np
+
+from .config import BacktestConfig
+from .frame import CandleFrame
+from .timeutils import to_epoch_ms
+
+V = TypeVar("V")
+
+DEFAULT_MAX_ENTRIES = 128
+DEFAULT_TTL = 3600.0
+
+
+class ResultCache(Generic[V]):
+    """Thread-safe LRU cache whose entries also expire after *ttl* seconds."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl: float = DEFAULT_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be greater than zero")
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: V) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return to_epoch_ms(value)
+    return value
+
+
+def config_fingerprint(config: BacktestConfig) -> str:
+    """Digest the fields of *config* that affect a backtest's result."""
+
+    fields = {name: _normalize(value) for name, value in asdict(config).items()}
+    # Numeric fields compare by value, so ``0.03`` and ``3e-2`` or ``1000`` and
+    # ``1000.0`` hash the same.
+    for name in ("initial_cash", "take_profit", "stop_loss"):
+        fields[name] = float(fields[name])
+    encoded = json.dumps(fields, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def frame_fingerprint(frame: CandleFrame) -> str:
+    """Digest the candle columns of *frame*."""
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(len(frame).to_bytes(8, "little"))
+    for column in frame.columns().values():
+        digest.update(np.ascontiguousarray(column).data)
+    return digest.hexdigest()
+
+
+def make_etag(*parts: str) -> str:
+    """Return a strong ETag derived from the given fingerprints."""
+
+    digest = hashlib.blake2b("/".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Evaluate an ``If-None-Match`` header against *etag* (weak comparison)."""
+
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
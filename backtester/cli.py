@@ -4,12 +4,24 @@ from __future__ import annotations
 import argparse
 import json
 import logging
+import sys
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List
 
-from .api import fetch_candles
-from .backtest import Backtester
+from .api import fetch_candles, iter_candle_pages
+from .backtest import ENGINES, Backtester
 from .config import BacktestConfig
+from .frame import CandleFrame
+from .intrabar import IntrabarResolver, deribit_fine_fetcher
+from .metrics import PhaseTimer
+from .montecarlo import METHODS as MONTE_CARLO_METHODS
+from .montecarlo import simulate
+from .pipeline import PrefetchedPages
+from .portfolio import PortfolioBacktester, fetch_portfolio
+from .store import CandleStore
+from .sweep import RANK_KEYS, Leaderboard, run_sweep
+from .timeutils import format_timestamp, resolution_to_ms
+from .walkforward import run_walk_forward
 
 LOGGER = logging.getLogger(__name__)
 
@@ -28,13 +40,99 @@ def parse_datetime(value: str | None) -> datetime | None:
         ) from exc
 
 
-def create_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(description="Deribit spot backtester")
-    parser.add_argument("instrument", help="Deribit instrument name, e.g. BTC_USDC")
+def parse_values(value: str, kind: type = float) -> List[Any]:
+    """Parse ``"5,9,13"`` or an inclusive ``"start:stop:step"`` range into a list."""
+
+    try:
+        if ":" in value:
+            start, stop, step = (kind(part) for part in value.split(":"))
+            if step <= 0:
+                raise ValueError("step must be positive")
+            count = int((stop - start) / step + 1e-9) + 1
+            return [kind(round(start + index * step, 10)) for index in range(max(0, count))]
+        return [kind(part) for part in value.split(",") if part.strip()]
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"Invalid value list '{value}'") from exc
+
+
+def parse_int_values(value: str) -> List[int]:
+    return parse_values(value, int)
+
+
+def parse_instruments(value: str) -> List[str]:
+    instruments = [part.strip() for part in value.split(",") if part.strip()]
+    if not instruments:
+        raise argparse.ArgumentTypeError("At least one instrument is required")
+    return instruments
+
+
+def _add_data_arguments(parser: argparse.ArgumentParser, portfolio: bool = False) -> None:
+    if portfolio:
+        parser.add_argument("instruments", type=parse_instruments, help="Instrument names, e.g. BTC_USDC,ETH_USDC")
+    else:
+        parser.add_argument("instrument", help="Deribit instrument name, e.g. BTC_USDC")
     parser.add_argument("resolution", help="Candle resolution (1, 5, 60, etc.)")
     parser.add_argument("start", nargs="?", type=parse_datetime, help="Start timestamp UTC")
     parser.add_argument("end", nargs="?", type=parse_datetime, help="End timestamp UTC")
     parser.add_argument("--initial-cash", type=float, default=1000.0, help="Initial balance")
+    parser.add_argument("--verbose", action="store_true", help="Enable debug logging")
+    parser.add_argument(
+        "--candle-store",
+        type=str,
+        default=None,
+        help="Directory for the local candle store (defaults to $BACKTESTER_CANDLE_STORE or ~/.cache)",
+    )
+    parser.add_argument(
+        "--no-candle-store",
+        action="store_true",
+        help="Always download candles instead of reading them from the local store",
+    )
+
+
+def _fetch_for_config(args: argparse.Namespace, config: BacktestConfig) -> CandleFrame:
+    return fetch_candles(
+        instrument_name=config.instrument_name,
+        resolution=config.interval,
+        start=config.start,
+        end=config.end,
+        store=CandleStore(args.candle_store) if args.candle_store else None,
+        use_store=not args.no_candle_store,
+    )
+
+
+def _pages_for_config(args: argparse.Namespace, config: BacktestConfig) -> Iterator[CandleFrame]:
+    return iter_candle_pages(
+        config.instrument_name,
+        config.interval,
+        config.start,
+        config.end,
+        store=CandleStore(args.candle_store) if args.candle_store else None,
+        use_store=not args.no_candle_store,
+    )
+
+
+def _fetch_portfolio_for_config(args: argparse.Namespace, config: BacktestConfig) -> Dict[str, CandleFrame]:
+    return fetch_portfolio(
+        args.instruments,
+        config.interval,
+        config.start,
+        config.end,
+        store=CandleStore(args.candle_store) if args.candle_store else None,
+        use_store=not args.no_candle_store,
+    )
+
+
+def _intrabar_resolver(args: argparse.Namespace, config: BacktestConfig) -> IntrabarResolver:
+    fetch = deribit_fine_fetcher(
+        config.instrument_name,
+        args.intrabar_resolution,
+        store=CandleStore(args.candle_store) if args.candle_store else None,
+        use_store=not args.no_candle_store,
+    )
+    return IntrabarResolver(fetch, resolution_to_ms(config.interval))
+
+
+def _add_strategy_arguments(parser: argparse.ArgumentParser) -> None:
     parser.add_argument(
         "--max-open-positions",
         type=int,
@@ -45,16 +143,159 @@ def create_parser() -> argparse.ArgumentParser:
     parser.add_argument("--stop-loss", type=float, default=0.02, help="Stop loss as decimal")
     parser.add_argument("--short-window", type=int, default=9, help="Fast moving average window")
     parser.add_argument("--long-window", type=int, default=21, help="Slow moving average window")
-    parser.add_argument("--verbose", action="store_true", help="Enable debug logging")
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Deribit spot backtester")
+    _add_data_arguments(parser)
+    _add_strategy_arguments(parser)
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="loop",
+        help="Backtest engine: bar-by-bar loop or vectorized array search",
+    )
     parser.add_argument(
         "--export-trades",
         type=str,
         default=None,
         help="Optional path to write executed trades as JSON",
     )
+    parser.add_argument(
+        "--intrabar",
+        action="store_true",
+        help="Exit on bar highs/lows and fetch finer candles for bars that reach both levels",
+    )
+    parser.add_argument(
+        "--intrabar-resolution",
+        default="1",
+        help="Resolution of the candles fetched to resolve ambiguous bars",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Backtest each page of candles while the following pages are still downloading",
+    )
+    parser.add_argument("--timings", action="store_true", help="Include per-phase timings in milliseconds")
+    parser.add_argument(
+        "--monte-carlo",
+        type=int,
+        default=0,
+        metavar="ITERATIONS",
+        help="Resample the trades this many times and report the spread of outcomes",
+    )
+    parser.add_argument(
+        "--monte-carlo-method",
+        choices=MONTE_CARLO_METHODS,
+        default="bootstrap",
+        help="Draw trades with replacement (bootstrap) or only reorder them (shuffle)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the Monte Carlo resamples")
     return parser
 
 
+def create_portfolio_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="backtester portfolio",
+        description="Backtest several instruments sharing one cash balance and position limit",
+    )
+    _add_data_arguments(parser, portfolio=True)
+    _add_strategy_arguments(parser)
+    parser.add_argument("--workers", type=int, default=None, help="Threads computing per-instrument signals")
+    parser.add_argument(
+        "--export-equity",
+        type=str,
+        default=None,
+        help="Optional path to write the equity curve as JSON",
+    )
+    return parser
+
+
+def _add_grid_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--short-window",
+        type=parse_int_values,
+        default=[9],
+        help="Fast MA windows, e.g. 5,9 or 5:30:5",
+    )
+    parser.add_argument(
+        "--long-window",
+        type=parse_int_values,
+        default=[21],
+        help="Slow MA windows, e.g. 21 or 20:60:10",
+    )
+    parser.add_argument("--take-profit", type=parse_values, default=[0.03], help="Take profit targets as decimals")
+    parser.add_argument("--stop-loss", type=parse_values, default=[0.02], help="Stop losses as decimals")
+    parser.add_argument(
+        "--max-open-positions",
+        type=parse_int_values,
+        default=[1],
+        help="Maximum simultaneous long positions",
+    )
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (defaults to CPU count)")
+    parser.add_argument("--engine", choices=ENGINES, default="vectorized", help="Backtest engine per run")
+    parser.add_argument("--rank-by", choices=RANK_KEYS, default="final_cash", help="Metric used for ranking")
+    parser.add_argument(
+        "--export-results",
+        type=str,
+        default=None,
+        help="Optional path to write every result as JSON",
+    )
+
+
+def create_sweep_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="backtester sweep",
+        description="Backtest every combination of the given parameter values in parallel",
+    )
+    _add_data_arguments(parser)
+    _add_grid_arguments(parser)
+    parser.add_argument("--top", type=int, default=10, help="Number of best results to report")
+    return parser
+
+
+def create_walkforward_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="backtester walkforward",
+        description="Optimize the given parameter values on rolling in-sample windows and test them out of sample",
+    )
+    _add_data_arguments(parser)
+    _add_grid_arguments(parser)
+    parser.add_argument("--folds", type=int, default=5, help="Number of out-of-sample windows")
+    parser.add_argument(
+        "--in-sample-ratio",
+        type=float,
+        default=0.7,
+        help="Share of each fold used for optimization",
+    )
+    parser.add_argument(
+        "--anchored",
+        action="store_true",
+        help="Grow every in-sample window from the first candle instead of rolling it",
+    )
+    return parser
+
+
+def _base_config_from_args(args: argparse.Namespace) -> BacktestConfig:
+    return BacktestConfig(
+        instrument_name=args.instrument,
+        interval=args.resolution,
+        start=args.start,
+        end=args.end,
+        initial_cash=args.initial_cash,
+    )
+
+
+def _grid_from_args(args: argparse.Namespace) -> Dict[str, List[Any]]:
+    return {
+        "short_window": args.short_window,
+        "long_window": args.long_window,
+        "take_profit": args.take_profit,
+        "stop_loss": args.stop_loss,
+        "max_open_positions": args.max_open_positions,
+    }
+
+
 def run_from_args(args: argparse.Namespace) -> Dict[str, Any]:
     config = BacktestConfig(
         instrument_name=args.instrument,
@@ -69,15 +310,18 @@ def run_from_args(args: argparse.Namespace) -> Dict[str, Any]:
         long_window=args.long_window,
     )
 
-    backtester = Backtester(config)
-    candles = fetch_candles(
-        instrument_name=config.instrument_name,
-        resolution=config.interval,
-        start=config.start,
-        end=config.end,
-    )
-
-    report = backtester.run(candles)
+    resolver = _intrabar_resolver(args, config) if args.intrabar else None
+    backtester = Backtester(config, engine=args.engine, timestamps="epoch", intrabar=resolver)
+    timer = PhaseTimer()
+    if args.pipeline:
+        # Downloads and the backtest overlap, so they are timed together.
+        with timer.phase("pipeline"), PrefetchedPages(_pages_for_config(args, config)) as pages:
+            report = backtester.run_pages(pages)
+    else:
+        with timer.phase("fetch"):
+            candles = _fetch_for_config(args, config)
+        with timer.phase("backtest"):
+            report = backtester.run(candles)
     summary = {
         "instrument": config.instrument_name,
         "interval": config.interval,
@@ -86,18 +330,28 @@ def run_from_args(args: argparse.Namespace) -> Dict[str, Any]:
         "losses": report.losses,
         "win_rate": report.win_rate,
         "cumulative_profit": report.cumulative_profit,
+        "profit_factor": report.profit_factor,
+        "average_trade": report.average_trade,
         "final_cash": report.final_cash,
     }
+    if resolver is not None:
+        summary["intrabar"] = resolver.stats()
+    if args.monte_carlo:
+        with timer.phase("simulate"):
+            result = simulate(report, iterations=args.monte_carlo, method=args.monte_carlo_method, seed=args.seed)
+        summary["monte_carlo"] = result.to_dict()
+    if args.timings:
+        summary["timings"] = timer.as_milliseconds()
 
     if args.export_trades:
         with open(args.export_trades, "w", encoding="utf-8") as handle:
             json.dump(
                 [
                     {
-                        "entry_time": trade.position.entry_time.isoformat(),
+                        "entry_time": format_timestamp(trade.position.entry_time),
                         "entry_price": trade.position.entry_price,
-                        "exit_time": trade.position.exit_time.isoformat()
-                        if trade.position.exit_time
+                        "exit_time": format_timestamp(trade.position.exit_time)
+                        if trade.position.exit_time is not None
                         else None,
                         "exit_price": trade.position.exit_price,
                         "profit": trade.profit,
@@ -111,9 +365,132 @@ def run_from_args(args: argparse.Namespace) -> Dict[str, Any]:
     return summary
 
 
+def portfolio_from_args(args: argparse.Namespace) -> Dict[str, Any]:
+    config = BacktestConfig(
+        interval=args.resolution,
+        start=args.start,
+        end=args.end,
+        initial_cash=args.initial_cash,
+        max_open_positions=args.max_open_positions,
+        take_profit=args.take_profit,
+        stop_loss=args.stop_loss,
+        short_window=args.short_window,
+        long_window=args.long_window,
+    )
+    backtester = PortfolioBacktester(config, workers=args.workers, timestamps="epoch")
+    report = backtester.run(_fetch_portfolio_for_config(args, config))
+
+    summary = {
+        "instruments": args.instruments,
+        "interval": config.interval,
+        "total_trades": report.total_trades,
+        "wins": report.wins,
+        "losses": report.losses,
+        "win_rate": report.win_rate,
+        "cumulative_profit": report.cumulative_profit,
+        "final_cash": report.final_cash,
+        "max_equity": float(report.equity.max()) if report.equity.size else report.final_cash,
+        "min_equity": float(report.equity.min()) if report.equity.size else report.final_cash,
+        "by_instrument": report.by_instrument(),
+    }
+
+    if args.export_equity:
+        with open(args.export_equity, "w", encoding="utf-8") as handle:
+            json.dump(
+                [
+                    {"timestamp": format_timestamp(tick), "equity": equity}
+                    for tick, equity in zip(report.ticks.tolist(), report.equity.tolist())
+                ],
+                handle,
+                indent=2,
+            )
+
+    return summary
+
+
+def sweep_from_args(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    base_config = _base_config_from_args(args)
+    grid = _grid_from_args(args)
+    candles = _fetch_for_config(args, base_config)
+
+    leaderboard = Leaderboard(key=args.rank_by)
+    for result in run_sweep(candles, base_config, grid, processes=args.processes, engine=args.engine):
+        rank = leaderboard.add(result)
+        LOGGER.info(
+            "#%d/%d %s final_cash=%.2f win_rate=%.3f profit=%.2f",
+            rank,
+            len(leaderboard),
+            result.parameters,
+            result.final_cash,
+            result.win_rate,
+            result.cumulative_profit,
+        )
+
+    if args.export_results:
+        with open(args.export_results, "w", encoding="utf-8") as handle:
+            json.dump([result.to_dict() for result in leaderboard.top()], handle, indent=2)
+
+    return [result.to_dict() for result in leaderboard.top(args.top)]
+
+
+def walkforward_from_args(args: argparse.Namespace) -> Dict[str, Any]:
+    base_config = _base_config_from_args(args)
+    candles = _fetch_for_config(args, base_config)
+
+    report = run_walk_forward(
+        candles,
+        base_config,
+        _grid_from_args(args),
+        folds=args.folds,
+        in_sample_ratio=args.in_sample_ratio,
+        anchored=args.anchored,
+        rank_by=args.rank_by,
+        processes=args.processes,
+        engine=args.engine,
+    )
+    for fold in report.folds:
+        LOGGER.info(
+            "fold %d: %s in-sample %s=%.4f out-of-sample final_cash=%.2f profit=%.2f",
+            fold.index,
+            fold.parameters,
+            args.rank_by,
+            getattr(fold.in_sample, args.rank_by),
+            fold.out_of_sample.final_cash,
+            fold.out_of_sample.cumulative_profit,
+        )
+
+    result = report.to_dict()
+    if args.export_results:
+        with open(args.export_results, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, indent=2)
+    return result
+
+
 def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "sweep":
+        args = create_sweep_parser().parse_args(argv[1:])
+        logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+        for rank, result in enumerate(sweep_from_args(args), start=1):
+            LOGGER.info("top %d: %s", rank, result)
+        return
+    if argv and argv[0] == "portfolio":
+        args = create_portfolio_parser().parse_args(argv[1:])
+        logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+        for key, value in portfolio_from_args(args).items():
+            LOGGER.info("%s: %s", key, value)
+        return
+    if argv and argv[0] == "walkforward":
+        args = create_walkforward_parser().parse_args(argv[1:])
+        logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+        for key, value in walkforward_from_args(args)["aggregate"].items():
+            LOGGER.info("%s: %s", key, value)
+        return
+
     parser = create_parser()
     args = parser.parse_args(argv)
+    if args.pipeline and args.intrabar:
+        parser.error("--pipeline cannot be combined with --intrabar")
 
     logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
 
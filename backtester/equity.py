@@ -0,0 +1,189 @@
+"""Per-bar equity curve, drawdown analytics and chart downsampling.
+
+:func:`equity_curve` rebuilds a run's marked-to-market equity on every bar
+from its trades with cumulative sums, so no per-bar Python loop is needed.
+:func:`lttb_indices` picks the points of a long series that best preserve
+its visual shape (Largest-Triangle-Three-Buckets), which keeps chart
+payloads small however long the history is.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, replace
+from typing import Iterable
+
+import numpy as np
+
+from .frame import CandleFrame, as_frame
+from .ledger import TradeLedger
+from .models import BacktestReport, Candle
+from .timeutils import to_epoch_ms
+
+# Crypto markets trade around the clock.
+MS_PER_YEAR = 365 * 24 * 60 * 60 * 1000
+
+
+@dataclass
+class EquityCurve:
+    """Equity and drawdown on each bar, with metrics of the full series.
+
+    ``drawdown`` is the fall from the running equity peak as a fraction of
+    that peak, ``exposure`` the share of bars with at least one open
+    position and ``sharpe`` the annualized Sharpe ratio of the per-bar
+    returns (``None`` when they do not vary).  A :meth:`downsample`d curve
+    keeps the metrics of the full one.
+    """
+
+    ticks: np.ndarray
+    equity: np.ndarray
+    drawdown: np.ndarray
+    max_drawdown: float
+    sharpe: float | None
+    exposure: float
+
+    def __len__(self) -> int:
+        return int(self.ticks.shape[0])
+
+    def downsample(self, max_points: int) -> "EquityCurve":
+        """Return at most *max_points* bars chosen by :func:`lttb_indices` on the equity."""
+
+        indices = lttb_indices(self.ticks, self.equity, max_points)
+        return replace(self, ticks=self.ticks[indices], equity=self.equity[indices], drawdown=self.drawdown[indices])
+
+
+def _trade_columns(trades: object) -> tuple[np.ndarray, ...]:
+    if isinstance(trades, TradeLedger):
+        records = trades.records
+        return (
+            records["entry_tick"],
+            records["exit_tick"],
+            records["entry_price"],
+            records["size"],
+            records["profit"],
+        )
+    rows = [
+        (
+            _tick(trade.position.entry_time),
+            _tick(trade.position.exit_time),
+            trade.position.entry_price,
+            trade.position.size,
+            trade.profit,
+        )
+        for trade in trades  # type: ignore[attr-defined]
+    ]
+    if not rows:
+        empty = np.empty(0)
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), empty, empty, empty
+    entry_ticks, exit_ticks, entry_prices, sizes, profits = zip(*rows)
+    return (
+        np.asarray(entry_ticks, dtype=np.int64),
+        np.asarray(exit_ticks, dtype=np.int64),
+        np.asarray(entry_prices, dtype=np.float64),
+        np.asarray(sizes, dtype=np.float64),
+        np.asarray(profits, dtype=np.float64),
+    )
+
+
+def _tick(timestamp: object) -> int:
+    return timestamp if isinstance(timestamp, int) else to_epoch_ms(timestamp)  # type: ignore[arg-type]
+
+
+def _sharpe(ticks: np.ndarray, equity: np.ndarray) -> float | None:
+    if equity.shape[0] < 3:
+        return None
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(equity) / equity[:-1]
+    returns = returns[np.isfinite(returns)]
+    if returns.shape[0] < 2:
+        return None
+    deviation = float(returns.std(ddof=1))
+    bar_ms = float(np.median(np.diff(ticks)))
+    if deviation == 0 or bar_ms <= 0:
+        return None
+    return float(returns.mean()) / deviation * math.sqrt(MS_PER_YEAR / bar_ms)
+
+
+def equity_curve(
+    candles: Iterable[Candle] | CandleFrame,
+    report: BacktestReport,
+    initial_cash: float,
+) -> EquityCurve:
+    """Mark the positions of *report* to market on every bar of *candles*.
+
+    A position counts from its entry bar up to, but excluding, its exit bar,
+    where its profit is realized.  The last value matches the report's
+    ``final_cash`` up to rounding.
+    """
+
+    frame = as_frame(candles)
+    size = len(frame)
+    entry_ticks, exit_ticks, entry_prices, sizes, profits = _trade_columns(report.trades)
+    entry_bars = np.searchsorted(frame.ticks, entry_ticks)
+    exit_bars = np.searchsorted(frame.ticks, exit_ticks)
+
+    units = np.zeros(size + 1)
+    cost = np.zeros(size + 1)
+    realized = np.zeros(size + 1)
+    np.add.at(units, entry_bars, sizes)
+    np.add.at(units, exit_bars, -sizes)
+    np.add.at(cost, entry_bars, sizes * entry_prices)
+    np.add.at(cost, exit_bars, -sizes * entry_prices)
+    np.add.at(realized, exit_bars, profits)
+    open_units = np.cumsum(units[:size])
+    equity = initial_cash + np.cumsum(realized[:size]) + open_units * frame.close - np.cumsum(cost[:size])
+
+    if size:
+        peaks = np.maximum.accumulate(equity)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawdown = np.where(peaks > 0, (peaks - equity) / peaks, 0.0)
+        max_drawdown = float(drawdown.max())
+        # Cumulative sums of opposite-signed sizes can leave rounding residue instead of exact zeros.
+        exposure = float(np.count_nonzero(open_units > 1e-12) / size)
+    else:
+        drawdown = np.empty(0)
+        max_drawdown = exposure = 0.0
+    return EquityCurve(
+        ticks=frame.ticks,
+        equity=equity,
+        drawdown=drawdown,
+        max_drawdown=max_drawdown,
+        sharpe=_sharpe(frame.ticks, equity),
+        exposure=exposure,
+    )
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """Return the indices of at most *max_points* points that preserve the shape of ``(x, y)``.
+
+    Largest-Triangle-Three-Buckets keeps the first and last points and, from
+    each of ``max_points - 2`` equal buckets in between, the point forming the
+    largest triangle with the point kept from the previous bucket and the
+    average of the next bucket.
+    """
+
+    if max_points < 3:
+        raise ValueError("max_points must be at least 3")
+    size = int(y.shape[0])
+    if size <= max_points:
+        return np.arange(size)
+
+    xs = np.asarray(x, dtype=np.float64) - float(x[0])
+    ys = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, size - 1, max_points - 1).astype(np.int64)
+    # The average of every bucket, plus the last point standing in for the bucket after the final one.
+    counts = np.diff(edges)
+    average_x = np.append(np.add.reduceat(xs[1:-1], edges[:-1] - 1) / counts, xs[-1])
+    average_y = np.append(np.add.reduceat(ys[1:-1], edges[:-1] - 1) / counts, ys[-1])
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = size - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        lo, hi = int(edges[bucket]), int(edges[bucket + 1])
+        ax, ay = xs[previous], ys[previous]
+        cx, cy = average_x[bucket + 1], average_y[bucket + 1]
+        areas = np.abs((ax - cx) * (ys[lo:hi] - ay) - (ax - xs[lo:hi]) * (cy - ay))
+        previous = lo + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
@@ -0,0 +1,308 @@
+"""Paginated, concurrent downloads from the Deribit chart data endpoint."""
+from __future__ import annotations
+
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Iterator, List, Tuple
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+from .metrics import UPSTREAM_LATENCY
+from .store import Columns, empty_columns, normalize_columns
+from .timeutils import resolution_to_ms
+
+LOGGER = logging.getLogger(__name__)
+
+DERIBIT_API_URL = "https://www.deribit.com/api/v2/public/get_tradingview_chart_data"
+
+# Deribit caps the number of candles returned by a single chart data request.
+MAX_CANDLES_PER_REQUEST = 5000
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# JSON-RPC error code Deribit uses when the request rate limit is exceeded.
+RATE_LIMIT_ERROR_CODE = 10028
+
+# Upper bound on requests a fetcher has open at once, across all of its callers.
+MAX_CONCURRENT_REQUESTS = 8
+
+
+class RetryableError(Exception):
+    """Raised for transient upstream failures that should be retried."""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Space out requests shared by several worker threads.
+
+    Besides the steady ``requests_per_second`` pacing, :meth:`defer` lets a
+    worker that received a rate-limit response hold back every other worker
+    until the server-provided back-off has elapsed.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self._interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = self._clock()
+            wait = max(0.0, self._next_slot - now)
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if wait > 0:
+            self._sleep(wait)
+
+    def defer(self, seconds: float) -> None:
+        with self._lock:
+            self._next_slot = max(self._next_slot, self._clock() + seconds)
+
+
+def _columns_from_result(result: Dict[str, object]) -> Columns:
+    columns = {"ticks": np.asarray(result.get("ticks") or [], dtype=np.int64)}
+    length = columns["ticks"].size
+    for name in ("open", "high", "low", "close", "volume"):
+        values = np.asarray(result.get(name) or [], dtype=np.float64)
+        length = min(length, values.size)
+        columns[name] = values
+    return {name: values[:length] for name, values in columns.items()}
+
+
+def _json_payload(response: requests.Response) -> object:
+    """Decode a JSON body, or return ``None`` for an empty or non-JSON one.
+
+    Error pages are often HTML; leaving them undecoded lets
+    ``raise_for_status`` report the HTTP status instead of a decoding error.
+    """
+
+    if not response.content:
+        return {}
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class ChartDataFetcher:
+    """Download chart data over a pooled session, one API-sized window at a time.
+
+    Long ranges are split into windows of at most ``window_candles`` bars that
+    are downloaded concurrently by up to ``max_workers`` threads, retried with
+    exponential back-off on transient failures and stitched back together in
+    tick order with duplicates removed.  However many threads call it, at most
+    ``max_concurrent_requests`` requests are open at a time.
+    """
+
+    def __init__(
+        self,
+        url: str = DERIBIT_API_URL,
+        *,
+        session: requests.Session | None = None,
+        max_workers: int = 4,
+        window_candles: int = MAX_CANDLES_PER_REQUEST,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        timeout: float = 30.0,
+        requests_per_second: float | None = None,
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if max_workers <= 0:
+            raise ValueError("max_workers must be greater than zero")
+        if max_concurrent_requests <= 0:
+            raise ValueError("max_concurrent_requests must be greater than zero")
+        if window_candles <= 0:
+            raise ValueError("window_candles must be greater than zero")
+        self.url = url
+        self.max_workers = max_workers
+        self.window_candles = window_candles
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self._sleep = sleep
+        self.max_concurrent_requests = max_concurrent_requests
+        self._rate_limiter = RateLimiter(requests_per_second, sleep=sleep)
+        self._slots = threading.BoundedSemaphore(max_concurrent_requests)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(max_workers, max_concurrent_requests))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+    def windows(self, resolution: str, start_ms: int, end_ms: int) -> List[Tuple[int, int]]:
+        """Split ``[start_ms, end_ms)`` into API-sized windows."""
+
+        span = self.window_candles * resolution_to_ms(resolution)
+        return [(lo, min(lo + span, end_ms)) for lo in range(start_ms, end_ms, span)]
+
+    def fetch(self, instrument_name: str, resolution: str, start_ms: int, end_ms: int) -> Columns:
+        """Download ``[start_ms, end_ms)`` and return de-duplicated columns in tick order."""
+
+        windows = self.windows(resolution, start_ms, end_ms)
+        if len(windows) <= 1 or self.max_workers == 1:
+            parts = [self.fetch_window(instrument_name, resolution, lo, hi) for lo, hi in windows]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(self.max_workers, len(windows)),
+                thread_name_prefix="candle-fetch",
+            ) as executor:
+                parts = list(
+                    executor.map(lambda window: self.fetch_window(instrument_name, resolution, *window), windows)
+                )
+        if not parts:
+            return empty_columns()
+        columns = normalize_columns({name: np.concatenate([part[name] for part in parts]) for name in parts[0]})
+        # Deribit also returns the candle at end_timestamp, which lies outside the range.
+        lo, hi = np.searchsorted(columns["ticks"], (start_ms, end_ms))
+        return {name: values[lo:hi] for name, values in columns.items()}
+
+    def iter_windows(
+        self,
+        instrument_name: str,
+        resolution: str,
+        start_ms: int,
+        end_ms: int,
+    ) -> Iterator[Tuple[int, int, Columns]]:
+        """Yield ``(window_start, window_end, columns)`` for each window of ``[start_ms, end_ms)`` in order.
+
+        Up to ``max_workers`` windows are downloaded ahead of the one being
+        consumed, so callers can process early windows while later ones are
+        still in flight without holding the whole range in memory.
+        """
+
+        windows = self.windows(resolution, start_ms, end_ms)
+        if not windows:
+            return
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(windows)),
+            thread_name_prefix="candle-fetch",
+        ) as executor:
+            pending: Deque[Tuple[int, int, Future[Columns]]] = deque()
+            upcoming = iter(windows)
+            try:
+                for lo, hi in itertools.islice(upcoming, self.max_workers):
+                    pending.append((lo, hi, executor.submit(self.fetch_window, instrument_name, resolution, lo, hi)))
+                while pending:
+                    lo, hi, future = pending.popleft()
+                    columns = future.result()
+                    for next_lo, next_hi in itertools.islice(upcoming, 1):
+                        pending.append(
+                            (
+                                next_lo,
+                                next_hi,
+                                executor.submit(self.fetch_window, instrument_name, resolution, next_lo, next_hi),
+                            )
+                        )
+                    yield lo, hi, normalize_columns(columns)
+            finally:
+                for _, _, future in pending:
+                    future.cancel()
+
+    def fetch_window(
+        self,
+        instrument_name: str,
+        resolution: str,
+        start_ms: int | None,
+        end_ms: int | None,
+    ) -> Columns:
+        """Download a single window, retrying transient failures."""
+
+        params: Dict[str, object] = {
+            "instrument_name": instrument_name,
+            "resolution": resolution,
+        }
+        if start_ms is not None:
+            params["start_timestamp"] = start_ms
+        if end_ms is not None:
+            params["end_timestamp"] = end_ms
+
+        attempt = 0
+        while True:
+            try:
+                return self._request(params)
+            except (RetryableError, requests.ConnectionError, requests.Timeout) as exc:
+                if attempt >= self.max_retries:
+                    raise
+                delay = min(self.max_backoff, self.backoff * (2**attempt))
+                retry_after = getattr(exc, "retry_after", None)
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+                    self._rate_limiter.defer(delay)
+                attempt += 1
+                LOGGER.warning("Retrying chart data request %s in %.2fs (%s)", params, delay, exc)
+                self._sleep(delay)
+
+    def _request(self, params: Dict[str, object]) -> Columns:
+        with self._slots:
+            self._rate_limiter.acquire()
+            return self._send(params)
+
+    def _send(self, params: Dict[str, object]) -> Columns:
+        LOGGER.debug("Fetching candles with params %s", params)
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = self.session.get(self.url, params=params, timeout=self.timeout)
+            if response.status_code in RETRY_STATUS_CODES:
+                outcome = "retryable"
+                raise RetryableError(
+                    f"HTTP {response.status_code} from chart data endpoint",
+                    retry_after=_parse_retry_after(response.headers.get("Retry-After")),
+                )
+            payload = _json_payload(response)
+            error = payload.get("error") if isinstance(payload, dict) else None
+            if isinstance(error, dict) and error.get("code") == RATE_LIMIT_ERROR_CODE:
+                outcome = "retryable"
+                raise RetryableError("Deribit rate limit exceeded", retry_after=self.backoff)
+            response.raise_for_status()
+            if not isinstance(payload, dict) or payload.get("result") is None:
+                raise ValueError(f"Unexpected API response: {payload}")
+            outcome = "ok"
+            return _columns_from_result(payload["result"])
+        finally:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - started, outcome=outcome)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_DEFAULT_FETCHER: ChartDataFetcher | None = None
+_DEFAULT_FETCHER_LOCK = threading.Lock()
+
+
+def default_fetcher() -> ChartDataFetcher:
+    """Return the process-wide fetcher so connections are pooled across calls."""
+
+    global _DEFAULT_FETCHER
+
+    with _DEFAULT_FETCHER_LOCK:
+        if _DEFAULT_FETCHER is None:
+            _DEFAULT_FETCHER = ChartDataFetcher()
+        return _DEFAULT_FETCHER
@@ -0,0 +1,172 @@
+"""Columnar candle container backed by NumPy arrays."""
+from __future__ import annotations
+
+from typing import Dict, Iterable, Iterator, List, overload
+
+import numpy as np
+
+from .models import Candle
+from .timeutils import Timestamp, from_epoch_ms, to_epoch_ms
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+class CandleFrame:
+    """Candles stored as one array per field instead of one object per bar.
+
+    Timestamps are kept as int64 epoch milliseconds (the Deribit ``ticks``)
+    and prices/volume as float64.  Slicing returns views onto the same
+    buffers, and indexing or iterating yields :class:`Candle` rows that are
+    only built when they are asked for.
+    """
+
+    __slots__ = ("ticks", "open", "high", "low", "close", "volume", "__weakref__")
+
+    def __init__(
+        self,
+        ticks: np.ndarray,
+        open: np.ndarray,  # noqa: A002 - mirrors the OHLCV field name
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+    ):
+        self.ticks = np.asarray(ticks, dtype=np.int64)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+        size = self.ticks.shape
+        for name in PRICE_COLUMNS:
+            if getattr(self, name).shape != size:
+                raise ValueError(f"Column '{name}' does not match the length of 'ticks'")
+
+    @classmethod
+    def empty(cls) -> "CandleFrame":
+        return cls.from_columns({"ticks": np.empty(0, dtype=np.int64)})
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray]) -> "CandleFrame":
+        """Build a frame from a mapping of column name to array."""
+
+        ticks = columns["ticks"]
+        size = len(ticks)
+        return cls(
+            ticks,
+            *(columns.get(name, np.zeros(size)) for name in PRICE_COLUMNS),
+        )
+
+    @classmethod
+    def from_candles(cls, candles: Iterable[Candle]) -> "CandleFrame":
+        """Build a frame from :class:`Candle` objects."""
+
+        rows = [
+            (to_epoch_ms(candle.timestamp), candle.open, candle.high, candle.low, candle.close, candle.volume)
+            for candle in candles
+        ]
+        if not rows:
+            return cls.empty()
+        ticks, opens, highs, lows, closes, volumes = zip(*rows)
+        return cls(ticks, opens, highs, lows, closes, volumes)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        return {
+            "ticks": self.ticks,
+            "open": self.open,
+            "high": self.high,
+            "low": self.low,
+            "close": self.close,
+            "volume": self.volume,
+        }
+
+    def __len__(self) -> int:
+        return int(self.ticks.shape[0])
+
+    @overload
+    def __getitem__(self, index: int) -> Candle: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "CandleFrame": ...
+
+    def __getitem__(self, index: int | slice) -> Candle | "CandleFrame":
+        if isinstance(index, slice):
+            return CandleFrame(*(column[index] for column in self.columns().values()))
+        return self.row(index)
+
+    def __iter__(self) -> Iterator[Candle]:
+        for index in range(len(self)):
+            yield self.row(index)
+
+    def __repr__(self) -> str:
+        if not len(self):
+            return "CandleFrame(0 candles)"
+        return f"CandleFrame({len(self)} candles, {self.timestamp_at(0)} .. {self.timestamp_at(-1)})"
+
+    def row(self, index: int, epoch: bool = False) -> Candle:
+        """Return the candle at *index* as a :class:`Candle`.
+
+        With *epoch* the timestamp is left as integer epoch milliseconds.
+        """
+
+        return Candle(
+            timestamp=self.timestamp_at(index, epoch),
+            open=float(self.open[index]),
+            high=float(self.high[index]),
+            low=float(self.low[index]),
+            close=float(self.close[index]),
+            volume=float(self.volume[index]),
+        )
+
+    def timestamp_at(self, index: int, epoch: bool = False) -> Timestamp:
+        if epoch:
+            return int(self.ticks[index])
+        return from_epoch_ms(self.ticks[index])
+
+    def rows(self, epoch: bool = False) -> Iterator[Candle]:
+        """Iterate the candles, optionally keeping epoch-millisecond timestamps."""
+
+        for index in range(len(self)):
+            yield self.row(index, epoch)
+
+    def between(self, start_ms: int | None = None, end_ms: int | None = None) -> "CandleFrame":
+        """Return a view of the candles with ``start_ms <= tick < end_ms``."""
+
+        lo = 0 if start_ms is None else int(np.searchsorted(self.ticks, start_ms, side="left"))
+        hi = len(self) if end_ms is None else int(np.searchsorted(self.ticks, end_ms, side="left"))
+        return self[lo:hi]
+
+    def resample(self, bucket_ms: int) -> "CandleFrame":
+        """Aggregate the candles into *bucket_ms* wide buckets aligned to the epoch.
+
+        Each bucket takes the first open, highest high, lowest low, last close
+        and total volume of its candles and is stamped with its start.  Empty
+        buckets are left out.  The candles must be sorted by tick.
+        """
+
+        if bucket_ms <= 0:
+            raise ValueError("bucket_ms must be greater than zero")
+        if not len(self):
+            return self
+        buckets = self.ticks // bucket_ms
+        starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+        ends = np.append(starts[1:], len(self)) - 1
+        return CandleFrame(
+            buckets[starts] * bucket_ms,
+            self.open[starts],
+            np.maximum.reduceat(self.high, starts),
+            np.minimum.reduceat(self.low, starts),
+            self.close[ends],
+            np.add.reduceat(self.volume, starts),
+        )
+
+    def to_candles(self) -> List[Candle]:
+        return list(self)
+
+
+def as_frame(candles: Iterable[Candle] | CandleFrame) -> CandleFrame:
+    """Return *candles* as a :class:`CandleFrame`, converting row objects if needed."""
+
+    if isinstance(candles, CandleFrame):
+        return candles
+    return CandleFrame.from_candles(candles)
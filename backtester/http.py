@@ -3,19 +3,80 @@ from __future__ import annotations
 
 import json
 import logging
+import math
+import os
+import threading
+import time
 from datetime import datetime
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
-from typing import Any, Dict, Iterable, List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Sequence, Tuple
 from urllib.parse import parse_qs, urlparse
 
+import numpy as np
+
 from .api import fetch_candles
 from .backtest import Backtester
+from .binary import CONTENT_TYPE as BINARY_CONTENT_TYPE
+from .binary import decode_candles
+from .cache import ResultCache, config_fingerprint, etag_matches, frame_fingerprint, make_etag
 from .config import BacktestConfig
-from .models import BacktestReport, Candle, Position, TradeResult
+from .equity import EquityCurve, equity_curve
+from .frame import CandleFrame, as_frame
+from .indicators import default_indicator_cache
+from .jobs import JobQueue, ProgressCallback, QueueFullError
+from .ledger import TradeLedger
+from .metrics import (
+    BARS_PROCESSED,
+    PROMETHEUS_CONTENT_TYPE,
+    REGISTRY,
+    REQUEST_LATENCY,
+    PhaseTimer,
+    record_phases,
+)
+from .models import BacktestReport, Candle, TradeResult
+from .montecarlo import METHODS as MONTE_CARLO_METHODS
+from .montecarlo import MonteCarloResult, simulate
+from .singleflight import default_single_flight
+from .streaming import (
+    JSON_CONTENT_TYPE,
+    NDJSON_CONTENT_TYPE,
+    ChunkedWriter,
+    iter_batches,
+    iter_json_document,
+    iter_ndjson,
+    negotiate_encoding,
+    wrap_document,
+)
+from .sweep import SWEEP_FIELDS, SweepResult
+from .timeutils import Timestamp, display_bucket_ms, format_iso_ms, format_timestamp, resolution_to_ms, to_epoch_ms
+from .walkforward import WalkForwardReport, run_walk_forward
 
 LOGGER = logging.getLogger(__name__)
 
+JOBS_PATH = "/api/backtest/jobs"
+METRICS_PATH = "/api/metrics"
+WALKFORWARD_PATH = "/api/walkforward"
+MONTECARLO_PATH = "/api/montecarlo"
+
+# Upper bound on ``iterations`` so one request cannot tie up the server indefinitely.
+MAX_MONTE_CARLO_ITERATIONS = 100_000
+
+# Walk-forward optimizations run on the request thread, each with its own process pool: bound how
+# many run at once and how many worker processes each may start.
+MAX_CONCURRENT_WALK_FORWARDS = 1
+MAX_WALK_FORWARD_PROCESSES = 4
+_WALK_FORWARD_SLOTS = threading.BoundedSemaphore(MAX_CONCURRENT_WALK_FORWARDS)
+
+# Upper bound on ``max_bars`` of an aggregated candle query.
+MAX_CANDLE_BARS = 20_000
+
+# Upper bound on ``maxPoints`` of a downsampled equity curve.
+MAX_EQUITY_POINTS = 10_000
+
+# ``timestampFormat`` values: ISO-8601 strings (the default) or epoch milliseconds.
+TIMESTAMP_FORMATS = ("iso", "epoch")
+
 CONFIG_FIELD_MAP = {
     "instrumentName": "instrument_name",
     "interval": "interval",
@@ -29,6 +90,11 @@ CONFIG_FIELD_MAP = {
     "longWindow": "long_window",
 }
 
+# Request field names of the parameters a walk-forward grid may vary, and of the ranking metrics.
+GRID_FIELD_MAP = {camel: field for camel, field in CONFIG_FIELD_MAP.items() if field in SWEEP_FIELDS}
+RANK_KEY_MAP = {"finalCash": "final_cash", "cumulativeProfit": "cumulative_profit", "winRate": "win_rate"}
+INTEGER_GRID_FIELDS = frozenset({"short_window", "long_window", "max_open_positions"})
+
 
 def _parse_datetime(value: str | None) -> datetime | None:
     if value in (None, "", "null"):
@@ -39,49 +105,156 @@ def _parse_datetime(value: str | None) -> datetime | None:
         raise ValueError(f"Invalid datetime '{value}'. Expected ISO-8601 format.") from exc
 
 
-def _serialize_datetime(value: datetime | None) -> str | None:
-    return value.isoformat() if value is not None else None
+def _serialize_datetime(value: Timestamp | None) -> str | None:
+    return format_timestamp(value) if value is not None else None
 
 
-def _serialize_candle(candle: Candle) -> Dict[str, Any]:
-    return {
-        "timestamp": candle.timestamp.isoformat(),
-        "open": candle.open,
-        "high": candle.high,
-        "low": candle.low,
-        "close": candle.close,
-        "volume": candle.volume,
-    }
+def _format_timestamps(values: Sequence[Timestamp | None], timestamp_format: str) -> List[str | int | None]:
+    """Format position times for a response, formatting epoch values in one vectorized pass."""
 
+    if timestamp_format == "epoch":
+        return [to_epoch_ms(value) if value is not None else None for value in values]
+    present = [index for index, value in enumerate(values) if value is not None]
+    if not all(isinstance(values[index], int) for index in present):
+        return [_serialize_datetime(value) for value in values]
+    formatted: List[str | int | None] = [None] * len(values)
+    for index, text in zip(present, format_iso_ms(np.array([values[index] for index in present], dtype=np.int64))):
+        formatted[index] = text
+    return formatted
 
-def _serialize_position(position: Position) -> Dict[str, Any]:
-    return {
-        "entryPrice": position.entry_price,
-        "entryTime": _serialize_datetime(position.entry_time),
-        "size": position.size,
-        "exitPrice": position.exit_price,
-        "exitTime": _serialize_datetime(position.exit_time),
-        "stopLoss": position.stop_loss,
-        "takeProfit": position.take_profit,
-    }
 
+def _parse_timestamp_format(value: Any) -> str:
+    if value in (None, ""):
+        return "iso"
+    if value not in TIMESTAMP_FORMATS:
+        raise _RequestError(
+            HTTPStatus.BAD_REQUEST,
+            f"timestampFormat must be one of {', '.join(TIMESTAMP_FORMATS)}",
+        )
+    return value
 
-def _serialize_trade(trade: TradeResult) -> Dict[str, Any]:
-    return {
-        "position": _serialize_position(trade.position),
-        "profit": trade.profit,
-    }
+
+def _parse_max_points(payload: Dict[str, Any]) -> int | None:
+    value = payload.get("maxPoints")
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or not 3 <= value <= MAX_EQUITY_POINTS:
+        raise _RequestError(HTTPStatus.BAD_REQUEST, f"maxPoints must be an integer between 3 and {MAX_EQUITY_POINTS}")
+    return value
+
+
+def _serialize_candles(candles: Iterable[Candle] | CandleFrame, timestamp_format: str = "iso") -> List[Dict[str, Any]]:
+    frame = as_frame(candles)
+    timestamps = frame.ticks.tolist() if timestamp_format == "epoch" else format_iso_ms(frame.ticks)
+    return [
+        {
+            "timestamp": timestamp,
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": volume,
+        }
+        for timestamp, open_, high, low, close, volume in zip(
+            timestamps,
+            frame.open.tolist(),
+            frame.high.tolist(),
+            frame.low.tolist(),
+            frame.close.tolist(),
+            frame.volume.tolist(),
+        )
+    ]
+
+
+def _optional_prices(values: np.ndarray) -> List[float | None]:
+    return [None if value != value else value for value in values.tolist()]
+
+
+def _serialize_trade_records(records: np.ndarray, timestamp_format: str = "iso") -> List[Dict[str, Any]]:
+    """Serialize :data:`~backtester.ledger.TRADE_DTYPE` rows straight from their columns."""
+
+    if timestamp_format == "epoch":
+        entry_times: List[Any] = records["entry_tick"].tolist()
+        exit_times: List[Any] = records["exit_tick"].tolist()
+    else:
+        entry_times = format_iso_ms(records["entry_tick"])
+        exit_times = format_iso_ms(records["exit_tick"])
+    return [
+        {
+            "position": {
+                "entryPrice": entry_price,
+                "entryTime": entry_time,
+                "size": size,
+                "exitPrice": exit_price,
+                "exitTime": exit_time,
+                "stopLoss": stop_loss,
+                "takeProfit": take_profit,
+            },
+            "profit": profit,
+        }
+        for entry_price, entry_time, size, exit_price, exit_time, stop_loss, take_profit, profit in zip(
+            records["entry_price"].tolist(),
+            entry_times,
+            records["size"].tolist(),
+            records["exit_price"].tolist(),
+            exit_times,
+            _optional_prices(records["stop_loss"]),
+            _optional_prices(records["take_profit"]),
+            records["profit"].tolist(),
+        )
+    ]
 
 
-def _serialize_report(report: BacktestReport) -> Dict[str, Any]:
+def _serialize_trades(trades: Sequence[TradeResult], timestamp_format: str = "iso") -> List[Dict[str, Any]]:
+    if isinstance(trades, TradeLedger):
+        return _serialize_trade_records(trades.records, timestamp_format)
+    # Sequences may build their items on access, so read them once.
+    trades = list(trades)
+    entry_times = _format_timestamps([trade.position.entry_time for trade in trades], timestamp_format)
+    exit_times = _format_timestamps([trade.position.exit_time for trade in trades], timestamp_format)
+    return [
+        {
+            "position": {
+                "entryPrice": trade.position.entry_price,
+                "entryTime": entry_time,
+                "size": trade.position.size,
+                "exitPrice": trade.position.exit_price,
+                "exitTime": exit_time,
+                "stopLoss": trade.position.stop_loss,
+                "takeProfit": trade.position.take_profit,
+            },
+            "profit": trade.profit,
+        }
+        for trade, entry_time, exit_time in zip(trades, entry_times, exit_times)
+    ]
+
+
+def _serialize_trade(trade: TradeResult, timestamp_format: str = "iso") -> Dict[str, Any]:
+    return _serialize_trades([trade], timestamp_format)[0]
+
+
+def _serialize_report(report: BacktestReport, timestamp_format: str = "iso") -> Dict[str, Any]:
     return {
-        "trades": [_serialize_trade(trade) for trade in report.trades],
+        "trades": _serialize_trades(report.trades, timestamp_format),
         "finalCash": report.final_cash,
         "wins": report.wins,
         "losses": report.losses,
     }
 
 
+def _serialize_equity(curve: EquityCurve, max_points: int, timestamp_format: str = "iso") -> Dict[str, Any]:
+    points = curve.downsample(max_points)
+    return {
+        "bars": len(curve),
+        "timestamps": points.ticks.tolist() if timestamp_format == "epoch" else format_iso_ms(points.ticks),
+        "equity": points.equity.tolist(),
+        "drawdown": points.drawdown.tolist(),
+        "maxDrawdown": curve.max_drawdown,
+        "sharpe": curve.sharpe,
+        "exposure": curve.exposure,
+    }
+
+
 def _config_from_payload(payload: Dict[str, Any]) -> BacktestConfig:
     kwargs: Dict[str, Any] = {}
     for camel, field in CONFIG_FIELD_MAP.items():
@@ -94,38 +267,97 @@ def _config_from_payload(payload: Dict[str, Any]) -> BacktestConfig:
     return BacktestConfig(**kwargs)
 
 
-def _candles_from_payload(items: Iterable[Dict[str, Any]]) -> List[Candle]:
-    candles: List[Candle] = []
+def _candles_from_payload(items: Iterable[Dict[str, Any]]) -> CandleFrame:
+    rows = []
     for item in items:
         try:
             timestamp = _parse_datetime(item.get("timestamp"))
             if timestamp is None:
                 raise ValueError("timestamp is required")
-            candle = Candle(
-                timestamp=timestamp,
-                open=float(item["open"]),
-                high=float(item["high"]),
-                low=float(item["low"]),
-                close=float(item["close"]),
-                volume=float(item["volume"]),
+            rows.append(
+                (
+                    to_epoch_ms(timestamp),
+                    float(item["open"]),
+                    float(item["high"]),
+                    float(item["low"]),
+                    float(item["close"]),
+                    float(item["volume"]),
+                )
             )
-        except (KeyError, TypeError, ValueError) as exc:
+        except (KeyError, TypeError, ValueError, AttributeError) as exc:
             raise ValueError(f"Invalid candle payload: {item}") from exc
-        candles.append(candle)
-    return candles
+    if not rows:
+        return CandleFrame.empty()
+    return CandleFrame(*zip(*rows))
 
 
-def get_candles_response(query: Dict[str, str]) -> Tuple[HTTPStatus, Dict[str, Any]]:
+class _RequestError(Exception):
+    """Carry an error response out of the request parsing helpers."""
+
+    def __init__(self, status: HTTPStatus, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def _candle_query(query: Dict[str, str]) -> Tuple[str, str, datetime | None, datetime | None]:
     instrument_name = query.get("instrument_name")
     resolution = query.get("resolution")
     if not instrument_name or not resolution:
-        return HTTPStatus.BAD_REQUEST, {"detail": "instrument_name and resolution are required"}
+        raise _RequestError(HTTPStatus.BAD_REQUEST, "instrument_name and resolution are required")
 
     start = _parse_datetime(query.get("start")) if query.get("start") else None
     end = _parse_datetime(query.get("end")) if query.get("end") else None
+    return instrument_name, resolution, start, end
+
+
+def _candle_view(query: Dict[str, str]) -> Tuple[int | None, int | None, int | None]:
+    """Parse the optional ``max_bars``, ``view_start`` and ``view_end`` of a candle query."""
 
+    max_bars = query.get("max_bars")
+    if max_bars:
+        if not max_bars.isdigit() or not 2 <= int(max_bars) <= MAX_CANDLE_BARS:
+            raise _RequestError(HTTPStatus.BAD_REQUEST, f"max_bars must be an integer between 2 and {MAX_CANDLE_BARS}")
     try:
-        candles = fetch_candles(
+        view_start = _parse_datetime(query.get("view_start"))
+        view_end = _parse_datetime(query.get("view_end"))
+    except ValueError as exc:
+        raise _RequestError(HTTPStatus.BAD_REQUEST, str(exc)) from exc
+    return (
+        int(max_bars) if max_bars else None,
+        to_epoch_ms(view_start) if view_start is not None else None,
+        to_epoch_ms(view_end) if view_end is not None else None,
+    )
+
+
+def _aggregate_view(
+    frame: CandleFrame,
+    resolution: str,
+    max_bars: int | None,
+    view_start: int | None,
+    view_end: int | None,
+) -> CandleFrame:
+    """Cut *frame* to the viewport and merge its candles into at most *max_bars* buckets."""
+
+    frame = frame.between(view_start, view_end)
+    if max_bars is None or len(frame) <= max_bars:
+        return frame
+    try:
+        base_ms = resolution_to_ms(resolution)
+    except ValueError as exc:
+        raise _RequestError(HTTPStatus.BAD_REQUEST, str(exc)) from exc
+    span_ms = int(frame.ticks[-1]) + base_ms - int(frame.ticks[0])
+    return frame.resample(display_bucket_ms(span_ms, base_ms, max_bars))
+
+
+def _fetch(
+    instrument_name: str,
+    resolution: str,
+    start: datetime | None,
+    end: datetime | None,
+) -> Iterable[Candle] | CandleFrame:
+    try:
+        return fetch_candles(
             instrument_name=instrument_name,
             resolution=resolution,
             start=start,
@@ -133,88 +365,826 @@ def get_candles_response(query: Dict[str, str]) -> Tuple[HTTPStatus, Dict[str, A
         )
     except Exception as exc:  # noqa: BLE001 - surface network errors cleanly
         LOGGER.exception("Failed to fetch candles", exc_info=exc)
-        return HTTPStatus.BAD_GATEWAY, {"detail": str(exc)}
+        raise _RequestError(HTTPStatus.BAD_GATEWAY, str(exc)) from exc
+
+
+def get_candles_response(query: Dict[str, str]) -> Tuple[HTTPStatus, Dict[str, Any]]:
+    try:
+        timestamp_format = _parse_timestamp_format(query.get("timestamp_format"))
+        instrument_name, resolution, start, end = _candle_query(query)
+        view = _candle_view(query)
+        candles = _fetch(instrument_name, resolution, start, end)
+        if view != (None, None, None):
+            candles = _aggregate_view(as_frame(candles), resolution, *view)
+    except _RequestError as exc:
+        return exc.status, {"detail": exc.detail}
 
-    return HTTPStatus.OK, {"candles": [_serialize_candle(candle) for candle in candles]}
+    return HTTPStatus.OK, {"candles": _serialize_candles(candles, timestamp_format)}
 
 
-def run_backtest_response(payload: Dict[str, Any]) -> Tuple[HTTPStatus, Dict[str, Any]]:
+def _prepare_backtest(
+    payload: Dict[str, Any],
+    report_progress: ProgressCallback,
+    timer: PhaseTimer,
+) -> Tuple[Backtester, Iterable[Candle] | CandleFrame, str]:
+    """Validate *payload* and return the engine, the candles and the response timestamp format."""
+
     config_payload = payload.get("config")
     if not isinstance(config_payload, dict):
-        return HTTPStatus.BAD_REQUEST, {"detail": "config is required"}
+        raise _RequestError(HTTPStatus.BAD_REQUEST, "config is required")
+    timestamp_format = _parse_timestamp_format(payload.get("timestampFormat"))
 
     try:
         config = _config_from_payload(config_payload)
     except Exception as exc:  # noqa: BLE001 - validation errors bubble up
-        return HTTPStatus.UNPROCESSABLE_ENTITY, {"detail": str(exc)}
+        raise _RequestError(HTTPStatus.UNPROCESSABLE_ENTITY, str(exc)) from exc
 
     try:
-        backtester = Backtester(config)
+        # Trades keep epoch milliseconds; they are only formatted when serialized.
+        backtester = Backtester(config, timestamps="epoch")
     except ValueError as exc:
-        return HTTPStatus.UNPROCESSABLE_ENTITY, {"detail": str(exc)}
+        raise _RequestError(HTTPStatus.UNPROCESSABLE_ENTITY, str(exc)) from exc
+    report_progress(0.1)
+    return backtester, _load_candles(payload, config, timer), timestamp_format
+
+
+def _load_candles(payload: Dict[str, Any], config: BacktestConfig, timer: PhaseTimer) -> Iterable[Candle] | CandleFrame:
+    """Return the candles posted in *payload*, or fetch the range described by *config*."""
 
     candles_payload = payload.get("candles")
+    if isinstance(candles_payload, CandleFrame):
+        return candles_payload
     if candles_payload:
         if not isinstance(candles_payload, list):
-            return HTTPStatus.BAD_REQUEST, {"detail": "candles must be an array"}
+            raise _RequestError(HTTPStatus.BAD_REQUEST, "candles must be an array")
         try:
-            candles = _candles_from_payload(candles_payload)
+            with timer.phase("parse"):
+                return _candles_from_payload(candles_payload)
         except ValueError as exc:
-            return HTTPStatus.BAD_REQUEST, {"detail": str(exc)}
-    else:
+            raise _RequestError(HTTPStatus.BAD_REQUEST, str(exc)) from exc
+    with timer.phase("fetch"):
+        return _fetch(config.instrument_name, config.interval, config.start, config.end)
+
+
+def _run(backtester: Backtester, candles: Iterable[Candle] | CandleFrame, timer: PhaseTimer) -> BacktestReport:
+    with timer.phase("backtest"):
+        report = backtester.run(candles)
+    BARS_PROCESSED.inc(len(candles) if isinstance(candles, (CandleFrame, list)) else len(as_frame(candles)))
+    return report
+
+
+def run_backtest_response(
+    payload: Dict[str, Any],
+    progress: ProgressCallback | None = None,
+) -> Tuple[HTTPStatus, Dict[str, Any]]:
+    report_progress = progress or (lambda _fraction: None)
+    timer = PhaseTimer()
+    try:
+        max_points = _parse_max_points(payload)
+        backtester, candles, timestamp_format = _prepare_backtest(payload, report_progress, timer)
+    except _RequestError as exc:
+        return exc.status, {"detail": exc.detail}
+
+    report_progress(0.5)
+    report = _run(backtester, candles, timer)
+    report_progress(0.9)
+    with timer.phase("serialize"):
+        body = _serialize_report(report, timestamp_format)
+    if max_points is not None:
+        body["equity"] = _equity_body(as_frame(candles), report, backtester.config, max_points, timestamp_format, timer)
+    record_phases(timer)
+    if payload.get("includeTimings"):
+        body["timings"] = timer.as_milliseconds()
+    return HTTPStatus.OK, {"report": body}
+
+
+def _candle_batches(frame: CandleFrame, timestamp_format: str) -> Iterator[List[Dict[str, Any]]]:
+    return iter_batches(len(frame), lambda start, stop: _serialize_candles(frame[start:stop], timestamp_format))
+
+
+def _trade_batches(trades: Sequence[TradeResult], timestamp_format: str) -> Iterator[List[Dict[str, Any]]]:
+    if isinstance(trades, TradeLedger):
+        records = trades.records
+        return iter_batches(
+            len(records), lambda start, stop: _serialize_trade_records(records[start:stop], timestamp_format)
+        )
+    return iter_batches(len(trades), lambda start, stop: _serialize_trades(trades[start:stop], timestamp_format))
+
+
+def stream_candles(
+    candles: Iterable[Candle] | CandleFrame,
+    ndjson: bool = False,
+    timestamp_format: str = "iso",
+) -> Iterator[bytes]:
+    """Encode a candles response incrementally.
+
+    The JSON form matches :func:`get_candles_response`; the NDJSON form has
+    one candle object per line.
+    """
+
+    frame = as_frame(candles)
+    if ndjson:
+        return iter_ndjson(None, _candle_batches(frame, timestamp_format))
+    return iter_json_document({}, "candles", _candle_batches(frame, timestamp_format))
+
+
+def stream_report(
+    report: BacktestReport,
+    ndjson: bool = False,
+    timestamp_format: str = "iso",
+    timings: Dict[str, float] | None = None,
+    equity: Dict[str, Any] | None = None,
+) -> Iterator[bytes]:
+    """Encode a backtest response incrementally.
+
+    The JSON form matches :func:`run_backtest_response`; the NDJSON form
+    starts with a line holding ``finalCash``, ``wins`` and ``losses`` (and
+    ``timings`` and ``equity`` when given) followed by one trade per line.
+    """
+
+    summary: Dict[str, Any] = {"finalCash": report.final_cash, "wins": report.wins, "losses": report.losses}
+    if timings is not None:
+        summary["timings"] = timings
+    if equity is not None:
+        summary["equity"] = equity
+    if ndjson:
+        return iter_ndjson(summary, _trade_batches(report.trades, timestamp_format))
+    trades = _trade_batches(report.trades, timestamp_format)
+    return wrap_document("report", iter_json_document(summary, "trades", trades))
+
+
+_RESULT_CACHE: ResultCache[BacktestReport] = ResultCache(max_entries=128, ttl=3600.0)
+# Candle queries may cover the still-forming bar, so they go stale quickly.
+_CANDLE_CACHE: ResultCache[Tuple[str, CandleFrame]] = ResultCache(max_entries=64, ttl=60.0)
+
+
+def get_result_cache() -> ResultCache[BacktestReport]:
+    return _RESULT_CACHE
+
+
+def get_candle_cache() -> ResultCache[Tuple[str, CandleFrame]]:
+    return _CANDLE_CACHE
+
+
+def _cache_counts(attribute: str) -> List[Tuple[Tuple[str, ...], float]]:
+    caches = {
+        "result": get_result_cache(),
+        "candles": get_candle_cache(),
+        "indicators": default_indicator_cache(),
+    }
+    return [((name,), getattr(cache, attribute)) for name, cache in caches.items()]
+
+
+REGISTRY.counter_callback(
+    "backtester_cache_hits_total",
+    "Lookups answered from a cache.",
+    ("cache",),
+    lambda: _cache_counts("hits"),
+)
+REGISTRY.counter_callback(
+    "backtester_cache_misses_total",
+    "Lookups that missed a cache.",
+    ("cache",),
+    lambda: _cache_counts("misses"),
+)
+
+
+def _single_flight_counts() -> List[Tuple[Tuple[str, ...], float]]:
+    stats = default_single_flight().stats()
+    return [(("downloaded",), stats["downloads"]), (("coalesced",), stats["coalesced"])]
+
+
+REGISTRY.counter_callback(
+    "backtester_upstream_range_fetches_total",
+    "Candle ranges downloaded, and range fetches that joined a download already in flight.",
+    ("outcome",),
+    _single_flight_counts,
+)
+
+
+class _CachedReport(NamedTuple):
+    etag: str
+    report: BacktestReport | None
+    timestamp_format: str
+    max_points: int | None
+    frame: CandleFrame
+    config: BacktestConfig
+
+
+def _cached_report(
+    payload: Dict[str, Any],
+    cache: ResultCache[BacktestReport],
+    if_none_match: str | None,
+    timer: PhaseTimer,
+    *,
+    ndjson: bool = False,
+    encoding: str | None = None,
+) -> _CachedReport:
+    """Return the response ETag and the report, with what is needed to serialize it.
+
+    The report is ``None`` when *if_none_match* already names the response.
+    *ndjson* and *encoding* describe the negotiated body, which the ETag
+    depends on.
+    """
+
+    max_points = _parse_max_points(payload)
+    backtester, candles, timestamp_format = _prepare_backtest(payload, lambda _fraction: None, timer)
+    with timer.phase("cache"):
+        frame = as_frame(candles)
+        key = make_etag(config_fingerprint(backtester.config), frame_fingerprint(frame))
+        etag = _representation_etag(key, timestamp_format, max_points, ndjson=ndjson, encoding=encoding)
+        if etag_matches(if_none_match, etag):
+            return _CachedReport(etag, None, timestamp_format, max_points, frame, backtester.config)
+        report = cache.get(key)
+    if report is None:
+        report = _run(backtester, frame, timer)
+        cache.put(key, report)
+    return _CachedReport(etag, report, timestamp_format, max_points, frame, backtester.config)
+
+
+def _representation_etag(
+    etag: str,
+    timestamp_format: str,
+    max_points: int | None = None,
+    *,
+    ndjson: bool = False,
+    encoding: str | None = None,
+) -> str:
+    # Each timestamp format, equity resolution, media type and content coding is a different
+    # representation, and strong ETags must differ between representations.
+    if max_points is not None:
+        etag = make_etag(etag, f"maxPoints={max_points}")
+    if timestamp_format != "iso":
+        etag = make_etag(etag, timestamp_format)
+    if ndjson:
+        etag = make_etag(etag, NDJSON_CONTENT_TYPE)
+    if encoding is not None:
+        etag = make_etag(etag, f"encoding={encoding}")
+    return etag
+
+
+def _equity_body(
+    frame: CandleFrame,
+    report: BacktestReport,
+    config: BacktestConfig,
+    max_points: int,
+    timestamp_format: str,
+    timer: PhaseTimer,
+) -> Dict[str, Any]:
+    with timer.phase("equity"):
+        return _serialize_equity(equity_curve(frame, report, config.initial_cash), max_points, timestamp_format)
+
+
+def _cached_frame(
+    query: Dict[str, str],
+    cache: ResultCache[Tuple[str, CandleFrame]],
+    timer: PhaseTimer,
+    *,
+    ndjson: bool = False,
+    encoding: str | None = None,
+) -> Tuple[str, CandleFrame, str]:
+    """Return the response ETag, the candles and the timestamp format for a candle query."""
+
+    timestamp_format = _parse_timestamp_format(query.get("timestamp_format"))
+    instrument_name, resolution, start, end = _candle_query(query)
+    view = _candle_view(query)
+    key = (
+        instrument_name,
+        resolution,
+        to_epoch_ms(start) if start is not None else None,
+        to_epoch_ms(end) if end is not None else None,
+    )
+    entry = cache.get(key)
+    if entry is None:
+        with timer.phase("fetch"):
+            frame = as_frame(_fetch(instrument_name, resolution, start, end))
+        entry = (make_etag(frame_fingerprint(frame)), frame)
+        cache.put(key, entry)
+    etag, frame = entry
+    if view != (None, None, None):
+        # Zooming re-cuts the cached range instead of fetching the viewport on its own.
+        with timer.phase("aggregate"):
+            frame = _aggregate_view(frame, resolution, *view)
+        etag = make_etag(etag, "view={}:{}:{}".format(*view))
+    return _representation_etag(etag, timestamp_format, ndjson=ndjson, encoding=encoding), frame, timestamp_format
+
+
+def cached_backtest_response(
+    payload: Dict[str, Any],
+    cache: ResultCache[BacktestReport] | None = None,
+    if_none_match: str | None = None,
+) -> Tuple[HTTPStatus, Dict[str, Any], str | None]:
+    """Like :func:`run_backtest_response`, reusing reports for identical inputs.
+
+    Returns the status, the body and the ETag identifying the report; the
+    status is ``304 Not Modified`` with an empty body when *if_none_match*
+    already names it.
+    """
+
+    timer = PhaseTimer()
+    try:
+        cached = _cached_report(payload, cache if cache is not None else get_result_cache(), if_none_match, timer)
+    except _RequestError as exc:
+        return exc.status, {"detail": exc.detail}, None
+    etag, report = cached.etag, cached.report
+    if report is None:
+        return HTTPStatus.NOT_MODIFIED, {}, etag
+    with timer.phase("serialize"):
+        body = _serialize_report(report, cached.timestamp_format)
+    if cached.max_points is not None:
+        body["equity"] = _equity_body(
+            cached.frame, report, cached.config, cached.max_points, cached.timestamp_format, timer
+        )
+    record_phases(timer)
+    if payload.get("includeTimings"):
+        body["timings"] = timer.as_milliseconds()
+    return HTTPStatus.OK, {"report": body}, etag
+
+
+def cached_candles_response(
+    query: Dict[str, str],
+    cache: ResultCache[Tuple[str, CandleFrame]] | None = None,
+    if_none_match: str | None = None,
+) -> Tuple[HTTPStatus, Dict[str, Any], str | None]:
+    """Like :func:`get_candles_response`, serving repeated queries from *cache*."""
+
+    try:
+        etag, frame, timestamp_format = _cached_frame(
+            query,
+            cache if cache is not None else get_candle_cache(),
+            PhaseTimer(),
+        )
+    except _RequestError as exc:
+        return exc.status, {"detail": exc.detail}, None
+    if etag_matches(if_none_match, etag):
+        return HTTPStatus.NOT_MODIFIED, {}, etag
+    return HTTPStatus.OK, {"candles": _serialize_candles(frame, timestamp_format)}, etag
+
+
+_JOB_QUEUE: JobQueue | None = None
+_JOB_QUEUE_LOCK = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Return the shared backtest job queue, starting its worker pool on first use."""
+
+    global _JOB_QUEUE
+
+    with _JOB_QUEUE_LOCK:
+        if _JOB_QUEUE is None:
+            _JOB_QUEUE = JobQueue(run_backtest_response)
+        return _JOB_QUEUE
+
+
+def submit_job_response(
+    payload: Dict[str, Any],
+    job_queue: JobQueue | None = None,
+) -> Tuple[HTTPStatus, Dict[str, Any]]:
+    if not isinstance(payload.get("config"), dict):
+        return HTTPStatus.BAD_REQUEST, {"detail": "config is required"}
+
+    job_queue = job_queue or get_job_queue()
+    try:
+        job = job_queue.submit(payload)
+    except QueueFullError as exc:
+        return HTTPStatus.TOO_MANY_REQUESTS, {"detail": str(exc)}
+    return HTTPStatus.ACCEPTED, {"job": job.to_dict()}
+
+
+def get_job_response(job_id: str, job_queue: JobQueue | None = None) -> Tuple[HTTPStatus, Dict[str, Any]]:
+    job = (job_queue or get_job_queue()).get(job_id)
+    if job is None:
+        return HTTPStatus.NOT_FOUND, {"detail": f"Unknown job '{job_id}'"}
+    return HTTPStatus.OK, {"job": job.to_dict()}
+
+
+def cancel_job_response(job_id: str, job_queue: JobQueue | None = None) -> Tuple[HTTPStatus, Dict[str, Any]]:
+    job_queue = job_queue or get_job_queue()
+    existing = job_queue.get(job_id)
+    if existing is None:
+        return HTTPStatus.NOT_FOUND, {"detail": f"Unknown job '{job_id}'"}
+    if existing.finished:
+        return HTTPStatus.CONFLICT, {"detail": f"Job '{job_id}' already {existing.status}"}
+    job = job_queue.cancel(job_id) or existing
+    return HTTPStatus.OK, {"job": job.to_dict()}
+
+
+def _serialize_monte_carlo(result: MonteCarloResult) -> Dict[str, Any]:
+    return {
+        "method": result.method,
+        "iterations": result.iterations,
+        "seed": result.seed,
+        "trades": result.trades,
+        "probabilityOfLoss": result.probability_of_loss,
+        "finalEquity": result.distribution("final_equity"),
+        "maxDrawdown": result.distribution("max_drawdown"),
+        "winRate": result.distribution("win_rate"),
+    }
+
+
+def monte_carlo_response(
+    payload: Dict[str, Any],
+    cache: ResultCache[BacktestReport] | None = None,
+) -> Tuple[HTTPStatus, Dict[str, Any]]:
+    """Backtest *payload* like ``/api/backtest`` and resample its trades.
+
+    ``iterations`` (default 1000), ``method`` (``bootstrap`` or ``shuffle``)
+    and ``seed`` (default 0) control the simulation.  The backtest itself is
+    served from the result cache when the same request was run before.
+    """
+
+    timer = PhaseTimer()
+    try:
+        method = payload.get("method", "bootstrap")
+        if method not in MONTE_CARLO_METHODS:
+            raise _RequestError(HTTPStatus.BAD_REQUEST, f"method must be one of {', '.join(MONTE_CARLO_METHODS)}")
         try:
-            candles = fetch_candles(
-                instrument_name=config.instrument_name,
-                resolution=config.interval,
-                start=config.start,
-                end=config.end,
+            iterations = int(payload.get("iterations", 1000))
+            seed = payload.get("seed", 0)
+            seed = None if seed is None else int(seed)
+        except (TypeError, ValueError) as exc:
+            raise _RequestError(HTTPStatus.BAD_REQUEST, "iterations and seed must be integers") from exc
+        if not 1 <= iterations <= MAX_MONTE_CARLO_ITERATIONS:
+            raise _RequestError(
+                HTTPStatus.BAD_REQUEST,
+                f"iterations must be between 1 and {MAX_MONTE_CARLO_ITERATIONS}",
+            )
+        report = _cached_report(payload, cache if cache is not None else get_result_cache(), None, timer).report
+    except _RequestError as exc:
+        return exc.status, {"detail": exc.detail}
+
+    with timer.phase("simulate"):
+        result = simulate(report, iterations=iterations, method=method, seed=seed)
+    body = _serialize_monte_carlo(result)
+    record_phases(timer)
+    if payload.get("includeTimings"):
+        body["timings"] = timer.as_milliseconds()
+    return HTTPStatus.OK, {"monteCarlo": body}
+
+
+def _grid_from_payload(grid_payload: Any) -> Dict[str, List[Any]]:
+    if not isinstance(grid_payload, dict) or not grid_payload:
+        raise _RequestError(HTTPStatus.BAD_REQUEST, "grid is required")
+    grid: Dict[str, List[Any]] = {}
+    for camel, values in grid_payload.items():
+        field = GRID_FIELD_MAP.get(camel)
+        if field is None:
+            raise _RequestError(
+                HTTPStatus.BAD_REQUEST,
+                f"grid fields must be among {', '.join(GRID_FIELD_MAP)}",
             )
-        except Exception as exc:  # noqa: BLE001 - surface network errors cleanly
-            LOGGER.exception("Failed to fetch candles", exc_info=exc)
-            return HTTPStatus.BAD_GATEWAY, {"detail": str(exc)}
+        values = list(values) if isinstance(values, list) else [values]
+        if field in INTEGER_GRID_FIELDS:
+            if not all(_is_number(value) and isinstance(value, int) and value >= 1 for value in values):
+                raise _RequestError(HTTPStatus.BAD_REQUEST, f"grid.{camel} values must be integers of at least 1")
+        elif not all(_is_number(value) and math.isfinite(value) for value in values):
+            raise _RequestError(HTTPStatus.BAD_REQUEST, f"grid.{camel} values must be finite numbers")
+        grid[field] = values
+    return grid
+
 
-    report = backtester.run(candles)
-    return HTTPStatus.OK, {"report": _serialize_report(report)}
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _serialize_sweep_result(result: SweepResult) -> Dict[str, Any]:
+    fields = {field: camel for camel, field in GRID_FIELD_MAP.items()}
+    return {
+        "parameters": {fields[name]: value for name, value in result.parameters.items()},
+        "finalCash": result.final_cash,
+        "cumulativeProfit": result.cumulative_profit,
+        "winRate": result.win_rate,
+        "totalTrades": result.total_trades,
+        "wins": result.wins,
+        "losses": result.losses,
+    }
+
+
+def _serialize_walk_forward(report: WalkForwardReport, timestamp_format: str = "iso") -> Dict[str, Any]:
+    folds = []
+    for fold in report.folds:
+        in_start, in_end, out_start, out_end = _format_timestamps(
+            [fold.in_sample_start, fold.in_sample_end, fold.out_of_sample_start, fold.out_of_sample_end],
+            timestamp_format,
+        )
+        folds.append(
+            {
+                "index": fold.index,
+                "inSample": {
+                    "start": in_start,
+                    "end": in_end,
+                    "bars": fold.in_sample_bars,
+                    **_serialize_sweep_result(fold.in_sample),
+                },
+                "outOfSample": {
+                    "start": out_start,
+                    "end": out_end,
+                    "bars": fold.out_of_sample_bars,
+                    **_serialize_sweep_result(fold.out_of_sample),
+                },
+            }
+        )
+    return {
+        "rankBy": {field: camel for camel, field in RANK_KEY_MAP.items()}[report.rank_by],
+        "folds": folds,
+        "aggregate": {
+            "folds": len(report.folds),
+            "totalTrades": report.total_trades,
+            "wins": report.wins,
+            "losses": report.losses,
+            "winRate": report.win_rate,
+            "cumulativeProfit": report.cumulative_profit,
+            "efficiency": report.efficiency,
+        },
+    }
+
+
+def walk_forward_response(
+    payload: Dict[str, Any],
+    processes: int | None = None,
+) -> Tuple[HTTPStatus, Dict[str, Any]]:
+    """Run a walk-forward optimization described by *payload*.
+
+    The body carries the base ``config``, a ``grid`` of candidate values per
+    parameter and optionally ``folds``, ``inSampleRatio``, ``anchored``,
+    ``rankBy`` and posted ``candles``.  At most
+    :data:`MAX_CONCURRENT_WALK_FORWARDS` optimizations run at a time, each on
+    at most :data:`MAX_WALK_FORWARD_PROCESSES` processes; further requests
+    are answered with ``429 Too Many Requests``.
+    """
+
+    timer = PhaseTimer()
+    try:
+        config_payload = payload.get("config")
+        if not isinstance(config_payload, dict):
+            raise _RequestError(HTTPStatus.BAD_REQUEST, "config is required")
+        timestamp_format = _parse_timestamp_format(payload.get("timestampFormat"))
+        grid = _grid_from_payload(payload.get("grid"))
+        rank_key = payload.get("rankBy", "finalCash")
+        if not isinstance(rank_key, str) or rank_key not in RANK_KEY_MAP:
+            raise _RequestError(HTTPStatus.BAD_REQUEST, f"rankBy must be one of {', '.join(RANK_KEY_MAP)}")
+        rank_by = RANK_KEY_MAP[rank_key]
+        try:
+            folds = int(payload.get("folds", 5))
+            in_sample_ratio = float(payload.get("inSampleRatio", 0.7))
+        except (TypeError, ValueError) as exc:
+            raise _RequestError(HTTPStatus.BAD_REQUEST, "folds and inSampleRatio must be numbers") from exc
+        try:
+            config = _config_from_payload(config_payload)
+        except Exception as exc:  # noqa: BLE001 - validation errors bubble up
+            raise _RequestError(HTTPStatus.UNPROCESSABLE_ENTITY, str(exc)) from exc
+        if not _WALK_FORWARD_SLOTS.acquire(blocking=False):
+            raise _RequestError(HTTPStatus.TOO_MANY_REQUESTS, "A walk-forward optimization is already running")
+        try:
+            candles = _load_candles(payload, config, timer)
+            try:
+                with timer.phase("optimize"):
+                    report = run_walk_forward(
+                        candles,
+                        config,
+                        grid,
+                        folds=folds,
+                        in_sample_ratio=in_sample_ratio,
+                        anchored=bool(payload.get("anchored", False)),
+                        rank_by=rank_by,
+                        processes=min(processes or os.cpu_count() or 1, MAX_WALK_FORWARD_PROCESSES),
+                    )
+            except ValueError as exc:
+                raise _RequestError(HTTPStatus.UNPROCESSABLE_ENTITY, str(exc)) from exc
+        finally:
+            _WALK_FORWARD_SLOTS.release()
+    except _RequestError as exc:
+        return exc.status, {"detail": exc.detail}
+
+    with timer.phase("serialize"):
+        body = _serialize_walk_forward(report, timestamp_format)
+    record_phases(timer)
+    if payload.get("includeTimings"):
+        body["timings"] = timer.as_milliseconds()
+    return HTTPStatus.OK, {"walkForward": body}
+
+
+def payload_from_body(raw_body: bytes, content_type: str | None = None) -> Dict[str, Any]:
+    """Decode a POST body, either JSON or the binary candle format.
+
+    Binary bodies carry the remaining request fields (such as ``config``) in
+    their header and the candles as a :class:`CandleFrame` viewing the body.
+    """
+
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if media_type == BINARY_CONTENT_TYPE:
+        try:
+            header, frame = decode_candles(raw_body)
+        except ValueError as exc:
+            raise _RequestError(HTTPStatus.BAD_REQUEST, str(exc)) from exc
+        header.pop("length", None)
+        return {**header, "candles": frame}
+
+    try:
+        payload = json.loads(raw_body.decode("utf-8")) if raw_body else {}
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise _RequestError(HTTPStatus.BAD_REQUEST, "Invalid JSON payload") from exc
+    if not isinstance(payload, dict):
+        raise _RequestError(HTTPStatus.BAD_REQUEST, "Invalid JSON payload")
+    return payload
+
+
+def _endpoint_label(path: str) -> str:
+    """Collapse request paths into a bounded set of metric labels."""
+
+    if path in ("/api/candles", "/api/backtest", JOBS_PATH, METRICS_PATH, WALKFORWARD_PATH, MONTECARLO_PATH):
+        return path
+    if _job_id_from_path(path) is not None:
+        return JOBS_PATH + "/{id}"
+    return "other"
+
+
+def _job_id_from_path(path: str) -> str | None:
+    if not path.startswith(JOBS_PATH + "/"):
+        return None
+    job_id = path[len(JOBS_PATH) + 1 :]
+    return job_id if job_id and "/" not in job_id else None
 
 
 class BacktesterRequestHandler(BaseHTTPRequestHandler):
     """Serve the JSON API using the standard library HTTP server."""
 
+    # HTTP/1.1 is needed for chunked transfer encoding of streamed responses.
+    protocol_version = "HTTP/1.1"
+
     def do_GET(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler signature
         parsed = urlparse(self.path)
+        job_id = _job_id_from_path(parsed.path)
+        if job_id is not None:
+            status, body = get_job_response(job_id)
+            self._send_json(status, body)
+            return
+        if parsed.path == METRICS_PATH:
+            self._send_text(HTTPStatus.OK, REGISTRY.render(), PROMETHEUS_CONTENT_TYPE)
+            return
         if parsed.path != "/api/candles":
             self.send_error(HTTPStatus.NOT_FOUND, "Endpoint not found")
             return
 
+        timer = PhaseTimer()
         query = {key: values[0] for key, values in parse_qs(parsed.query, keep_blank_values=True).items()}
-        status, body = get_candles_response(query)
-        self._send_json(status, body)
+        ndjson = self._accepts_ndjson()
+        try:
+            etag, frame, timestamp_format = _cached_frame(
+                query, get_candle_cache(), timer, ndjson=ndjson, encoding=self._content_encoding()
+            )
+        except _RequestError as exc:
+            self._send_json(exc.status, {"detail": exc.detail})
+            return
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Server-Timing": timer.server_timing()}
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            self._send_not_modified(headers)
+            return
+        with timer.phase("serialize"):
+            self._send_stream(stream_candles(frame, ndjson, timestamp_format), ndjson, headers)
+        record_phases(timer)
 
     def do_POST(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler signature
         parsed = urlparse(self.path)
-        if parsed.path != "/api/backtest":
+        if parsed.path not in ("/api/backtest", JOBS_PATH, WALKFORWARD_PATH, MONTECARLO_PATH):
             self.send_error(HTTPStatus.NOT_FOUND, "Endpoint not found")
             return
 
+        timer = PhaseTimer()
         length = int(self.headers.get("Content-Length", "0"))
         raw_body = self.rfile.read(length) if length > 0 else b""
         try:
-            payload = json.loads(raw_body.decode("utf-8")) if raw_body else {}
-        except json.JSONDecodeError:
-            self._send_json(HTTPStatus.BAD_REQUEST, {"detail": "Invalid JSON payload"})
+            with timer.phase("parse"):
+                payload = payload_from_body(raw_body, self.headers.get("Content-Type"))
+        except _RequestError as exc:
+            self._send_json(exc.status, {"detail": exc.detail})
             return
 
-        status, body = run_backtest_response(payload)
+        if parsed.path == JOBS_PATH:
+            status, body = submit_job_response(payload)
+            headers = {}
+            if status is HTTPStatus.ACCEPTED:
+                headers["Location"] = f"{JOBS_PATH}/{body['job']['id']}"
+            elif status is HTTPStatus.TOO_MANY_REQUESTS:
+                headers["Retry-After"] = "1"
+            self._send_json(status, body, headers)
+            return
+        if parsed.path == WALKFORWARD_PATH:
+            status, body = walk_forward_response(payload)
+            self._send_json(status, body, {"Retry-After": "1"} if status is HTTPStatus.TOO_MANY_REQUESTS else {})
+            return
+        if parsed.path == MONTECARLO_PATH:
+            status, body = monte_carlo_response(payload)
+            self._send_json(status, body)
+            return
+
+        ndjson = self._accepts_ndjson()
+        try:
+            if_none_match = self.headers.get("If-None-Match")
+            cached = _cached_report(
+                payload, get_result_cache(), if_none_match, timer, ndjson=ndjson, encoding=self._content_encoding()
+            )
+        except _RequestError as exc:
+            self._send_json(exc.status, {"detail": exc.detail})
+            return
+        report = cached.report
+        if report is None:
+            headers = {"ETag": cached.etag, "Cache-Control": "no-cache", "Server-Timing": timer.server_timing()}
+            self._send_not_modified(headers)
+            return
+        equity = None
+        if cached.max_points is not None:
+            equity = _equity_body(
+                cached.frame, report, cached.config, cached.max_points, cached.timestamp_format, timer
+            )
+        # Serialization overlaps with sending the body, so only earlier phases make it into the header.
+        headers = {"ETag": cached.etag, "Cache-Control": "no-cache", "Server-Timing": timer.server_timing()}
+        timings = timer.as_milliseconds() if payload.get("includeTimings") else None
+        stream = stream_report(report, ndjson, cached.timestamp_format, timings, equity)
+        with timer.phase("serialize"):
+            self._send_stream(stream, ndjson, headers)
+        record_phases(timer)
+
+    def do_DELETE(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler signature
+        job_id = _job_id_from_path(urlparse(self.path).path)
+        if job_id is None:
+            self.send_error(HTTPStatus.NOT_FOUND, "Endpoint not found")
+            return
+        status, body = cancel_job_response(job_id)
         self._send_json(status, body)
 
+    def parse_request(self) -> bool:
+        # Start timing once the request line has arrived, not while an idle keep-alive connection waits.
+        self._started = time.perf_counter()
+        return super().parse_request()
+
+    def send_response(self, code: int, message: str | None = None) -> None:
+        self._status = int(code)
+        super().send_response(code, message)
+
+    def handle_one_request(self) -> None:
+        self._status: int | None = None
+        self._started = time.perf_counter()
+        super().handle_one_request()
+        if self._status is not None and getattr(self, "command", None):
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - self._started,
+                method=self.command,
+                endpoint=_endpoint_label(urlparse(self.path).path),
+                status=str(self._status),
+            )
+
     def log_message(self, format: str, *args: Any) -> None:  # noqa: A003 - following base signature
         LOGGER.info("%s - - %s", self.client_address[0], format % args)
 
-    def _send_json(self, status: HTTPStatus, body: Dict[str, Any]) -> None:
+    def _accepts_ndjson(self) -> bool:
+        return NDJSON_CONTENT_TYPE in self.headers.get("Accept", "")
+
+    def _content_encoding(self) -> str | None:
+        return negotiate_encoding(self.headers.get("Accept-Encoding"))
+
+    def _send_not_modified(self, headers: Dict[str, str]) -> None:
+        self.send_response(HTTPStatus.NOT_MODIFIED.value)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def _send_text(self, status: HTTPStatus, text: str, content_type: str) -> None:
+        data = text.encode("utf-8")
+        self.send_response(status.value)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, chunks: Iterable[bytes], ndjson: bool, headers: Dict[str, str]) -> None:
+        """Send a 200 response whose body is written as *chunks* are produced."""
+
+        encoding = self._content_encoding()
+        chunked = self.request_version == "HTTP/1.1"
+        self.send_response(HTTPStatus.OK.value)
+        self.send_header("Content-Type", NDJSON_CONTENT_TYPE if ndjson else JSON_CONTENT_TYPE)
+        self.send_header("Vary", "Accept, Accept-Encoding")
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        else:
+            # HTTP/1.0 clients read until the connection closes.
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        ChunkedWriter(self.wfile, encoding=encoding, chunked=chunked).write_all(chunks)
+
+    def _send_json(self, status: HTTPStatus, body: Dict[str, Any], headers: Dict[str, str] | None = None) -> None:
         data = json.dumps(body).encode("utf-8")
         self.send_response(status.value)
         self.send_header("Content-Type", "application/json")
         self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
         self.wfile.write(data)
 
@@ -230,6 +1200,8 @@ def serve(host: str = "127.0.0.1", port: int = 8000) -> None:
         LOGGER.info("Shutting down server")
     finally:
         server.server_close()
+        if _JOB_QUEUE is not None:
+            _JOB_QUEUE.shutdown(wait=False)
 
 
 if __name__ == "__main__":  # pragma: no cover - manual execution
@@ -0,0 +1,143 @@
+"""Shared indicator cache so repeated backtests reuse moving averages.
+
+A sweep over many window pairs runs the same closing prices through the
+moving average thousands of times.  :class:`IndicatorCache` computes each
+SMA window once per dataset in a single vectorized pass and remembers
+recently used series under a memory budget.
+"""
+from __future__ import annotations
+
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Hashable, Tuple
+
+import numpy as np
+
+from .strategy import moving_average
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+CacheKey = Tuple[Hashable, str, int]
+
+
+class IndicatorCache:
+    """LRU cache of indicator series keyed by ``(dataset, indicator, window)``.
+
+    Datasets are identified by the array object passed in, so every run over
+    the same :class:`~backtester.frame.CandleFrame` shares entries, and the
+    entries are dropped as soon as that array is garbage collected.  A
+    writable array is made read-only (together with the arrays it views) when
+    it is first cached, so it cannot change under its entries; arrays viewing
+    some other writable buffer are not cached.  Cached arrays are returned
+    read-only.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be greater than zero")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[CacheKey, np.ndarray]" = OrderedDict()
+        self._size = 0
+        self._datasets: Dict[int, weakref.finalize] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def nbytes(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _dataset_key(self, values: np.ndarray) -> int | None:
+        if values.flags.writeable and not _freeze(values):
+            return None
+        key = id(values)
+        if key not in self._datasets:
+            self._datasets[key] = weakref.finalize(values, self._forget, key)
+        return key
+
+    def _forget(self, dataset: Hashable) -> None:
+        with self._lock:
+            self._datasets.pop(dataset, None)  # type: ignore[arg-type]
+            for key in [key for key in self._entries if key[0] == dataset]:
+                array = self._entries.pop(key)
+                self._size -= array.nbytes
+
+    def _get(self, key: CacheKey) -> np.ndarray | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry
+
+    def _put(self, key: CacheKey, array: np.ndarray) -> np.ndarray:
+        array.flags.writeable = False
+        entry = self._entries.get(key)
+        if entry is not None:
+            # Another thread computed the same series meanwhile.
+            return entry
+        if array.nbytes > self.max_bytes:
+            return array
+        self._entries[key] = array
+        self._size += array.nbytes
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.nbytes
+            self.evictions += 1
+        return array
+
+    def sma(self, values: np.ndarray, window: int) -> np.ndarray:
+        """Return the simple moving average of *values* over *window* bars."""
+
+        with self._lock:
+            dataset = self._dataset_key(values)
+            if dataset is None:
+                self.misses += 1
+                return moving_average(values, window)
+            key = (dataset, "sma", window)
+            entry = self._get(key)
+        if entry is not None:
+            return entry
+        # Computed outside the lock so that concurrent runs do not queue behind each other.
+        averages = moving_average(values, window)
+        with self._lock:
+            return self._put(key, averages)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+def _freeze(values: np.ndarray) -> bool:
+    """Make *values* and the arrays it views read-only, unless its memory is writable elsewhere."""
+
+    arrays = []
+    base: object = values
+    while isinstance(base, np.ndarray):
+        arrays.append(base)
+        base = base.base
+    if base is not None:
+        try:
+            if not memoryview(base).readonly:  # type: ignore[arg-type]
+                return False
+        except TypeError:
+            return False
+    for array in arrays:
+        array.flags.writeable = False
+    return True
+
+
+_DEFAULT_CACHE = IndicatorCache()
+
+
+def default_indicator_cache() -> IndicatorCache:
+    """Return the process-wide cache used by :class:`~backtester.backtest.Backtester`."""
+
+    return _DEFAULT_CACHE
@@ -0,0 +1,180 @@
+"""Intrabar exit resolution from high/low prices and finer candles.
+
+The default engines only compare a position's take-profit and stop-loss with
+each bar's close.  In intrabar mode a level counts as hit as soon as the
+bar's high or low reaches it, and the position is filled at the level (or at
+the open when the bar gaps through it).  When the same bar reaches both
+levels its OHLC cannot tell which came first; only for those ambiguous bars
+are finer candles fetched, and cached, to replay the bar minute by minute.
+"""
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+from .frame import CandleFrame
+from .positions import first_level_hit
+from .timeutils import from_epoch_ms
+
+LOGGER = logging.getLogger(__name__)
+
+TAKE_PROFIT = "take_profit"
+STOP_LOSS = "stop_loss"
+
+# Fetches the fine candles with ``start_ms <= tick < end_ms``.
+FineFetcher = Callable[[int, int], CandleFrame]
+
+
+def _bar_outcome(
+    open_: float,
+    high: float,
+    low: float,
+    take_profit: float,
+    stop_loss: float,
+) -> Tuple[str | None, float]:
+    """Return the level a bar settles, and the fill price, when its OHLC decides it.
+
+    ``(None, nan)`` means both levels were reached inside the bar.
+    """
+
+    if open_ >= take_profit:
+        return TAKE_PROFIT, open_
+    if open_ <= stop_loss:
+        return STOP_LOSS, open_
+    hit_take_profit = high >= take_profit
+    hit_stop_loss = low <= stop_loss
+    if hit_take_profit and hit_stop_loss:
+        return None, float("nan")
+    if hit_take_profit:
+        return TAKE_PROFIT, take_profit
+    return STOP_LOSS, stop_loss
+
+
+class IntrabarResolver:
+    """Decide which level an ambiguous bar reached first from finer candles.
+
+    Ambiguous bars cluster in volatile stretches, so *fetch* is called once
+    for an aligned block of *batch_bars* bars around the bar asked for, and
+    the candles of every bar in the block are kept for the most recent
+    *max_bars* bars.  Positions sharing an ambiguous bar, or hitting nearby
+    ones, therefore trigger a single fetch.  Without *fetch*, or when the
+    finer candles are ambiguous too, the stop-loss is assumed to have come
+    first.
+    """
+
+    def __init__(self, fetch: FineFetcher | None, bar_ms: int, max_bars: int = 4096, batch_bars: int = 8):
+        if bar_ms <= 0:
+            raise ValueError("bar_ms must be greater than zero")
+        if batch_bars < 1:
+            raise ValueError("batch_bars must be at least 1")
+        self.fetch = fetch
+        self.bar_ms = bar_ms
+        self.max_bars = max_bars
+        self.batch_bars = batch_bars
+        self.ambiguous = 0
+        self.fetches = 0
+        self.unresolved = 0
+        self._bars: "OrderedDict[int, CandleFrame]" = OrderedDict()
+
+    def stats(self) -> Dict[str, int]:
+        return {"ambiguous": self.ambiguous, "fetches": self.fetches, "unresolved": self.unresolved}
+
+    def fine_candles(self, bar_start_ms: int) -> CandleFrame:
+        frame = self._bars.get(bar_start_ms)
+        if frame is not None:
+            self._bars.move_to_end(bar_start_ms)
+            return frame
+        if self.fetch is None:
+            return CandleFrame.empty()
+        block_start = bar_start_ms - (bar_start_ms // self.bar_ms) % self.batch_bars * self.bar_ms
+        self.fetches += 1
+        try:
+            block = self.fetch(block_start, block_start + self.batch_bars * self.bar_ms)
+        except Exception as exc:  # noqa: BLE001 - fall back to the conservative assumption
+            LOGGER.warning("Could not fetch intrabar candles at %s: %s", bar_start_ms, exc)
+            return CandleFrame.empty()
+        for start in range(block_start, block_start + self.batch_bars * self.bar_ms, self.bar_ms):
+            if start not in self._bars:
+                self._bars[start] = block.between(start, start + self.bar_ms)
+        frame = self._bars[bar_start_ms]
+        self._bars.move_to_end(bar_start_ms)
+        while len(self._bars) > self.max_bars:
+            self._bars.popitem(last=False)
+        return frame
+
+    def first_hit(self, bar_start_ms: int, take_profit: float, stop_loss: float) -> Tuple[str, float]:
+        """Return the level reached first inside the bar and its fill price."""
+
+        self.ambiguous += 1
+        fine = self.fine_candles(bar_start_ms)
+        hits = np.flatnonzero((fine.high >= take_profit) | (fine.low <= stop_loss))
+        if hits.size:
+            index = int(hits[0])
+            level, price = _bar_outcome(
+                float(fine.open[index]),
+                float(fine.high[index]),
+                float(fine.low[index]),
+                take_profit,
+                stop_loss,
+            )
+            if level is not None:
+                return level, price
+        self.unresolved += 1
+        return STOP_LOSS, stop_loss
+
+
+def find_intrabar_exit(
+    frame: CandleFrame,
+    entry_index: int,
+    take_profit: float,
+    stop_loss: float,
+    resolver: IntrabarResolver,
+) -> Tuple[int, float]:
+    """Return the exit bar and fill price of a position opened at *entry_index*.
+
+    The search is :func:`~backtester.positions.first_level_hit`, as in
+    :func:`~backtester.backtest._find_exit`, but against highs and lows.  A
+    position that never reaches a level is closed at the final close, and one
+    opened on the final bar is reported as ``(len(frame), nan)``.
+    """
+
+    size = len(frame)
+    index = first_level_hit(frame.high, frame.low, entry_index + 1, take_profit, stop_loss)
+    if index < size:
+        level, price = _bar_outcome(
+            float(frame.open[index]),
+            float(frame.high[index]),
+            float(frame.low[index]),
+            take_profit,
+            stop_loss,
+        )
+        if level is None:
+            _, price = resolver.first_hit(int(frame.ticks[index]), take_profit, stop_loss)
+        return index, price
+    if entry_index < size - 1:
+        return size - 1, float(frame.close[size - 1])
+    return size, float("nan")
+
+
+def deribit_fine_fetcher(instrument_name: str, resolution: str = "1", **fetch_kwargs: object) -> FineFetcher:
+    """Return a :data:`FineFetcher` downloading *resolution* candles of *instrument_name*.
+
+    Requests go through :func:`~backtester.api.fetch_candles`, so fetched
+    ranges are also kept in the local candle store.
+    """
+
+    from .api import fetch_candles
+
+    def fetch(start_ms: int, end_ms: int) -> CandleFrame:
+        return fetch_candles(
+            instrument_name,
+            resolution,
+            from_epoch_ms(start_ms),
+            from_epoch_ms(end_ms),
+            **fetch_kwargs,  # type: ignore[arg-type]
+        )
+
+    return fetch
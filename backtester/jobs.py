@@ -0,0 +1,245 @@
+"""Background job queue for long-running backtests.
+
+Jobs run on a bounded :class:`~concurrent.futures.ProcessPoolExecutor` so
+the HTTP server threads only enqueue work and poll for results.  Workers
+report progress through a multiprocessing queue that a listener thread in
+the parent drains into the job table.
+
+Workers are spawned rather than forked: a fork of the threaded server would
+inherit whatever locks, pooled sockets and in-flight downloads its other
+threads held at that moment.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+# Cancelled while running: the worker keeps going until the job ends, so it still holds a slot.
+CANCELLING = "cancelling"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATUSES = frozenset({SUCCEEDED, FAILED, CANCELLED})
+
+ProgressCallback = Callable[[float], None]
+JobFunction = Callable[..., Tuple[HTTPStatus, Dict[str, Any]]]
+ExecutorFactory = Callable[..., Executor]
+
+_CONTEXT = multiprocessing.get_context("spawn")
+
+
+class QueueFullError(Exception):
+    """Raised when the queue already holds ``max_pending`` unfinished jobs."""
+
+
+@dataclass
+class Job:
+    id: str
+    created_at: float
+    status: str = QUEUED
+    progress: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    future: Optional[Future] = field(default=None, repr=False, compare=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "progress": self.progress,
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+_PROGRESS_QUEUE: Any = None
+
+
+def _init_worker(progress_queue: Any) -> None:
+    global _PROGRESS_QUEUE
+
+    _PROGRESS_QUEUE = progress_queue
+
+
+def spawn_pool(**kwargs: Any) -> Executor:
+    """Build a :class:`ProcessPoolExecutor` whose workers start from a fresh interpreter."""
+
+    return ProcessPoolExecutor(mp_context=_CONTEXT, **kwargs)
+
+
+def _report(job_id: str, status: str, progress: float) -> None:
+    if _PROGRESS_QUEUE is not None:
+        _PROGRESS_QUEUE.put((job_id, status, progress))
+
+
+def _run_job(func: JobFunction, job_id: str, payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+    _report(job_id, RUNNING, 0.0)
+    status, body = func(payload, progress=lambda fraction: _report(job_id, RUNNING, fraction))
+    return int(status), body
+
+
+class JobQueue:
+    """Run *func* for submitted payloads in a worker pool and track the results.
+
+    Args:
+        func: Picklable callable ``func(payload, progress=callback)`` returning
+            an ``(HTTPStatus, body)`` pair, e.g. ``run_backtest_response``.
+        max_workers: Size of the worker pool.
+        max_pending: Maximum queued plus running jobs before
+            :meth:`submit` raises :class:`QueueFullError`.
+        ttl: Seconds a finished job stays available for polling.
+        executor_factory: Builds the executor; receives ``max_workers``,
+            ``initializer`` and ``initargs`` keyword arguments.
+    """
+
+    def __init__(
+        self,
+        func: JobFunction,
+        *,
+        max_workers: int = 2,
+        max_pending: int = 16,
+        ttl: float = 600.0,
+        executor_factory: ExecutorFactory = spawn_pool,
+        clock: Callable[[], float] = time.time,
+    ):
+        if max_pending < max_workers:
+            raise ValueError("max_pending must be at least max_workers")
+        self.func = func
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._clock = clock
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.RLock()
+        self._progress: Any = _CONTEXT.Queue()
+        self._executor = executor_factory(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(self._progress,),
+        )
+        self._listener = threading.Thread(target=self._listen, name="job-progress", daemon=True)
+        self._listener.start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                message = self._progress.get()
+            except (EOFError, OSError):  # pragma: no cover - queue closed during shutdown
+                return
+            if message is None:
+                return
+            job_id, status, progress = message
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job.finished or job.status == CANCELLING:
+                    continue
+                if job.status == QUEUED:
+                    job.started_at = self._clock()
+                job.status = status
+                job.progress = max(job.progress, min(1.0, float(progress)))
+
+    def _active_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def submit(self, payload: Dict[str, Any]) -> Job:
+        with self._lock:
+            self.cleanup()
+            if self._active_count() >= self.max_pending:
+                raise QueueFullError(f"{self.max_pending} jobs are already pending")
+            job = Job(id=uuid.uuid4().hex, created_at=self._clock())
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(_run_job, self.func, job.id, payload)
+        job.future.add_done_callback(lambda future, job_id=job.id: self._complete(job_id, future))
+        return job
+
+    def _complete(self, job_id: str, future: Future) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return
+            job.finished_at = self._clock()
+            if future.cancelled() or job.status == CANCELLING:
+                job.status = CANCELLED
+                return
+            error = future.exception()
+            if error is not None:
+                LOGGER.error("Job %s failed", job_id, exc_info=error)
+                job.status = FAILED
+                job.error = str(error)
+                return
+            status, body = future.result()
+            job.progress = 1.0
+            if status < 400:
+                job.status = SUCCEEDED
+                job.result = body
+            else:
+                job.status = FAILED
+                job.error = str(body.get("detail", body))
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            self.cleanup()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Job | None:
+        """Cancel a job.
+
+        A queued job is cancelled at once.  A running job cannot be stopped:
+        it stays ``cancelling``, and counts against ``max_pending``, until its
+        worker finishes, and its result is then discarded.
+        """
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished or job.status == CANCELLING:
+                return job
+            if job.future is None:
+                job.status = CANCELLED
+                job.finished_at = self._clock()
+            elif not job.future.cancel():
+                job.status = CANCELLING
+            # A successful cancel() has already run _complete, which marked the job cancelled.
+            return job
+
+    def cleanup(self) -> int:
+        """Drop finished jobs older than the TTL and return how many were removed."""
+
+        with self._lock:
+            cutoff = self._clock() - self.ttl
+            expired = [
+                job_id
+                for job_id, job in self._jobs.items()
+                if job.finished and job.finished_at is not None and job.finished_at < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+            return len(expired)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        try:
+            self._progress.put(None)
+        except (ValueError, OSError):  # pragma: no cover - queue already closed
+            pass
+        self._listener.join(timeout=1.0)
+        self._progress.close()
@@ -0,0 +1,202 @@
+"""Compact, array-backed storage of closed trades.
+
+A :class:`~backtester.models.TradeResult` wraps a :class:`Position` with two
+timestamps, which adds up to a few hundred bytes per trade.  The
+:class:`TradeLedger` keeps every closed trade as one 64-byte row of a NumPy
+structured array instead, computes the aggregate metrics from its columns
+once, and only builds ``TradeResult`` objects for the trades a caller
+actually indexes or iterates.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterator, List, Sequence, overload
+
+import numpy as np
+
+from .models import Position, TradeResult
+from .timeutils import Timestamp, from_epoch_ms
+
+TRADE_DTYPE = np.dtype(
+    [
+        ("entry_tick", np.int64),
+        ("exit_tick", np.int64),
+        ("entry_price", np.float64),
+        ("exit_price", np.float64),
+        ("size", np.float64),
+        ("stop_loss", np.float64),
+        ("take_profit", np.float64),
+        ("profit", np.float64),
+    ]
+)
+
+
+@dataclass(frozen=True)
+class TradeStats:
+    """Aggregate metrics of a sequence of trade profits.
+
+    Trades with a profit above zero are wins and all others losses.
+    ``profit_factor`` is the gross profit over the gross loss and ``None``
+    when no trade lost money.
+    """
+
+    total_trades: int
+    wins: int
+    losses: int
+    cumulative_profit: float
+    gross_profit: float
+    gross_loss: float
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.total_trades if self.total_trades else 0.0
+
+    @property
+    def profit_factor(self) -> float | None:
+        return self.gross_profit / self.gross_loss if self.gross_loss else None
+
+    @property
+    def average_trade(self) -> float:
+        return self.cumulative_profit / self.total_trades if self.total_trades else 0.0
+
+
+def trade_stats(profits: np.ndarray) -> TradeStats:
+    """Compute :class:`TradeStats` from an array of per-trade profits."""
+
+    profits = np.asarray(profits, dtype=np.float64)
+    if not profits.size:
+        return TradeStats(0, 0, 0, 0.0, 0.0, 0.0)
+    wins = int(np.count_nonzero(profits > 0))
+    # cumsum adds in order, so the total matches summing the trades one by one.
+    return TradeStats(
+        total_trades=int(profits.size),
+        wins=wins,
+        losses=int(profits.size) - wins,
+        cumulative_profit=float(np.cumsum(profits)[-1]),
+        gross_profit=float(profits[profits > 0].sum()),
+        gross_loss=float(-profits[profits < 0].sum()),
+    )
+
+
+class TradeLedger(Sequence[TradeResult]):
+    """Closed trades stored as rows of a :data:`TRADE_DTYPE` array.
+
+    The ledger is a read-only sequence of :class:`TradeResult`; each indexed
+    or iterated trade is built on access, with ``datetime`` timestamps or,
+    when *epoch* is set, integer epoch milliseconds.  Metrics are cached
+    until the next :meth:`append`.
+    """
+
+    __slots__ = ("epoch", "_records", "_size", "_stats")
+
+    def __init__(self, capacity: int = 64, *, epoch: bool = False):
+        self.epoch = epoch
+        self._records = np.empty(max(capacity, 1), dtype=TRADE_DTYPE)
+        self._size = 0
+        self._stats: TradeStats | None = None
+
+    @classmethod
+    def from_records(cls, records: np.ndarray, *, epoch: bool = False) -> "TradeLedger":
+        ledger = cls(len(records), epoch=epoch)
+        ledger._records[: len(records)] = records
+        ledger._size = len(records)
+        return ledger
+
+    def append(
+        self,
+        entry_tick: int,
+        exit_tick: int,
+        entry_price: float,
+        exit_price: float,
+        size: float,
+        stop_loss: float | None,
+        take_profit: float | None,
+    ) -> float:
+        """Record a closed trade and return its profit."""
+
+        if self._size == self._records.shape[0]:
+            grown = np.empty(self._size * 2, dtype=TRADE_DTYPE)
+            grown[: self._size] = self._records
+            self._records = grown
+        profit = (exit_price - entry_price) * size
+        self._records[self._size] = (
+            entry_tick,
+            exit_tick,
+            entry_price,
+            exit_price,
+            size,
+            np.nan if stop_loss is None else stop_loss,
+            np.nan if take_profit is None else take_profit,
+            profit,
+        )
+        self._size += 1
+        self._stats = None
+        return profit
+
+    @property
+    def records(self) -> np.ndarray:
+        """A view of the recorded rows."""
+
+        return self._records[: self._size]
+
+    @property
+    def profits(self) -> np.ndarray:
+        return self.records["profit"]
+
+    def stats(self) -> TradeStats:
+        if self._stats is None:
+            self._stats = trade_stats(self.profits)
+        return self._stats
+
+    def _timestamp(self, tick: int) -> Timestamp:
+        return int(tick) if self.epoch else from_epoch_ms(tick)
+
+    def _trade(self, row: np.void) -> TradeResult:
+        stop_loss = float(row["stop_loss"])
+        take_profit = float(row["take_profit"])
+        position = Position(
+            entry_price=float(row["entry_price"]),
+            entry_time=self._timestamp(row["entry_tick"]),
+            size=float(row["size"]),
+            exit_price=float(row["exit_price"]),
+            exit_time=self._timestamp(row["exit_tick"]),
+            stop_loss=None if np.isnan(stop_loss) else stop_loss,
+            take_profit=None if np.isnan(take_profit) else take_profit,
+        )
+        return TradeResult(position=position, profit=float(row["profit"]))
+
+    def __len__(self) -> int:
+        return self._size
+
+    @overload
+    def __getitem__(self, index: int) -> TradeResult: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[TradeResult]: ...
+
+    def __getitem__(self, index: int | slice) -> TradeResult | List[TradeResult]:
+        if isinstance(index, slice):
+            return [self._trade(row) for row in self.records[index]]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("trade index out of range")
+        return self._trade(self._records[index])
+
+    def __iter__(self) -> Iterator[TradeResult]:
+        for row in self.records:
+            yield self._trade(row)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, TradeLedger):
+            return self.epoch == other.epoch and all(
+                np.array_equal(self.records[name], other.records[name], equal_nan=True) for name in TRADE_DTYPE.names
+            )
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"TradeLedger({self._size} trades)"
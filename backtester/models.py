@@ -2,13 +2,17 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import List, Optional
+from typing import TYPE_CHECKING, Optional, Sequence
+
+from .timeutils import Timestamp
+
+if TYPE_CHECKING:
+    from .ledger import TradeStats
 
 
 @dataclass
 class Candle:
-    timestamp: datetime
+    timestamp: Timestamp
     open: float
     high: float
     low: float
@@ -16,13 +20,13 @@ class Candle:
     volume: float
 
 
-@dataclass
+@dataclass(slots=True)
 class Position:
     entry_price: float
-    entry_time: datetime
+    entry_time: Timestamp
     size: float = 1.0
     exit_price: Optional[float] = None
-    exit_time: Optional[datetime] = None
+    exit_time: Optional[Timestamp] = None
     stop_loss: Optional[float] = None
     take_profit: Optional[float] = None
 
@@ -30,7 +34,7 @@ class Position:
         return self.exit_price is None
 
 
-@dataclass
+@dataclass(slots=True)
 class TradeResult:
     position: Position
     profit: float
@@ -38,11 +42,26 @@ class TradeResult:
 
 @dataclass
 class BacktestReport:
-    trades: List[TradeResult] = field(default_factory=list)
+    """Result of a backtest.
+
+    The engines record *trades* in a :class:`~backtester.ledger.TradeLedger`,
+    whose metrics are computed once and cached; any other sequence of
+    :class:`TradeResult` works too, but is re-aggregated on every access.
+    """
+
+    trades: Sequence[TradeResult] = field(default_factory=list)
     final_cash: float = 0.0
     wins: int = 0
     losses: int = 0
 
+    @property
+    def stats(self) -> "TradeStats":
+        from .ledger import TradeLedger, trade_stats
+
+        if isinstance(self.trades, TradeLedger):
+            return self.trades.stats()
+        return trade_stats([trade.profit for trade in self.trades])
+
     @property
     def total_trades(self) -> int:
         return len(self.trades)
@@ -55,4 +74,12 @@ class BacktestReport:
 
     @property
     def cumulative_profit(self) -> float:
-        return sum(trade.profit for trade in self.trades)
+        return self.stats.cumulative_profit
+
+    @property
+    def profit_factor(self) -> float | None:
+        return self.stats.profit_factor
+
+    @property
+    def average_trade(self) -> float:
+        return self.stats.average_trade
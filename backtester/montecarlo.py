@@ -0,0 +1,153 @@
+"""Monte Carlo robustness analysis of a backtest's trade sequence.
+
+A single run yields one ordering of its trades.  Resampling the per-trade
+profits thousands of times shows how much the final equity, drawdown and
+win rate depend on that particular sequence.  Every simulation is a row of
+one NumPy matrix, so the resamples are generated and evaluated without a
+Python-level loop per iteration.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Sequence
+
+import numpy as np
+
+from .ledger import TradeLedger
+from .models import BacktestReport, TradeResult
+
+METHODS = ("bootstrap", "shuffle")
+DEFAULT_PERCENTILES = (5.0, 25.0, 50.0, 75.0, 95.0)
+
+# Simulation matrices are built in row batches of about this many cells (8 bytes each).
+_BATCH_CELLS = 1 << 22
+
+
+@dataclass
+class MonteCarloResult:
+    """Per-simulation outcomes of :func:`simulate`.
+
+    ``max_drawdown`` is the largest peak-to-trough fall of each simulated
+    equity curve as a fraction of the peak.
+    """
+
+    method: str
+    iterations: int
+    seed: int | None
+    initial_cash: float
+    trades: int
+    final_equity: np.ndarray
+    max_drawdown: np.ndarray
+    win_rate: np.ndarray
+
+    @property
+    def probability_of_loss(self) -> float:
+        if not self.iterations:
+            return 0.0
+        return float(np.mean(self.final_equity < self.initial_cash))
+
+    def distribution(self, name: str, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, float]:
+        """Mean, standard deviation, extremes and *percentiles* of one outcome array."""
+
+        values = getattr(self, name)
+        if not values.size:
+            return {}
+        summary = {
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "min": float(values.min()),
+            "max": float(values.max()),
+        }
+        for percentile, value in zip(percentiles, np.percentile(values, percentiles).tolist()):
+            summary[f"p{percentile:g}"] = value
+        return summary
+
+    def to_dict(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "iterations": self.iterations,
+            "seed": self.seed,
+            "trades": self.trades,
+            "probability_of_loss": self.probability_of_loss,
+            "final_equity": self.distribution("final_equity", percentiles),
+            "max_drawdown": self.distribution("max_drawdown", percentiles),
+            "win_rate": self.distribution("win_rate", percentiles),
+        }
+
+
+def _max_drawdown(initial_cash: float, equity: np.ndarray) -> np.ndarray:
+    peaks = np.maximum.accumulate(np.maximum(equity, initial_cash), axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = np.where(peaks > 0, (peaks - equity) / peaks, 0.0)
+    return drawdown.max(axis=1)
+
+
+def simulate(
+    profits: Iterable[float] | Sequence[TradeResult] | BacktestReport,
+    initial_cash: float | None = None,
+    *,
+    iterations: int = 1000,
+    method: str = "bootstrap",
+    seed: int | None = 0,
+) -> MonteCarloResult:
+    """Resample a trade sequence *iterations* times and evaluate each path.
+
+    Args:
+        profits: Per-trade profits, the trades themselves or a whole report.
+        initial_cash: Starting equity; defaults to the report's
+            ``final_cash`` minus its cumulative profit when a report is
+            given, otherwise ``0``.
+        iterations: Number of simulated trade sequences.
+        method: ``"bootstrap"`` draws trades with replacement, so final
+            equity and win rate vary as well; ``"shuffle"`` only reorders
+            the actual trades, which changes the drawdown but not the totals.
+        seed: Seed for :func:`numpy.random.default_rng`; the same seed
+            always gives the same distributions.
+    """
+
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {', '.join(METHODS)}")
+    if iterations < 1:
+        raise ValueError("iterations must be at least 1")
+
+    if isinstance(profits, BacktestReport):
+        if initial_cash is None:
+            initial_cash = profits.final_cash - profits.cumulative_profit
+        profits = profits.trades
+    if isinstance(profits, TradeLedger):
+        values = profits.profits
+    else:
+        values = np.asarray(
+            [item.profit if isinstance(item, TradeResult) else item for item in profits],
+            dtype=np.float64,
+        )
+    start = float(initial_cash or 0.0)
+    count = values.shape[0]
+
+    final_equity = np.full(iterations, start)
+    max_drawdown = np.zeros(iterations)
+    win_rate = np.zeros(iterations)
+    if count:
+        rng = np.random.default_rng(seed)
+        batch = max(1, _BATCH_CELLS // count)
+        for first in range(0, iterations, batch):
+            rows = min(batch, iterations - first)
+            if method == "bootstrap":
+                samples = values[rng.integers(0, count, size=(rows, count))]
+            else:
+                samples = rng.permuted(np.broadcast_to(values, (rows, count)), axis=1)
+            equity = start + np.cumsum(samples, axis=1)
+            final_equity[first : first + rows] = equity[:, -1]
+            max_drawdown[first : first + rows] = _max_drawdown(start, equity)
+            win_rate[first : first + rows] = np.count_nonzero(samples > 0, axis=1) / count
+
+    return MonteCarloResult(
+        method=method,
+        iterations=iterations,
+        seed=seed,
+        initial_cash=start,
+        trades=count,
+        final_equity=final_equity,
+        max_drawdown=max_drawdown,
+        win_rate=win_rate,
+    )
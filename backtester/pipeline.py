@@ -0,0 +1,75 @@
+"""Overlap candle downloads with backtesting.
+
+:class:`PrefetchedPages` drains a page iterator, such as
+:func:`~backtester.api.iter_candle_pages`, on a background thread into a
+bounded queue.  The consumer, typically :meth:`Backtester.run_pages
+<backtester.backtest.Backtester.run_pages>`, works on one page while the
+next ones download, so a run takes roughly as long as the slower of the two
+instead of their sum, and at most *maxsize* pages wait in memory.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Iterable, Iterator
+
+from .frame import CandleFrame
+
+
+class PrefetchedPages:
+    """Iterate pages produced by a background thread through a bounded queue.
+
+    An exception raised while producing pages is re-raised to the consumer
+    once the pages before it have been consumed.  Closing the source (or
+    leaving its ``with`` block) stops the producer early.
+    """
+
+    _DONE = object()
+
+    def __init__(self, pages: Iterable[CandleFrame], maxsize: int = 4):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be greater than zero")
+        self._pages = pages
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=maxsize)
+        self._closed = threading.Event()
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._produce, name="candle-pages", daemon=True)
+        self._thread.start()
+
+    def _produce(self) -> None:
+        try:
+            for page in self._pages:
+                if self._closed.is_set():
+                    break
+                self._put(page)
+        except BaseException as exc:  # noqa: BLE001 - handed over to the consumer
+            self._error = exc
+        finally:
+            self._put(self._DONE)
+
+    def _put(self, item: object) -> None:
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def __iter__(self) -> Iterator[CandleFrame]:
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                if self._error is not None:
+                    raise self._error
+                return
+            yield item  # type: ignore[misc]
+
+    def close(self) -> None:
+        self._closed.set()
+        self._thread.join(timeout=1.0)
+
+    def __enter__(self) -> "PrefetchedPages":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,234 @@
+"""Backtest several instruments that share one cash balance.
+
+Each instrument's moving-average crossover signals are computed
+independently, in parallel, from its own candles.  A single event loop then
+walks the signals of every instrument in timeline order, allocating the
+shared cash and enforcing one global ``max_open_positions`` limit.
+"""
+from __future__ import annotations
+
+import heapq
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from .backtest import TIMESTAMP_MODES, _find_exit
+from .config import BacktestConfig
+from .frame import CandleFrame, as_frame
+from .models import BacktestReport, Candle, Position, TradeResult
+from .strategy import crossover_mask, moving_average
+
+
+@dataclass
+class PortfolioReport(BacktestReport):
+    """Combined report of a portfolio run.
+
+    ``instruments[i]`` names the instrument of ``trades[i]``.  ``ticks`` is
+    the common timeline (epoch milliseconds) and ``equity`` the portfolio
+    value on each of its bars: free cash plus open positions marked to the
+    latest close of their instrument.
+    """
+
+    instruments: List[str] = field(default_factory=list)
+    ticks: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    equity: np.ndarray = field(default_factory=lambda: np.empty(0))
+
+    def by_instrument(self) -> Dict[str, Dict[str, Any]]:
+        """Trade count, wins, losses and profit per instrument."""
+
+        summary: Dict[str, Dict[str, Any]] = {}
+        for instrument, trade in zip(self.instruments, self.trades):
+            entry = summary.setdefault(instrument, {"total_trades": 0, "wins": 0, "losses": 0, "profit": 0.0})
+            entry["total_trades"] += 1
+            entry["wins" if trade.profit > 0 else "losses"] += 1
+            entry["profit"] += trade.profit
+        return summary
+
+
+def fetch_portfolio(
+    instruments: Sequence[str],
+    resolution: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    *,
+    max_workers: int | None = None,
+    fetch: Callable[..., CandleFrame] | None = None,
+    **fetch_kwargs: Any,
+) -> Dict[str, CandleFrame]:
+    """Fetch the candles of every instrument concurrently.
+
+    Extra keyword arguments (such as ``store``) are passed on to
+    :func:`~backtester.api.fetch_candles`, or to *fetch* when given.
+    """
+
+    if fetch is None:
+        from .api import fetch_candles as fetch
+
+    def load(instrument: str) -> CandleFrame:
+        return fetch(instrument_name=instrument, resolution=resolution, start=start, end=end, **fetch_kwargs)
+
+    with ThreadPoolExecutor(max_workers=max_workers or min(8, len(instruments)) or 1) as executor:
+        return dict(zip(instruments, executor.map(load, instruments)))
+
+
+def _signals(frame: CandleFrame, config: BacktestConfig) -> np.ndarray:
+    short_ma = moving_average(frame.close, config.short_window)
+    long_ma = moving_average(frame.close, config.long_window)
+    return np.flatnonzero(crossover_mask(short_ma, long_ma))
+
+
+class PortfolioBacktester:
+    """Run the moving-average crossover strategy on several instruments at once.
+
+    Strategy parameters, ``initial_cash`` and ``max_open_positions`` come from
+    *config*; its ``instrument_name`` is ignored.  Every new position is
+    allotted an equal share of the free cash across the remaining open
+    position slots, and the cash it ties up is released, with its profit,
+    when the position closes.  A position is closed at the first later close
+    of its instrument that reaches its take-profit or stop-loss, or on that
+    instrument's final bar; no position is opened on an instrument's final bar.
+
+    On each bar of the timeline exits are processed before entries, and
+    simultaneous entries follow the order of the instruments passed to
+    :meth:`run`.
+    """
+
+    def __init__(
+        self,
+        config: BacktestConfig,
+        *,
+        workers: int | None = None,
+        timestamps: str = "datetime",
+    ):
+        if timestamps not in TIMESTAMP_MODES:
+            raise ValueError(f"timestamps must be one of {', '.join(TIMESTAMP_MODES)}")
+        config.validate()
+        self.config = config
+        self.workers = workers
+        self.timestamps = timestamps
+
+    def run(self, candles: Mapping[str, Iterable[Candle] | CandleFrame]) -> PortfolioReport:
+        instruments = list(candles)
+        frames = [as_frame(candles[instrument]) for instrument in instruments]
+        cash = float(self.config.initial_cash)
+        if not frames:
+            return PortfolioReport(final_cash=cash)
+
+        # The moving averages are plain array work, which NumPy runs without holding the GIL.
+        workers = self.workers or min(len(frames), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            signals = list(executor.map(lambda frame: _signals(frame, self.config), frames))
+
+        timeline = np.unique(np.concatenate([frame.ticks for frame in frames]))
+        positions_on_timeline = [np.searchsorted(timeline, frame.ticks) for frame in frames]
+
+        event_times = np.concatenate([positions_on_timeline[k][bars] for k, bars in enumerate(signals)])
+        event_instruments = np.concatenate([np.full(bars.shape[0], k) for k, bars in enumerate(signals)])
+        event_bars = np.concatenate(signals)
+        order = np.lexsort((event_instruments, event_times))
+
+        max_open = self.config.max_open_positions
+        # (exit time, sequence, instrument, entry bar, exit bar, size, allotment)
+        open_positions: List[Tuple[int, int, int, int, int, float, float]] = []
+        closed: List[Tuple[int, int, int, int, int, float, float]] = []
+        sequence = 0
+        for time_index, instrument, bar in zip(
+            event_times[order].tolist(),
+            event_instruments[order].tolist(),
+            event_bars[order].tolist(),
+        ):
+            while open_positions and open_positions[0][0] <= time_index:
+                position = heapq.heappop(open_positions)
+                cash += position[5] * float(frames[position[2]].close[position[4]])
+                closed.append(position)
+            closes = frames[instrument].close
+            if len(open_positions) >= max_open or bar == closes.shape[0] - 1:
+                continue
+            allotment = cash / (max_open - len(open_positions))
+            if allotment <= 0:
+                continue
+            entry_price = float(closes[bar])
+            exit_bar = _find_exit(
+                closes,
+                bar,
+                entry_price * (1 + self.config.take_profit),
+                entry_price * (1 - self.config.stop_loss),
+            )
+            exit_time = int(positions_on_timeline[instrument][exit_bar])
+            cash -= allotment
+            heapq.heappush(
+                open_positions,
+                (exit_time, sequence, instrument, bar, exit_bar, allotment / entry_price, allotment),
+            )
+            sequence += 1
+        while open_positions:
+            position = heapq.heappop(open_positions)
+            cash += position[5] * float(frames[position[2]].close[position[4]])
+            closed.append(position)
+
+        trades, trade_instruments = self._trades(closed, instruments, frames)
+        wins = sum(1 for trade in trades if trade.profit > 0)
+        return PortfolioReport(
+            trades=trades,
+            final_cash=cash,
+            wins=wins,
+            losses=len(trades) - wins,
+            instruments=trade_instruments,
+            ticks=timeline,
+            equity=self._equity(closed, frames, timeline, positions_on_timeline),
+        )
+
+    def _trades(
+        self,
+        closed: List[Tuple[int, int, int, int, int, float, float]],
+        instruments: List[str],
+        frames: List[CandleFrame],
+    ) -> Tuple[List[TradeResult], List[str]]:
+        epoch = self.timestamps == "epoch"
+        trades: List[TradeResult] = []
+        names: List[str] = []
+        for _, _, instrument, entry_bar, exit_bar, size, _ in closed:
+            frame = frames[instrument]
+            entry_price = float(frame.close[entry_bar])
+            position = Position(
+                entry_price=entry_price,
+                entry_time=frame.timestamp_at(entry_bar, epoch),
+                size=size,
+                exit_price=float(frame.close[exit_bar]),
+                exit_time=frame.timestamp_at(exit_bar, epoch),
+                take_profit=entry_price * (1 + self.config.take_profit),
+                stop_loss=entry_price * (1 - self.config.stop_loss),
+            )
+            trades.append(TradeResult(position=position, profit=(position.exit_price - entry_price) * size))
+            names.append(instruments[instrument])
+        return trades, names
+
+    def _equity(
+        self,
+        closed: List[Tuple[int, int, int, int, int, float, float]],
+        frames: List[CandleFrame],
+        timeline: np.ndarray,
+        positions_on_timeline: List[np.ndarray],
+    ) -> np.ndarray:
+        size = timeline.shape[0]
+        cash_changes = np.zeros(size)
+        unit_changes = np.zeros((len(frames), size))
+        for exit_time, _, instrument, entry_bar, exit_bar, units, allotment in closed:
+            entry_time = int(positions_on_timeline[instrument][entry_bar])
+            cash_changes[entry_time] -= allotment
+            cash_changes[exit_time] += units * float(frames[instrument].close[exit_bar])
+            unit_changes[instrument, entry_time] += units
+            unit_changes[instrument, exit_time] -= units
+
+        equity = self.config.initial_cash + np.cumsum(cash_changes)
+        for instrument, frame in enumerate(frames):
+            if not len(frame):
+                continue
+            # Carry each instrument's last close forward over bars where only other instruments trade.
+            latest = np.clip(np.searchsorted(frame.ticks, timeline, side="right") - 1, 0, None)
+            equity += np.cumsum(unit_changes[instrument]) * frame.close[latest]
+        return equity
@@ -0,0 +1,110 @@
+"""Indexed book of open positions, and the exit search shared by the array engines."""
+from __future__ import annotations
+
+import heapq
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from .models import Position
+
+Entry = Tuple[int, Position]
+
+# First window scanned when searching for a position's exit; it grows
+# geometrically so short trades stay cheap and long ones need few passes.
+EXIT_SEARCH_CHUNK = 256
+
+
+def first_level_hit(highs: np.ndarray, lows: np.ndarray, start: int, take_profit: float, stop_loss: float) -> int:
+    """Return the first bar from *start* whose high reaches *take_profit* or whose low reaches *stop_loss*.
+
+    Pass the closes as both *highs* and *lows* to compare closes only.
+    Returns ``len(highs)`` when no bar reaches either level.
+    """
+
+    size = highs.shape[0]
+    chunk = EXIT_SEARCH_CHUNK
+    while start < size:
+        stop = min(size, start + chunk)
+        hits = np.flatnonzero((highs[start:stop] >= take_profit) | (lows[start:stop] <= stop_loss))
+        if hits.size:
+            return start + int(hits[0])
+        start = stop
+        chunk *= 4
+    return size
+
+
+class PositionBook:
+    """Open positions indexed by their take-profit and stop-loss prices.
+
+    A min-heap on take-profit and a max-heap on stop-loss mean each bar only
+    touches the positions that actually trigger, instead of scanning every
+    open position.  Positions are identified by an increasing sequence
+    number, so triggered positions are always returned in the order they
+    were opened.  Heap entries for positions closed through the other heap
+    are discarded lazily and compacted once they outnumber live positions.
+    """
+
+    def __init__(self) -> None:
+        self._open: Dict[int, Position] = {}
+        self._take_profits: List[Tuple[float, int]] = []
+        self._stop_losses: List[Tuple[float, int]] = []
+        self._next_sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._open)
+
+    def __iter__(self) -> Iterator[Position]:
+        return iter(list(self._open.values()))
+
+    def items(self) -> List[Entry]:
+        """Return ``(sequence, position)`` pairs in the order they were opened."""
+
+        return list(self._open.items())
+
+    def add(self, position: Position) -> int:
+        sequence = self._next_sequence
+        self._next_sequence += 1
+        self._open[sequence] = position
+        if position.take_profit is not None:
+            heapq.heappush(self._take_profits, (position.take_profit, sequence))
+        if position.stop_loss is not None:
+            heapq.heappush(self._stop_losses, (-position.stop_loss, sequence))
+        return sequence
+
+    def pop_triggered(self, price: float) -> List[Entry]:
+        """Remove and return positions whose take-profit or stop-loss *price* reaches."""
+
+        triggered: List[int] = []
+        take_profits = self._take_profits
+        while take_profits and take_profits[0][0] <= price:
+            sequence = heapq.heappop(take_profits)[1]
+            if sequence in self._open:
+                triggered.append(sequence)
+        stop_losses = self._stop_losses
+        while stop_losses and -stop_losses[0][0] >= price:
+            sequence = heapq.heappop(stop_losses)[1]
+            if sequence in self._open:
+                triggered.append(sequence)
+        if not triggered:
+            return []
+
+        entries = [(sequence, self._open.pop(sequence)) for sequence in sorted(set(triggered))]
+        if len(take_profits) + len(stop_losses) > 4 * len(self._open) + 64:
+            self._compact()
+        return entries
+
+    def pop_all(self) -> List[Entry]:
+        """Remove and return every open position in opening order."""
+
+        entries = list(self._open.items())
+        self._open.clear()
+        self._take_profits.clear()
+        self._stop_losses.clear()
+        return entries
+
+    def _compact(self) -> None:
+        self._take_profits = [entry for entry in self._take_profits if entry[1] in self._open]
+        self._stop_losses = [entry for entry in self._stop_losses if entry[1] in self._open]
+        heapq.heapify(self._take_profits)
+        heapq.heapify(self._stop_losses)
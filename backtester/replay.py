@@ -0,0 +1,118 @@
+"""Drive the incremental engine from a live or replayed candle source."""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from .backtest import Backtester
+from .frame import CandleFrame
+from .models import BacktestReport, Candle, TradeResult
+from .timeutils import to_epoch_ms
+
+StepCallback = Callable[[Candle, List[TradeResult]], None]
+
+
+class SimulatedFeed:
+    """Publish candles from a background thread as a stand-in for a live feed.
+
+    Candles are pushed into a bounded queue, optionally *delay* seconds
+    apart, and iterating the feed blocks until the next one arrives.  Closing
+    the feed stops the publisher and ends iteration.
+    """
+
+    _DONE = object()
+
+    def __init__(
+        self,
+        candles: Iterable[Candle] | CandleFrame,
+        delay: float = 0.0,
+        maxsize: int = 1024,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self._candles = candles
+        self._delay = delay
+        self._sleep = sleep
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=maxsize)
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._publish, name="simulated-feed", daemon=True)
+        self._thread.start()
+
+    def _publish(self) -> None:
+        try:
+            for candle in self._candles:
+                if self._closed.is_set():
+                    break
+                if self._delay:
+                    self._sleep(self._delay)
+                self._put(candle)
+        finally:
+            self._put(self._DONE)
+
+    def _put(self, item: object) -> None:
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def __iter__(self) -> Iterator[Candle]:
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                return
+            yield item  # type: ignore[misc]
+
+    def close(self) -> None:
+        self._closed.set()
+        self._thread.join(timeout=1.0)
+
+    def __enter__(self) -> "SimulatedFeed":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def replay(
+    source: Iterable[Candle] | CandleFrame,
+    backtester: Backtester,
+    *,
+    speed: Optional[float] = None,
+    on_step: StepCallback | None = None,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+) -> BacktestReport:
+    """Feed *source* through :meth:`Backtester.step` and return the final snapshot.
+
+    Args:
+        source: Candles in time order, e.g. a :class:`SimulatedFeed` or a frame.
+        backtester: Engine to drive; its incremental state is reset first.
+        speed: ``None`` processes candles as fast as they arrive.  Otherwise
+            candles are paced by their timestamps, ``1.0`` being wall-clock
+            speed and ``60.0`` replaying an hour of history per minute.
+        on_step: Optional callback receiving each candle and the trades it closed.
+    """
+
+    if speed is not None and speed <= 0:
+        raise ValueError("speed must be positive")
+
+    backtester.reset()
+    started_at: float | None = None
+    first_ms: int | None = None
+    for candle in source:
+        if speed is not None:
+            candle_ms = to_epoch_ms(candle.timestamp)
+            if started_at is None or first_ms is None:
+                started_at, first_ms = clock(), candle_ms
+            else:
+                due = started_at + (candle_ms - first_ms) / 1000 / speed
+                wait = due - clock()
+                if wait > 0:
+                    sleep(wait)
+        closed = backtester.step(candle)
+        if on_step is not None:
+            on_step(candle, closed)
+    return backtester.snapshot()
@@ -0,0 +1,126 @@
+"""Coalesce concurrent downloads of overlapping candle ranges.
+
+The HTTP server handles every request on its own thread, so several users
+opening the same chart would each download the same range from Deribit.
+:class:`SingleFlight` tracks the ranges being downloaded per key: a caller
+whose range overlaps one already in flight waits for that download and
+slices its share out of the result, and only downloads the parts nobody is
+fetching yet.
+"""
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, List, Tuple
+
+import numpy as np
+
+from .store import COLUMNS, Columns, empty_columns, normalize_columns
+
+# Downloads the candles with ``start_ms <= tick < end_ms``.
+RangeDownload = Callable[[int, int], Columns]
+
+
+class _Flight:
+    __slots__ = ("start", "end", "future")
+
+    def __init__(self, start: int, end: int):
+        self.start = start
+        self.end = end
+        self.future: "Future[Columns]" = Future()
+
+
+def _slice(columns: Columns, start_ms: int, end_ms: int) -> Columns:
+    lo, hi = np.searchsorted(columns["ticks"], (start_ms, end_ms))
+    return {name: columns[name][lo:hi] for name in COLUMNS}
+
+
+class SingleFlight:
+    """Share in-flight range downloads between concurrent callers.
+
+    Flights registered under one key never overlap: each caller only
+    downloads the gaps between the flights that were already in progress
+    when it arrived, so together the pieces cover its range exactly.  A
+    failed download raises in every caller that was waiting for it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, List[_Flight]] = {}
+        self.downloads = 0
+        self.coalesced = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Ranges downloaded, and fetches that joined at least one download in flight."""
+
+        return {"downloads": self.downloads, "coalesced": self.coalesced}
+
+    def in_flight(self, key: Hashable) -> List[Tuple[int, int]]:
+        with self._lock:
+            return sorted((flight.start, flight.end) for flight in self._flights.get(key, ()))
+
+    def fetch(self, key: Hashable, start_ms: int, end_ms: int, download: RangeDownload) -> Columns:
+        """Return the candles of ``[start_ms, end_ms)``, downloading only what is not in flight."""
+
+        if start_ms >= end_ms:
+            return download(start_ms, end_ms)
+        with self._lock:
+            flights = self._flights.setdefault(key, [])
+            shared = sorted(
+                (flight for flight in flights if flight.start < end_ms and flight.end > start_ms),
+                key=lambda flight: flight.start,
+            )
+            own: List[_Flight] = []
+            cursor = start_ms
+            for flight in shared:
+                if flight.start > cursor:
+                    own.append(_Flight(cursor, flight.start))
+                cursor = max(cursor, flight.end)
+            if cursor < end_ms:
+                own.append(_Flight(cursor, end_ms))
+            flights.extend(own)
+            self.downloads += len(own)
+            if shared:
+                self.coalesced += 1
+
+        self._run(key, own, download)
+        # Slice even an unshared download so the result never depends on what else was in flight.
+        pieces = sorted(shared + own, key=lambda flight: flight.start)
+        parts = [
+            _slice(flight.future.result(), max(flight.start, start_ms), min(flight.end, end_ms)) for flight in pieces
+        ]
+        if not parts:
+            return empty_columns()
+        return normalize_columns({name: np.concatenate([part[name] for part in parts]) for name in COLUMNS})
+
+    def _run(self, key: Hashable, own: List[_Flight], download: RangeDownload) -> None:
+        error: BaseException | None = None
+        for flight in own:
+            try:
+                if error is None:
+                    flight.future.set_result(download(flight.start, flight.end))
+                else:
+                    flight.future.set_exception(error)
+            except BaseException as exc:  # noqa: BLE001 - handed to every waiting caller
+                error = exc
+                flight.future.set_exception(exc)
+            finally:
+                self._land(key, flight)
+
+    def _land(self, key: Hashable, flight: _Flight) -> None:
+        with self._lock:
+            flights = self._flights.get(key)
+            if flights is None:
+                return
+            flights.remove(flight)
+            if not flights:
+                del self._flights[key]
+
+
+_DEFAULT_SINGLE_FLIGHT = SingleFlight()
+
+
+def default_single_flight() -> SingleFlight:
+    """Return the process-wide :class:`SingleFlight` used for Deribit downloads."""
+
+    return _DEFAULT_SINGLE_FLIGHT
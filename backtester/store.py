@@ -0,0 +1,346 @@
+"""On-disk columnar candle store with per-dataset coverage tracking.
+
+Each ``(instrument, resolution)`` pair is stored in its own directory as
+sorted segments of ``.npy`` column files (``ticks`` as int64 epoch
+milliseconds, OHLCV as float64) plus an ``index.json`` manifest.  The manifest
+records which half-open ``[start, end)`` millisecond ranges have already been
+downloaded and which rows of which files make up the dataset's segments.  A
+write only rewrites the rows its ticks overlap, merged with at most a couple
+of small neighbouring segments, so appending a page costs the same however
+large the dataset has grown.  Writers hold an exclusive
+``flock`` on the dataset's lock file and readers a shared one, so readers
+always see a consistent set of columns even while another process, such as
+a background job worker, is merging new data.  Where ``fcntl`` is not
+available the lock only covers threads of one process.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Set, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+LOGGER = logging.getLogger(__name__)
+
+COLUMNS = ("ticks", "open", "high", "low", "close", "volume")
+
+LOCK_FILE = ".lock"
+
+# Writes merge neighbouring segments while they stay below this many rows.
+SEGMENT_ROWS = 1 << 16
+
+STORE_ENV_VAR = "BACKTESTER_CANDLE_STORE"
+DEFAULT_STORE_PATH = Path.home() / ".cache" / "deribit-backtester" / "candles"
+
+Range = Tuple[int, int]
+Columns = Dict[str, np.ndarray]
+# {"file": ..., "offset": ..., "rows": ..., "start": first tick, "end": last tick}
+Segment = Dict[str, Any]
+
+
+def empty_columns() -> Columns:
+    """Return an empty set of candle columns with the store dtypes."""
+
+    columns = {name: np.empty(0, dtype=np.float64) for name in COLUMNS}
+    columns["ticks"] = np.empty(0, dtype=np.int64)
+    return columns
+
+
+def normalize_columns(columns: Columns) -> Columns:
+    """Sort *columns* by tick and drop duplicate ticks, keeping the last value."""
+
+    ticks = np.asarray(columns["ticks"], dtype=np.int64)
+    if ticks.size == 0:
+        return empty_columns()
+    # A stable sort on the reversed arrays keeps the last occurrence first.
+    reversed_ticks = ticks[::-1]
+    order = np.argsort(reversed_ticks, kind="stable")
+    sorted_ticks = reversed_ticks[order]
+    keep = np.ones(sorted_ticks.size, dtype=bool)
+    keep[1:] = sorted_ticks[1:] != sorted_ticks[:-1]
+    selection = order[keep]
+    result: Columns = {"ticks": sorted_ticks[keep]}
+    for name in COLUMNS[1:]:
+        result[name] = np.asarray(columns[name], dtype=np.float64)[::-1][selection]
+    return result
+
+
+def merge_ranges(ranges: Sequence[Range]) -> List[Range]:
+    """Merge overlapping or touching half-open ranges."""
+
+    merged: List[Range] = []
+    for start, end in sorted(ranges):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_ranges(start: int, end: int, covered: Sequence[Range]) -> List[Range]:
+    """Return the parts of ``[start, end)`` that are not in *covered*."""
+
+    gaps: List[Range] = []
+    cursor = start
+    for covered_start, covered_end in merge_ranges(covered):
+        if covered_end <= cursor:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > cursor:
+            gaps.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class CandleStore:
+    """Persist candles per instrument and resolution under *root*."""
+
+    def __init__(self, root: str | os.PathLike[str]):
+        self.root = Path(root)
+        self._lock = threading.RLock()
+
+    def _dataset_dir(self, instrument_name: str, resolution: str) -> Path:
+        safe_instrument = re.sub(r"[^A-Za-z0-9_.-]", "_", instrument_name)
+        safe_resolution = re.sub(r"[^A-Za-z0-9_.-]", "_", str(resolution))
+        return self.root / safe_instrument / safe_resolution
+
+    @contextmanager
+    def _locked(self, directory: Path, exclusive: bool) -> Iterator[None]:
+        """Hold the thread lock and, where supported, a file lock shared with other processes."""
+
+        with self._lock:
+            if fcntl is None or not (exclusive or directory.exists()):
+                yield
+                return
+            with open(directory / LOCK_FILE, "a", encoding="utf-8") as handle:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def _load_index(self, directory: Path) -> Dict[str, Any]:
+        try:
+            with open(directory / "index.json", "r", encoding="utf-8") as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return {"generation": 0, "segments": [], "coverage": []}
+
+    def coverage(self, instrument_name: str, resolution: str) -> List[Range]:
+        """Return the merged ranges already held for the dataset."""
+
+        index = self._load_index(self._dataset_dir(instrument_name, resolution))
+        return [(int(start), int(end)) for start, end in index["coverage"]]
+
+    def missing_ranges(self, instrument_name: str, resolution: str, start_ms: int, end_ms: int) -> List[Range]:
+        """Return the sub-ranges of ``[start_ms, end_ms)`` that must be downloaded."""
+
+        return subtract_ranges(start_ms, end_ms, self.coverage(instrument_name, resolution))
+
+    def _segment_files(self, directory: Path, file_id: str) -> Dict[str, Path]:
+        return {name: directory / f"{name}.{file_id}.npy" for name in COLUMNS}
+
+    def _segments(self, directory: Path, index: Dict[str, Any]) -> List[Segment]:
+        if "segments" in index:
+            return [dict(segment) for segment in index["segments"]]
+        # Stores written before segments held one set of column files per generation.
+        file_id = _legacy_file(index)
+        if file_id is None:
+            return []
+        ticks = np.load(self._segment_files(directory, file_id)["ticks"], mmap_mode="r")
+        if not ticks.size:
+            return []
+        return [{"file": file_id, "offset": 0, "rows": int(ticks.size), "start": int(ticks[0]), "end": int(ticks[-1])}]
+
+    def _load_segment(self, directory: Path, segment: Segment) -> Columns:
+        lo = int(segment["offset"])
+        hi = lo + int(segment["rows"])
+        return {
+            name: np.load(path, mmap_mode="r")[lo:hi]
+            for name, path in self._segment_files(directory, segment["file"]).items()
+        }
+
+    def read(self, instrument_name: str, resolution: str, start_ms: int, end_ms: int) -> Columns:
+        """Return the stored candles with ``start_ms <= tick < end_ms``.
+
+        Only the segments overlapping the range are opened.  When one segment
+        holds the whole range the returned arrays are views onto its
+        memory-mapped files, so reading a narrow range out of a large dataset
+        only touches the pages it needs.
+        """
+
+        directory = self._dataset_dir(instrument_name, resolution)
+        # Once mapped, the columns stay readable even after a writer removes their files.
+        with self._locked(directory, exclusive=False):
+            segments = self._segments(directory, self._load_index(directory))
+            loaded = [
+                self._load_segment(directory, segment)
+                for segment in segments
+                if segment["start"] < end_ms and segment["end"] >= start_ms
+            ]
+        parts = []
+        for columns in loaded:
+            lo, hi = np.searchsorted(columns["ticks"], (start_ms, end_ms))
+            if hi > lo:
+                parts.append({name: values[lo:hi] for name, values in columns.items()})
+        if not parts:
+            return empty_columns()
+        if len(parts) == 1:
+            return parts[0]
+        return {name: np.concatenate([part[name] for part in parts]) for name in COLUMNS}
+
+    def write(self, instrument_name: str, resolution: str, columns: Columns, covered: Range | None = None) -> None:
+        """Merge *columns* into the dataset and mark *covered* as downloaded.
+
+        Ticks already present are overwritten by the incoming values, so a
+        re-download of a previously incomplete bar replaces the stale copy.
+        """
+
+        incoming = normalize_columns({name: np.asarray(columns[name]) for name in COLUMNS})
+        directory = self._dataset_dir(instrument_name, resolution)
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._locked(directory, exclusive=True):
+            index = self._load_index(directory)
+            generation = int(index["generation"]) + 1
+            # Names unique to this writer keep files of concurrent writers apart even without a file lock.
+            file_id = f"{generation}.{os.getpid()}-{threading.get_ident()}"
+            segments = self._segments(directory, index)
+            if incoming["ticks"].size:
+                segments = self._merge_segment(directory, segments, incoming, file_id)
+
+            coverage = [tuple(item) for item in index["coverage"]]
+            if covered is not None:
+                coverage.append(covered)
+            next_index = {"generation": generation, "segments": segments, "coverage": merge_ranges(coverage)}
+
+            temp_index = directory / f"index.json.{file_id}.tmp"
+            with open(temp_index, "w", encoding="utf-8") as handle:
+                json.dump(next_index, handle)
+            os.replace(temp_index, directory / "index.json")
+
+            for stale in _index_files(index) - _index_files(next_index):
+                for path in self._segment_files(directory, stale).values():
+                    try:
+                        os.remove(path)
+                    except OSError:  # pragma: no cover - file may still be mapped on some platforms
+                        LOGGER.debug("Could not remove stale column file %s", path)
+
+    def _merge_segment(
+        self,
+        directory: Path,
+        segments: List[Segment],
+        incoming: Columns,
+        file_id: str,
+    ) -> List[Segment]:
+        """Return *segments* with sorted *incoming* merged in as one new segment saved under *file_id*.
+
+        Rows of the existing segments inside the incoming tick span are merged
+        with it, and the rows outside it keep pointing at their current files.
+        """
+
+        first, last = int(incoming["ticks"][0]), int(incoming["ticks"][-1])
+        lo = next((i for i, segment in enumerate(segments) if segment["end"] >= first), len(segments))
+        hi = next((i for i, segment in enumerate(segments) if segment["start"] > last), len(segments))
+        before, after = segments[:lo], segments[hi:]
+        overlapped: List[Columns] = []
+        for segment in segments[lo:hi]:
+            existing = self._load_segment(directory, segment)
+            ticks = existing["ticks"]
+            inner_lo = int(np.searchsorted(ticks, first, side="left"))
+            inner_hi = int(np.searchsorted(ticks, last, side="right"))
+            if inner_lo:
+                before.append(_trimmed(segment, ticks, 0, inner_lo))
+            if inner_hi < ticks.size:
+                after.insert(0, _trimmed(segment, ticks, inner_hi, ticks.size))
+            overlapped.append({name: values[inner_lo:inner_hi] for name, values in existing.items()})
+        merged = normalize_columns(
+            {name: np.concatenate([part[name] for part in overlapped] + [incoming[name]]) for name in COLUMNS}
+        )
+
+        # Fold small neighbours into the new segment so appends do not leave a trail of tiny files.
+        rows = merged["ticks"].size
+        pieces = [merged]
+        if before and rows + before[-1]["rows"] <= SEGMENT_ROWS:
+            neighbour = before.pop()
+            rows += neighbour["rows"]
+            pieces.insert(0, self._load_segment(directory, neighbour))
+        if after and rows + after[0]["rows"] <= SEGMENT_ROWS:
+            neighbour = after.pop(0)
+            rows += neighbour["rows"]
+            pieces.append(self._load_segment(directory, neighbour))
+        if len(pieces) > 1:
+            merged = {name: np.concatenate([piece[name] for piece in pieces]) for name in COLUMNS}
+
+        for name, path in self._segment_files(directory, file_id).items():
+            np.save(path, merged[name])
+        ticks = merged["ticks"]
+        segment = {"file": file_id, "offset": 0, "rows": int(ticks.size), "start": int(ticks[0]), "end": int(ticks[-1])}
+        return before + [segment] + after
+
+
+def _trimmed(segment: Segment, ticks: np.ndarray, lo: int, hi: int) -> Segment:
+    """Return the part of *segment* holding its rows ``[lo, hi)``, still pointing at the same files."""
+
+    return {
+        "file": segment["file"],
+        "offset": int(segment["offset"]) + lo,
+        "rows": hi - lo,
+        "start": int(ticks[lo]),
+        "end": int(ticks[hi - 1]),
+    }
+
+
+def _legacy_file(index: Dict[str, Any]) -> str | None:
+    if "segments" in index or not int(index["generation"]):
+        return None
+    return f"{index['generation']}.{index['writer']}" if index.get("writer") else str(index["generation"])
+
+
+def _index_files(index: Dict[str, Any]) -> Set[str]:
+    """Return the column file ids an index refers to."""
+
+    if "segments" in index:
+        return {segment["file"] for segment in index["segments"]}
+    legacy = _legacy_file(index)
+    return set() if legacy is None else {legacy}
+
+
+_DEFAULT_STORE: CandleStore | None = None
+_DEFAULT_STORE_LOCK = threading.Lock()
+
+
+def default_store() -> CandleStore | None:
+    """Return the process-wide candle store, or ``None`` when disabled.
+
+    The location can be overridden with the ``BACKTESTER_CANDLE_STORE``
+    environment variable; setting it to an empty string disables the store.
+    """
+
+    global _DEFAULT_STORE
+
+    location = os.environ.get(STORE_ENV_VAR)
+    if location is not None and not location.strip():
+        return None
+    root = Path(location) if location else DEFAULT_STORE_PATH
+    with _DEFAULT_STORE_LOCK:
+        if _DEFAULT_STORE is None or _DEFAULT_STORE.root != root:
+            _DEFAULT_STORE = CandleStore(root)
+        return _DEFAULT_STORE
@@ -2,7 +2,9 @@
 from __future__ import annotations
 
 from collections import deque
-from typing import Deque, Iterable, List
+from typing import Deque, Iterable, List, Tuple
+
+import numpy as np
 
 
 def simple_moving_average(values: Iterable[float], window: int) -> List[float]:
@@ -30,3 +32,94 @@ def crossover(previous_short: float, previous_long: float, current_short: float,
     """Return ``True`` if a bullish crossover occurred between the last two candles."""
 
     return previous_short <= previous_long and current_short > current_long
+
+
+def _running_means(values: np.ndarray, window: int, total: float, history: np.ndarray) -> Tuple[np.ndarray, float]:
+    """Continue :func:`simple_moving_average` over *values* with array operations.
+
+    *total* and *history* (the last values seen, at most *window*) are the
+    state the loop would have reached.  The loop subtracts the value leaving
+    the window and then adds the new one; laying those operations out in one
+    array and accumulating them with :func:`numpy.cumsum`, which adds strictly
+    in order, rounds exactly like the loop.  Returns the averages and the new
+    running total.
+    """
+
+    count = values.shape[0]
+    seen = history.shape[0] + np.arange(count)
+    full = seen >= window
+    combined = np.concatenate([history, values])
+    operations = np.empty((count, 2))
+    operations[:, 0] = 0.0
+    operations[full, 0] = -combined[seen[full] - window]
+    operations[:, 1] = values
+    keep = np.ones((count, 2), dtype=bool)
+    keep[:, 0] = full
+    running = np.cumsum(np.concatenate([[total], operations[keep]]))
+    totals = running[np.cumsum(keep.ravel())[1::2]]
+    averages = np.full(count, np.nan)
+    ready = seen >= window - 1
+    averages[ready] = totals[ready] / window
+    return averages, float(running[-1])
+
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """Vectorized :func:`simple_moving_average`, equal to it bit for bit."""
+
+    if window <= 0:
+        raise ValueError("window must be greater than zero")
+
+    values = np.asarray(values, dtype=np.float64)
+    if not values.shape[0]:
+        return np.empty(0)
+    return _running_means(values, window, 0.0, np.empty(0))[0]
+
+
+def crossover_mask(short_ma: np.ndarray, long_ma: np.ndarray) -> np.ndarray:
+    """Return a boolean array that is ``True`` wherever :func:`crossover` fires.
+
+    Bars where either average (or its previous value) is ``nan`` never signal,
+    because every comparison involving ``nan`` is ``False``.
+    """
+
+    mask = np.zeros(short_ma.shape[0], dtype=bool)
+    mask[1:] = (short_ma[:-1] <= long_ma[:-1]) & (short_ma[1:] > long_ma[1:])
+    return mask
+
+
+class RollingMean:
+    """Incremental simple moving average with O(1) work per value.
+
+    The running total follows exactly the same sequence of floating point
+    operations as :func:`simple_moving_average`, so feeding a series value by
+    value reproduces :func:`moving_average` bit for bit.
+    """
+
+    def __init__(self, window: int):
+        if window <= 0:
+            raise ValueError("window must be greater than zero")
+        self.window = window
+        self._total = 0.0
+        self._window_values: Deque[float] = deque(maxlen=window)
+
+    def update(self, value: float) -> float:
+        """Add *value* and return the average ending at it (``nan`` while warming up)."""
+
+        if len(self._window_values) == self.window:
+            self._total -= self._window_values[0]
+        self._window_values.append(value)
+        self._total += value
+        if len(self._window_values) < self.window:
+            return float("nan")
+        return self._total / self.window
+
+    def update_many(self, values: np.ndarray) -> np.ndarray:
+        """Add every value of *values* and return the averages :meth:`update` would have returned."""
+
+        values = np.asarray(values, dtype=np.float64)
+        if not values.shape[0]:
+            return np.empty(0)
+        history = np.fromiter(self._window_values, dtype=np.float64, count=len(self._window_values))
+        averages, self._total = _running_means(values, self.window, self._total, history)
+        self._window_values.extend(values[-self.window :].tolist())
+        return averages
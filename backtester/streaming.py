@@ -0,0 +1,174 @@
+"""Incremental JSON/NDJSON encoding and chunked, compressed HTTP bodies.
+
+Large responses are produced as a sequence of byte chunks so the server
+never holds the fully encoded document, and the client starts receiving
+data as soon as the first batch is encoded.
+"""
+from __future__ import annotations
+
+import json
+import zlib
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Sequence
+
+JSON_CONTENT_TYPE = "application/json"
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+# zlib ``wbits`` for each supported ``Content-Encoding``: 31 writes a gzip
+# container and 15 a zlib stream, which is what HTTP calls ``deflate``.
+ENCODINGS = {"gzip": 31, "deflate": 15}
+
+DEFAULT_BATCH_SIZE = 2000
+
+BatchEncoder = Callable[[int, int], List[Dict[str, Any]]]
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+def iter_batches(
+    size: int,
+    encode: BatchEncoder,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Yield ``encode(start, stop)`` for consecutive slices covering ``range(size)``."""
+
+    for start in range(0, size, batch_size):
+        yield encode(start, min(size, start + batch_size))
+
+
+def iter_json_document(head: Dict[str, Any], key: str, batches: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    """Encode ``{**head, key: [...]}`` with the array items produced batch by batch."""
+
+    prefix = _dumps(head)[:-1]
+    yield f"{prefix}{',' if head else ''}{_dumps(key)}:[".encode("utf-8")
+    first = True
+    for batch in batches:
+        if not batch:
+            continue
+        body = ",".join(_dumps(item) for item in batch)
+        yield (body if first else "," + body).encode("utf-8")
+        first = False
+    yield b"]}"
+
+
+def iter_ndjson(head: Dict[str, Any] | None, batches: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    """Encode an optional *head* object followed by one line per item."""
+
+    if head is not None:
+        yield (_dumps(head) + "\n").encode("utf-8")
+    for batch in batches:
+        if batch:
+            yield ("".join(_dumps(item) + "\n" for item in batch)).encode("utf-8")
+
+
+def wrap_document(outer: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Nest the JSON document produced by *chunks* under the key *outer*."""
+
+    yield b"{" + _dumps(outer).encode("utf-8") + b":"
+    yield from chunks
+    yield b"}"
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Pick ``gzip`` or ``deflate`` from an ``Accept-Encoding`` header, if acceptable."""
+
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip().lower()] = quality
+    wildcard = weights.get("*", 0.0)
+    best = None
+    best_quality = 0.0
+    for name in ENCODINGS:
+        quality = weights.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+class ChunkedWriter:
+    """Write a response body, optionally compressed and chunk-framed.
+
+    Small pieces are coalesced until *buffer_size* bytes are pending so the
+    socket sees a few large writes instead of many tiny ones.
+    """
+
+    def __init__(
+        self,
+        stream: BinaryIO,
+        *,
+        encoding: str | None = None,
+        chunked: bool = True,
+        buffer_size: int = 64 * 1024,
+    ):
+        self._stream = stream
+        self._chunked = chunked
+        self._buffer_size = buffer_size
+        self._pending: List[bytes] = []
+        self._pending_size = 0
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, ENCODINGS[encoding]) if encoding else None
+
+    def write(self, data: bytes) -> None:
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+        if not data:
+            return
+        self._pending.append(data)
+        self._pending_size += len(data)
+        if self._pending_size >= self._buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending_size:
+            return
+        data = b"".join(self._pending)
+        self._pending.clear()
+        self._pending_size = 0
+        if self._chunked:
+            self._stream.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        else:
+            self._stream.write(data)
+
+    def close(self) -> None:
+        if self._compressor is not None:
+            tail = self._compressor.flush()
+            if tail:
+                self._pending.append(tail)
+                self._pending_size += len(tail)
+        self.flush()
+        if self._chunked:
+            self._stream.write(b"0\r\n\r\n")
+        self._stream.flush()
+
+    def write_all(self, chunks: Iterable[bytes], first_flush: int = 4096) -> None:
+        """Write every chunk and finish the body.
+
+        The body is flushed as soon as *first_flush* bytes have been encoded so
+        the client gets its first rows without waiting for a full buffer.
+        """
+
+        written = 0
+        for chunk in chunks:
+            self.write(chunk)
+            if written < first_flush <= written + len(chunk):
+                self._flush_compressor()
+                self.flush()
+            written += len(chunk)
+        self.close()
+
+    def _flush_compressor(self) -> None:
+        if self._compressor is not None:
+            data = self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                self._pending.append(data)
+                self._pending_size += len(data)
@@ -0,0 +1,258 @@
+"""Parallel parameter sweeps over :class:`BacktestConfig`.
+
+The candle columns are copied once into a :mod:`multiprocessing.shared_memory`
+block that every worker process maps, so the dataset is neither refetched nor
+pickled per task.  Results are yielded as soon as each chunk of the grid
+finishes.
+
+Worker pools are spawned rather than forked, because sweeps also run inside
+the threaded HTTP server, whose other threads may hold locks at fork time.
+"""
+from __future__ import annotations
+
+import bisect
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, replace
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from .backtest import Backtester
+from .config import BacktestConfig
+from .frame import PRICE_COLUMNS, CandleFrame, as_frame
+from .models import Candle
+
+SWEEP_FIELDS = ("short_window", "long_window", "take_profit", "stop_loss", "max_open_positions")
+
+RANK_KEYS = ("final_cash", "cumulative_profit", "win_rate")
+
+_CONTEXT = multiprocessing.get_context("spawn")
+
+
+@dataclass
+class SweepResult:
+    """Summary of one backtest in a sweep."""
+
+    parameters: Dict[str, Any]
+    final_cash: float
+    cumulative_profit: float
+    win_rate: float
+    total_trades: int
+    wins: int
+    losses: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def expand_grid(base_config: BacktestConfig, grid: Mapping[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Return every valid parameter combination in *grid*.
+
+    Fields missing from *grid* keep the value of *base_config*; combinations
+    that :meth:`BacktestConfig.validate` rejects (for example a short window
+    that is not shorter than the long one) are skipped.
+    """
+
+    unknown = set(grid) - set(SWEEP_FIELDS)
+    if unknown:
+        raise ValueError(f"Unsupported sweep fields: {', '.join(sorted(unknown))}")
+
+    names = [name for name in SWEEP_FIELDS if name in grid]
+    combinations: List[Dict[str, Any]] = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        parameters = dict(zip(names, values))
+        try:
+            replace(base_config, **parameters).validate()
+        except ValueError:
+            continue
+        combinations.append(parameters)
+    return combinations
+
+
+class SharedCandles:
+    """Copy a :class:`CandleFrame` into one shared memory block.
+
+    Use as a context manager in the parent process; :attr:`descriptor` is a
+    small picklable tuple workers pass to :func:`attach_frame`.
+    """
+
+    def __init__(self, frame: CandleFrame):
+        self.length = len(frame)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, 6 * 8 * self.length))
+        for position, column in enumerate(frame.columns().values()):
+            offset = position * 8 * self.length
+            view = np.ndarray((self.length,), dtype=column.dtype, buffer=self._shm.buf, offset=offset)
+            view[:] = column
+            del view
+
+    @property
+    def descriptor(self) -> Tuple[str, int]:
+        return self._shm.name, self.length
+
+    def close(self) -> None:
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> "SharedCandles":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def attach_frame(descriptor: Tuple[str, int]) -> Tuple[shared_memory.SharedMemory, CandleFrame]:
+    """Map the shared block described by *descriptor* as a read-only frame.
+
+    The returned :class:`SharedMemory` handle must stay referenced for as long
+    as the frame is in use.
+    """
+
+    name, length = descriptor
+    shm = shared_memory.SharedMemory(name=name)
+    columns: Dict[str, np.ndarray] = {}
+    for position, column in enumerate(("ticks",) + PRICE_COLUMNS):
+        dtype = np.int64 if column == "ticks" else np.float64
+        array = np.ndarray((length,), dtype=dtype, buffer=shm.buf, offset=position * 8 * length)
+        array.flags.writeable = False
+        columns[column] = array
+    return shm, CandleFrame.from_columns(columns)
+
+
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+def _init_worker(descriptor: Tuple[str, int]) -> None:
+    shm, frame = attach_frame(descriptor)
+    _WORKER_STATE["shm"] = shm
+    _WORKER_STATE["frame"] = frame
+
+
+def shared_pool(shared: SharedCandles, workers: int) -> ProcessPoolExecutor:
+    """Start *workers* processes that each map *shared* as their :func:`worker_frame`."""
+
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=_CONTEXT,
+        initializer=_init_worker,
+        initargs=(shared.descriptor,),
+    )
+
+
+def worker_frame() -> CandleFrame:
+    """Return the candles mapped by the current :func:`shared_pool` worker."""
+
+    return _WORKER_STATE["frame"]
+
+
+def evaluate(
+    frame: CandleFrame,
+    base_config: BacktestConfig,
+    parameters: Dict[str, Any],
+    engine: str = "vectorized",
+) -> SweepResult:
+    """Backtest *parameters* over *base_config* on *frame* and summarize the run."""
+
+    # Only aggregates are reported, so trades never need datetime objects.
+    report = Backtester(replace(base_config, **parameters), engine=engine, timestamps="epoch").run(frame)
+    return SweepResult(
+        parameters=parameters,
+        final_cash=report.final_cash,
+        cumulative_profit=report.cumulative_profit,
+        win_rate=report.win_rate,
+        total_trades=report.total_trades,
+        wins=report.wins,
+        losses=report.losses,
+    )
+
+
+def _evaluate_chunk(
+    base_config: BacktestConfig,
+    chunk: List[Dict[str, Any]],
+    engine: str,
+) -> List[SweepResult]:
+    frame = worker_frame()
+    return [evaluate(frame, base_config, parameters, engine) for parameters in chunk]
+
+
+def _chunks(items: List[Dict[str, Any]], workers: int) -> List[List[Dict[str, Any]]]:
+    # A few chunks per worker keeps the pool busy without paying IPC per config.
+    size = max(1, len(items) // (workers * 4))
+    return [items[start : start + size] for start in range(0, len(items), size)]
+
+
+def run_sweep(
+    candles: Iterable[Candle] | CandleFrame,
+    base_config: BacktestConfig,
+    grid: Mapping[str, Sequence[Any]],
+    *,
+    processes: int | None = None,
+    engine: str = "vectorized",
+) -> Iterator[SweepResult]:
+    """Backtest every combination of *grid* and yield results as they finish.
+
+    Args:
+        candles: Candles shared by every run.
+        base_config: Configuration providing the fields not swept.
+        grid: Mapping of :data:`SWEEP_FIELDS` names to candidate values.
+        processes: Worker processes; defaults to the CPU count.  ``1`` runs
+            in the calling process.
+        engine: Backtest engine used for each run.
+
+    Yields:
+        One :class:`SweepResult` per combination, in completion order.
+    """
+
+    frame = as_frame(candles)
+    combinations = expand_grid(base_config, grid)
+    if not combinations:
+        return
+
+    workers = min(processes or os.cpu_count() or 1, len(combinations))
+    if workers == 1:
+        for parameters in combinations:
+            yield evaluate(frame, base_config, parameters, engine)
+        return
+
+    with SharedCandles(frame) as shared, shared_pool(shared, workers) as executor:
+        pending: set[Future[List[SweepResult]]] = {
+            executor.submit(_evaluate_chunk, base_config, chunk, engine)
+            for chunk in _chunks(combinations, workers)
+        }
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+class Leaderboard:
+    """Keep sweep results ordered best-first by one of :data:`RANK_KEYS`."""
+
+    def __init__(self, key: str = "final_cash"):
+        if key not in RANK_KEYS:
+            raise ValueError(f"key must be one of {', '.join(RANK_KEYS)}")
+        self.key = key
+        self._scores: List[float] = []
+        self._results: List[SweepResult] = []
+
+    def add(self, result: SweepResult) -> int:
+        """Insert *result* and return its 1-based rank at this point."""
+
+        score = -getattr(result, self.key)
+        index = bisect.bisect_right(self._scores, score)
+        self._scores.insert(index, score)
+        self._results.insert(index, result)
+        return index + 1
+
+    def top(self, count: int | None = None) -> List[SweepResult]:
+        return list(self._results[:count])
+
+    def __len__(self) -> int:
+        return len(self._results)
@@ -0,0 +1,96 @@
+"""Deterministic synthetic OHLCV generators for benchmarks and tests.
+
+Every generator is driven by a seeded :func:`numpy.random.default_rng`, so
+the same arguments always produce the same candles.
+"""
+from __future__ import annotations
+
+from typing import Callable, Dict, Sequence, Tuple
+
+import numpy as np
+
+from .frame import CandleFrame
+from .timeutils import MINUTE_MS
+
+DEFAULT_START_MS = 1_704_067_200_000  # 2024-01-01T00:00:00Z
+
+# (drift, volatility) per bar for the calm, trending and turbulent regimes.
+DEFAULT_REGIMES: Tuple[Tuple[float, float], ...] = ((0.0, 0.0005), (0.0002, 0.001), (-0.0003, 0.004))
+
+
+def _frame_from_log_returns(
+    returns: np.ndarray,
+    rng: np.random.Generator,
+    start_price: float,
+    start_ms: int,
+    resolution_ms: int,
+) -> CandleFrame:
+    bars = returns.shape[0]
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = np.empty(bars)
+    open_[:1] = start_price
+    open_[1:] = close[:-1]
+    # Wicks extend past the body by a fraction of the bar's own move.
+    wick = np.abs(returns) * 0.5 + rng.exponential(0.0002, bars)
+    high = np.maximum(open_, close) * (1 + wick)
+    low = np.minimum(open_, close) * (1 - wick)
+    volume = rng.lognormal(mean=2.0, sigma=0.6, size=bars) * (1 + 200 * np.abs(returns))
+    ticks = start_ms + np.arange(bars, dtype=np.int64) * resolution_ms
+    return CandleFrame(ticks, open_, high, low, close, volume)
+
+
+def random_walk(
+    bars: int,
+    *,
+    seed: int = 0,
+    start_price: float = 40_000.0,
+    drift: float = 0.0,
+    volatility: float = 0.001,
+    start_ms: int = DEFAULT_START_MS,
+    resolution_ms: int = MINUTE_MS,
+) -> CandleFrame:
+    """Return *bars* candles following a geometric random walk."""
+
+    if bars < 0:
+        raise ValueError("bars must not be negative")
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(drift, volatility, bars)
+    return _frame_from_log_returns(returns, rng, start_price, start_ms, resolution_ms)
+
+
+def regime_switching(
+    bars: int,
+    *,
+    seed: int = 0,
+    start_price: float = 40_000.0,
+    regimes: Sequence[Tuple[float, float]] = DEFAULT_REGIMES,
+    mean_duration: float = 2_000.0,
+    start_ms: int = DEFAULT_START_MS,
+    resolution_ms: int = MINUTE_MS,
+) -> CandleFrame:
+    """Return *bars* candles that switch between ``(drift, volatility)`` regimes.
+
+    Regime lengths are exponentially distributed around *mean_duration*
+    bars, giving alternating calm, trending and turbulent stretches.
+    """
+
+    if bars < 0:
+        raise ValueError("bars must not be negative")
+    if not regimes:
+        raise ValueError("at least one regime is required")
+    rng = np.random.default_rng(seed)
+    # Draw enough regime spells to cover every bar, then expand them per bar.
+    spells = max(1, int(bars / mean_duration * 2) + 1)
+    lengths = np.maximum(1, rng.exponential(mean_duration, spells).astype(np.int64))
+    while lengths.sum() < bars:
+        lengths = np.concatenate([lengths, np.maximum(1, rng.exponential(mean_duration, spells).astype(np.int64))])
+    states = np.repeat(rng.integers(0, len(regimes), lengths.shape[0]), lengths)[:bars]
+    params = np.asarray(regimes, dtype=np.float64)
+    returns = params[states, 0] + params[states, 1] * rng.standard_normal(bars)
+    return _frame_from_log_returns(returns, rng, start_price, start_ms, resolution_ms)
+
+
+GENERATORS: Dict[str, Callable[..., CandleFrame]] = {
+    "random_walk": random_walk,
+    "regime_switching": regime_switching,
+}
@@ -0,0 +1,97 @@
+"""Timestamp and resolution helpers shared across the backtester."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import List, Union
+
+import numpy as np
+
+EPOCH = datetime(1970, 1, 1)
+
+# Candle and position times are either naive UTC datetimes or, in the
+# engine's ``"epoch"`` timestamp mode, integer epoch milliseconds.
+Timestamp = Union[datetime, int]
+
+MINUTE_MS = 60_000
+DAY_MS = 86_400_000
+
+
+def to_epoch_ms(value: Timestamp) -> int:
+    """Convert *value* to epoch milliseconds, treating naive datetimes as UTC.
+
+    Integers are taken to be epoch milliseconds already.
+    """
+
+    if not isinstance(value, datetime):
+        return int(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def from_epoch_ms(timestamp_ms: int) -> datetime:
+    """Convert epoch milliseconds to a naive UTC :class:`datetime`."""
+
+    return EPOCH + timedelta(milliseconds=int(timestamp_ms))
+
+
+def resolution_to_ms(resolution: str) -> int:
+    """Return the bucket width in milliseconds for a Deribit resolution string."""
+
+    value = str(resolution).strip().upper()
+    if value == "1D":
+        return DAY_MS
+    if value.isdigit() and int(value) > 0:
+        return int(value) * MINUTE_MS
+    raise ValueError(f"Unsupported resolution '{resolution}'")
+
+
+# Bucket widths, in minutes, that candles are aggregated to for display (Deribit's own resolutions).
+DISPLAY_RESOLUTIONS = (1, 3, 5, 10, 15, 30, 60, 120, 180, 360, 720, 1440)
+
+
+def display_bucket_ms(span_ms: int, base_ms: int, max_bars: int) -> int:
+    """Return the narrowest bucket width that splits *span_ms* into at most *max_bars* buckets.
+
+    Buckets are aligned to the epoch, so a span may straddle one more bucket
+    than it is wide.  Widths come from :data:`DISPLAY_RESOLUTIONS` (whole
+    multiples of *base_ms* only) and continue in whole days beyond one day.
+    """
+
+    if max_bars < 2:
+        raise ValueError("max_bars must be at least 2")
+    needed = -(-span_ms // (max_bars - 1))
+    if needed <= base_ms:
+        return base_ms
+    for minutes in DISPLAY_RESOLUTIONS:
+        width = minutes * MINUTE_MS
+        if width >= needed and width % base_ms == 0:
+            return width
+    width = -(-needed // DAY_MS) * DAY_MS
+    return width if width % base_ms == 0 else -(-width // base_ms) * base_ms
+
+
+def format_timestamp(value: Timestamp) -> str:
+    """Format a datetime or epoch-millisecond *value* as an ISO-8601 string."""
+
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return from_epoch_ms(value).isoformat()
+
+
+def format_iso_ms(ticks: np.ndarray) -> List[str]:
+    """Format epoch-millisecond *ticks* like :meth:`datetime.isoformat` in one pass."""
+
+    ticks = np.asarray(ticks, dtype=np.int64)
+    values = ticks.astype("datetime64[ms]")
+    fractional = (ticks % 1000) != 0
+    if not fractional.any():
+        return np.datetime_as_string(values, unit="s").tolist()
+    if fractional.all():
+        return np.datetime_as_string(values, unit="us").tolist()
+    # ``isoformat`` omits the fraction for whole seconds only.
+    return np.where(
+        fractional,
+        np.datetime_as_string(values, unit="us"),
+        np.datetime_as_string(values, unit="s"),
+    ).tolist()
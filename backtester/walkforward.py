@@ -0,0 +1,242 @@
+"""Walk-forward optimization over rolling in-sample/out-of-sample windows.
+
+The candle range is split into consecutive folds.  Each fold picks the best
+parameter combination of a sweep grid on its in-sample window and then
+backtests only that winner on the following out-of-sample window, so every
+reported out-of-sample result comes from parameters chosen without seeing it.
+
+Folds are independent and run in parallel worker processes that all map the
+same :class:`~backtester.sweep.SharedCandles` block.
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Sequence
+
+from .config import BacktestConfig
+from .frame import CandleFrame, as_frame
+from .models import Candle
+from .sweep import RANK_KEYS, Leaderboard, SharedCandles, SweepResult, evaluate, expand_grid, shared_pool, worker_frame
+
+
+@dataclass(frozen=True)
+class Fold:
+    """Bar index ranges ``[start, stop)`` of one walk-forward fold."""
+
+    index: int
+    in_sample_start: int
+    in_sample_stop: int
+    out_of_sample_start: int
+    out_of_sample_stop: int
+
+
+@dataclass
+class FoldResult:
+    """Winning in-sample parameters of a fold and how they fared out of sample."""
+
+    index: int
+    in_sample_start: int
+    in_sample_end: int
+    out_of_sample_start: int
+    out_of_sample_end: int
+    in_sample_bars: int
+    out_of_sample_bars: int
+    in_sample: SweepResult
+    out_of_sample: SweepResult
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        return self.in_sample.parameters
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class WalkForwardReport:
+    """Per-fold results plus aggregates over every out-of-sample window."""
+
+    folds: List[FoldResult]
+    rank_by: str
+
+    @property
+    def total_trades(self) -> int:
+        return sum(fold.out_of_sample.total_trades for fold in self.folds)
+
+    @property
+    def wins(self) -> int:
+        return sum(fold.out_of_sample.wins for fold in self.folds)
+
+    @property
+    def losses(self) -> int:
+        return sum(fold.out_of_sample.losses for fold in self.folds)
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.total_trades if self.total_trades else 0.0
+
+    @property
+    def cumulative_profit(self) -> float:
+        return sum(fold.out_of_sample.cumulative_profit for fold in self.folds)
+
+    @property
+    def efficiency(self) -> float | None:
+        """Out-of-sample profit per bar relative to in-sample profit per bar.
+
+        Values near 1 mean the fitted parameters kept their edge on unseen
+        data; ``None`` when the in-sample fits were not profitable.
+        """
+
+        in_sample_bars = sum(fold.in_sample_bars for fold in self.folds)
+        out_of_sample_bars = sum(fold.out_of_sample_bars for fold in self.folds)
+        in_sample_profit = sum(fold.in_sample.cumulative_profit for fold in self.folds)
+        if not in_sample_bars or not out_of_sample_bars or in_sample_profit <= 0:
+            return None
+        return (self.cumulative_profit / out_of_sample_bars) / (in_sample_profit / in_sample_bars)
+
+    def aggregate(self) -> Dict[str, Any]:
+        return {
+            "folds": len(self.folds),
+            "total_trades": self.total_trades,
+            "wins": self.wins,
+            "losses": self.losses,
+            "win_rate": self.win_rate,
+            "cumulative_profit": self.cumulative_profit,
+            "efficiency": self.efficiency,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rank_by": self.rank_by,
+            "folds": [fold.to_dict() for fold in self.folds],
+            "aggregate": self.aggregate(),
+        }
+
+
+def split_folds(length: int, folds: int, in_sample_ratio: float = 0.7, anchored: bool = False) -> List[Fold]:
+    """Split ``range(length)`` into *folds* walk-forward windows.
+
+    Out-of-sample windows are consecutive, equally sized and together cover
+    the end of the range.  With rolling windows every in-sample window has
+    the same length and holds *in_sample_ratio* of its fold; *anchored*
+    windows instead all start at bar 0 and grow with each fold.
+    """
+
+    if folds < 1:
+        raise ValueError("folds must be at least 1")
+    if not 0 < in_sample_ratio < 1:
+        raise ValueError("in_sample_ratio must be between 0 and 1")
+
+    # length = in_sample + folds * out_of_sample with in_sample / (in_sample + out_of_sample) = ratio.
+    out_of_sample = int(length / (folds + in_sample_ratio / (1 - in_sample_ratio)))
+    in_sample = length - folds * out_of_sample
+    if out_of_sample < 1 or in_sample < 1:
+        raise ValueError(f"{length} candles are too few for {folds} folds")
+
+    windows = []
+    for index in range(folds):
+        test_start = in_sample + index * out_of_sample
+        windows.append(
+            Fold(
+                index=index,
+                in_sample_start=0 if anchored else test_start - in_sample,
+                in_sample_stop=test_start,
+                out_of_sample_start=test_start,
+                out_of_sample_stop=test_start + out_of_sample,
+            )
+        )
+    return windows
+
+
+def _run_fold(
+    frame: CandleFrame,
+    fold: Fold,
+    base_config: BacktestConfig,
+    combinations: List[Dict[str, Any]],
+    rank_by: str,
+    engine: str,
+) -> FoldResult:
+    in_sample_frame = frame[fold.in_sample_start : fold.in_sample_stop]
+    out_of_sample_frame = frame[fold.out_of_sample_start : fold.out_of_sample_stop]
+
+    leaderboard = Leaderboard(key=rank_by)
+    for parameters in combinations:
+        leaderboard.add(evaluate(in_sample_frame, base_config, parameters, engine))
+    best = leaderboard.top(1)[0]
+    return FoldResult(
+        index=fold.index,
+        in_sample_start=int(frame.ticks[fold.in_sample_start]),
+        in_sample_end=int(frame.ticks[fold.in_sample_stop - 1]),
+        out_of_sample_start=int(frame.ticks[fold.out_of_sample_start]),
+        out_of_sample_end=int(frame.ticks[fold.out_of_sample_stop - 1]),
+        in_sample_bars=len(in_sample_frame),
+        out_of_sample_bars=len(out_of_sample_frame),
+        in_sample=best,
+        out_of_sample=evaluate(out_of_sample_frame, base_config, best.parameters, engine),
+    )
+
+
+def _run_shared_fold(
+    fold: Fold,
+    base_config: BacktestConfig,
+    combinations: List[Dict[str, Any]],
+    rank_by: str,
+    engine: str,
+) -> FoldResult:
+    return _run_fold(worker_frame(), fold, base_config, combinations, rank_by, engine)
+
+
+def run_walk_forward(
+    candles: Iterable[Candle] | CandleFrame,
+    base_config: BacktestConfig,
+    grid: Mapping[str, Sequence[Any]],
+    *,
+    folds: int = 5,
+    in_sample_ratio: float = 0.7,
+    anchored: bool = False,
+    rank_by: str = "final_cash",
+    processes: int | None = None,
+    engine: str = "vectorized",
+) -> WalkForwardReport:
+    """Optimize *grid* on each in-sample window and evaluate the winner out of sample.
+
+    Args:
+        candles: Candles covering the whole walk-forward range.
+        base_config: Configuration providing the fields not swept.
+        grid: Mapping of :data:`~backtester.sweep.SWEEP_FIELDS` names to candidate values.
+        folds: Number of out-of-sample windows.
+        in_sample_ratio: Share of each rolling fold used for optimization.
+        anchored: Grow the in-sample windows from the first candle instead of rolling them.
+        rank_by: Metric from :data:`~backtester.sweep.RANK_KEYS` that picks each fold's winner.
+        processes: Worker processes; defaults to the CPU count.  ``1`` runs
+            in the calling process.
+        engine: Backtest engine used for each run.
+
+    Each out-of-sample window is backtested on its own, so its first
+    ``long_window`` bars only warm up the moving averages.
+
+    Raises:
+        ValueError: If the grid has no valid combination or the candles
+            cannot be split into *folds* windows.
+    """
+
+    if rank_by not in RANK_KEYS:
+        raise ValueError(f"rank_by must be one of {', '.join(RANK_KEYS)}")
+    frame = as_frame(candles)
+    combinations = expand_grid(base_config, grid)
+    if not combinations:
+        raise ValueError("The parameter grid has no valid combination")
+    windows = split_folds(len(frame), folds, in_sample_ratio, anchored)
+
+    workers = min(processes or os.cpu_count() or 1, len(windows))
+    if workers == 1:
+        results = [_run_fold(frame, fold, base_config, combinations, rank_by, engine) for fold in windows]
+        return WalkForwardReport(folds=results, rank_by=rank_by)
+
+    with SharedCandles(frame) as shared, shared_pool(shared, workers) as executor:
+        futures = [
+            executor.submit(_run_shared_fold, fold, base_config, combinations, rank_by, engine) for fold in windows
+        ]
+        results = [future.result() for future in futures]
+    return WalkForwardReport(folds=results, rank_by=rank_by)
@@ -0,0 +1,258 @@
+"""Benchmark the backtester on synthetic market data.
+
+Run from the repository root::
+
+    python -m benchmarks.run                          # 10k, 100k and 1M bars
+    python -m benchmarks.run --sizes 10000,10000000   # up to 10M bars
+    python -m benchmarks.run --save-baseline          # refresh benchmarks/baseline.json
+
+Every case reports throughput in bars per second (best of ``--repeat``
+runs) and the peak memory traced during one extra run.  Results are compared
+against the baseline file, and ``--fail-on-regression`` turns throughput
+drops beyond ``--tolerance`` into a non-zero exit status.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+
+from backtester import http
+from backtester.backtest import Backtester
+from backtester.config import BacktestConfig
+from backtester.frame import CandleFrame
+from backtester.indicators import IndicatorCache
+from backtester.strategy import moving_average, simple_moving_average
+from backtester.synthetic import GENERATORS
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+CONFIG = BacktestConfig(
+    instrument_name="SYNTH_USD",
+    interval="1",
+    max_open_positions=5,
+    take_profit=0.004,
+    stop_loss=0.003,
+    short_window=9,
+    long_window=21,
+)
+
+
+@dataclass(frozen=True)
+class Case:
+    """A benchmark: *prepare* builds the input outside the timed region."""
+
+    name: str
+    prepare: Callable[[CandleFrame], Any]
+    run: Callable[[Any], Any]
+    # Pure-Python and JSON cases are skipped above this size unless --all is given.
+    max_bars: int | None = None
+
+
+@dataclass
+class Result:
+    case: str
+    generator: str
+    bars: int
+    seconds: float
+    bars_per_sec: float
+    peak_memory_mb: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.case}/{self.generator}/{self.bars}"
+
+
+def _backtest_payload(frame: CandleFrame) -> Dict[str, Any]:
+    config = {
+        "shortWindow": CONFIG.short_window,
+        "longWindow": CONFIG.long_window,
+        "takeProfit": CONFIG.take_profit,
+        "stopLoss": CONFIG.stop_loss,
+        "maxOpenPositions": CONFIG.max_open_positions,
+    }
+    # Round-trip through JSON so the payload looks exactly like a decoded request body.
+    return json.loads(json.dumps({"config": config, "candles": http._serialize_candles(frame)}))
+
+
+def _run_engine(engine: str) -> Callable[[CandleFrame], Any]:
+    # A fresh indicator cache per run so repeats measure the full computation.
+    return lambda frame: Backtester(CONFIG, engine=engine, indicator_cache=IndicatorCache()).run(frame)
+
+
+CASES: Sequence[Case] = (
+    Case(
+        "simple_moving_average",
+        lambda frame: frame.close.tolist(),
+        lambda values: simple_moving_average(values, 21),
+        max_bars=1_000_000,
+    ),
+    Case("moving_average", lambda frame: frame.close, lambda values: moving_average(values, 21)),
+    Case("run_loop", lambda frame: frame, _run_engine("loop"), max_bars=1_000_000),
+    Case("run_vectorized", lambda frame: frame, _run_engine("vectorized")),
+    Case("serialize_candles", lambda frame: frame, http._serialize_candles, max_bars=1_000_000),
+    Case("serialize_report", _run_engine("vectorized"), http._serialize_report, max_bars=1_000_000),
+    Case("run_backtest_response", _backtest_payload, http.run_backtest_response, max_bars=100_000),
+)
+
+
+def measure(case: Case, frame: CandleFrame, generator: str, repeat: int) -> Result:
+    data = case.prepare(frame)
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        case.run(data)
+        best = min(best, time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        case.run(data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    bars = len(frame)
+    return Result(
+        case=case.name,
+        generator=generator,
+        bars=bars,
+        seconds=best,
+        bars_per_sec=bars / best if best > 0 else float("inf"),
+        peak_memory_mb=peak / (1024 * 1024),
+    )
+
+
+def run_benchmarks(
+    sizes: Sequence[int],
+    generators: Sequence[str],
+    cases: Sequence[str] | None = None,
+    repeat: int = 3,
+    include_all: bool = False,
+    seed: int = 0,
+) -> List[Result]:
+    selected = [case for case in CASES if cases is None or case.name in cases]
+    results: List[Result] = []
+    for generator in generators:
+        for bars in sizes:
+            frame = GENERATORS[generator](bars, seed=seed)
+            for case in selected:
+                if case.max_bars is not None and bars > case.max_bars and not include_all:
+                    LOGGER.info("Skipping %s at %d bars (use --all to include)", case.name, bars)
+                    continue
+                result = measure(case, frame, generator, repeat)
+                LOGGER.info("%s: %.0f bars/s", result.key, result.bars_per_sec)
+                results.append(result)
+    return results
+
+
+def compare(results: Sequence[Result], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """Return one row per result with its throughput ratio against *baseline*."""
+
+    recorded = baseline.get("results", {})
+    rows = []
+    for result in results:
+        previous = recorded.get(result.key)
+        ratio = result.bars_per_sec / previous["bars_per_sec"] if previous else None
+        rows.append(
+            {
+                "key": result.key,
+                "bars_per_sec": result.bars_per_sec,
+                "peak_memory_mb": result.peak_memory_mb,
+                "ratio": ratio,
+                "regression": ratio is not None and ratio < 1 - tolerance,
+            }
+        )
+    return rows
+
+
+def format_table(rows: Sequence[Dict[str, Any]]) -> str:
+    lines = [f"{'benchmark':<48} {'bars/s':>14} {'peak MB':>9} {'vs base':>8}"]
+    for row in rows:
+        ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+        flag = "  REGRESSION" if row["regression"] else ""
+        lines.append(
+            f"{row['key']:<48} {row['bars_per_sec']:>14,.0f} {row['peak_memory_mb']:>9.1f} {ratio:>8}{flag}"
+        )
+    return "\n".join(lines)
+
+
+def baseline_document(results: Sequence[Result]) -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": {result.key: asdict(result) for result in results},
+    }
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(part.replace("_", "")) for part in value.split(",") if part.strip()]
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark the backtester on synthetic data")
+    parser.add_argument("--sizes", type=_int_list, default=list(DEFAULT_SIZES), help="Bar counts, e.g. 10000,1000000")
+    parser.add_argument(
+        "--generator",
+        action="append",
+        choices=sorted(GENERATORS),
+        help="Data generator (repeatable, defaults to all)",
+    )
+    parser.add_argument("--case", action="append", choices=[case.name for case in CASES], help="Only run this case")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the best is reported")
+    parser.add_argument("--all", action="store_true", help="Run slow cases above their default size limit")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic data")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results to the baseline file")
+    parser.add_argument("--output", type=Path, default=None, help="Also write the results as JSON to this path")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed throughput drop before flagging")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on regressions")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    args = create_parser().parse_args(argv)
+
+    results = run_benchmarks(
+        sizes=args.sizes,
+        generators=args.generator or sorted(GENERATORS),
+        cases=args.case,
+        repeat=args.repeat,
+        include_all=args.all,
+        seed=args.seed,
+    )
+    baseline: Dict[str, Any] = {}
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    rows = compare(results, baseline, args.tolerance)
+    print(format_table(rows))
+
+    document = baseline_document(results)
+    if args.output is not None:
+        args.output.write_text(json.dumps(document, indent=2), encoding="utf-8")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+        LOGGER.info("Saved baseline to %s", args.baseline)
+    if args.fail_on_regression and any(row["regression"] for row in rows):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - manual execution
+    sys.exit(main())
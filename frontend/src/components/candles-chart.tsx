@@ -1,21 +1,37 @@
-import type { BacktestPhase, Candle } from '@/types/backtest';
+import { useState } from 'react';
+import type { MouseEvent } from 'react';
+
+import { toEpochMs } from '@/lib/api';
+import type { BacktestPhase, Candle, Timestamp } from '@/types/backtest';
 
 interface CandlesChartProps {
   candles: Candle[];
   phase: BacktestPhase;
   error: string | null;
+  /** Called with the epoch-millisecond range selected by dragging across the chart. */
+  onZoom?: (viewStart: number, viewEnd: number) => void;
+  /** Shown as a "Reset zoom" button while a zoomed-in range is displayed. */
+  onResetZoom?: () => void;
 }
 
-function formatTimestamp(value: string): string {
+function formatTimestamp(value: Timestamp): string {
   try {
-    const date = new Date(value);
+    const date = new Date(toEpochMs(value));
     return date.toLocaleString();
   } catch (error) {
-    return value;
+    return String(value);
   }
 }
 
-export function CandlesChart({ candles, phase, error }: CandlesChartProps) {
+export function CandlesChart({
+  candles,
+  phase,
+  error,
+  onZoom,
+  onResetZoom
+}: CandlesChartProps) {
+  const [selection, setSelection] = useState<{ from: number; to: number } | null>(null);
+
   if (error) {
     return (
       <div className="placeholder" role="status">
@@ -44,7 +60,7 @@ export function CandlesChart({ candles, phase, error }: CandlesChartProps) {
   }
 
   const closingPrices = candles.map((candle) => candle.close);
-  const timestamps = candles.map((candle) => new Date(candle.timestamp).getTime());
+  const timestamps = candles.map((candle) => toEpochMs(candle.timestamp));
 
   const minPrice = Math.min(...closingPrices);
   const maxPrice = Math.max(...closingPrices);
@@ -59,7 +75,7 @@ export function CandlesChart({ candles, phase, error }: CandlesChartProps) {
 
   const points = candles
     .map((candle) => {
-      const time = new Date(candle.timestamp).getTime();
+      const time = toEpochMs(candle.timestamp);
       const x = padding + ((time - minTime) / spanTime) * (width - padding * 2);
       const y =
         height -
@@ -73,6 +89,23 @@ export function CandlesChart({ candles, phase, error }: CandlesChartProps) {
   const first = candles[0];
   const last = candles[candles.length - 1];
 
+  // Drag positions are tracked in viewBox units and turned back into times on release.
+  const toViewBoxX = (event: MouseEvent<SVGSVGElement>): number => {
+    const bounds = event.currentTarget.getBoundingClientRect();
+    return ((event.clientX - bounds.left) / (bounds.width || 1)) * width;
+  };
+  const toTime = (x: number): number =>
+    minTime + ((x - padding) / (width - padding * 2)) * spanTime;
+
+  const handleMouseUp = () => {
+    if (selection && onZoom && Math.abs(selection.to - selection.from) > 4) {
+      const from = toTime(Math.min(selection.from, selection.to));
+      const to = toTime(Math.max(selection.from, selection.to));
+      onZoom(Math.max(from, minTime), Math.min(to, maxTime));
+    }
+    setSelection(null);
+  };
+
   return (
     <div className="chart-container">
       <svg
@@ -80,6 +113,17 @@ export function CandlesChart({ candles, phase, error }: CandlesChartProps) {
         viewBox={`0 0 ${width} ${height}`}
         role="img"
         aria-label="Closing price over time"
+        style={onZoom ? { cursor: 'crosshair' } : undefined}
+        onMouseDown={(event) => {
+          const x = toViewBoxX(event);
+          setSelection({ from: x, to: x });
+        }}
+        onMouseMove={(event) => {
+          const x = toViewBoxX(event);
+          setSelection((current) => (current ? { ...current, to: x } : current));
+        }}
+        onMouseUp={handleMouseUp}
+        onMouseLeave={() => setSelection(null)}
       >
         <defs>
           <linearGradient id="chartFill" x1="0" x2="0" y1="0" y2="1">
@@ -100,6 +144,15 @@ export function CandlesChart({ candles, phase, error }: CandlesChartProps) {
           stroke="none"
           points={`${padding},${height - padding} ${points} ${width - padding},${height - padding}`}
         />
+        {selection && (
+          <rect
+            x={Math.min(selection.from, selection.to)}
+            y={padding}
+            width={Math.abs(selection.to - selection.from)}
+            height={height - padding * 2}
+            fill="rgba(148, 163, 184, 0.15)"
+          />
+        )}
         <g className="chart-axis">
           <text x={padding} y={height - 4}>{minPrice.toFixed(2)}</text>
           <text x={width - padding} y={height - 4} textAnchor="end">
@@ -120,6 +173,15 @@ export function CandlesChart({ candles, phase, error }: CandlesChartProps) {
           <span className="chart-meta-label">Latest close</span>
           <span className="chart-meta-value">{last.close.toFixed(2)}</span>
         </div>
+        <div>
+          <span className="chart-meta-label">Candles drawn</span>
+          <span className="chart-meta-value">{candles.length.toLocaleString()}</span>
+        </div>
+        {onResetZoom && (
+          <button type="button" onClick={onResetZoom}>
+            Reset zoom
+          </button>
+        )}
       </div>
     </div>
   );
@@ -3,11 +3,17 @@
 import { useState } from 'react';
 
 import { CandlesChart } from '@/components/candles-chart';
+import { EquityChart } from '@/components/equity-chart';
 import { ParametersForm } from '@/components/parameters-form';
 import { ResultsTable } from '@/components/results-table';
 import { fetchCandlesForConfig, runBacktest } from '@/lib/api';
 import type { BacktestConfig, BacktestPhase, BacktestReport, Candle } from '@/types/backtest';
 
+// One point per horizontal pixel of the equity chart is enough.
+const EQUITY_POINTS = 600;
+// The server aggregates the preview to at most this many candles for the visible range.
+const PREVIEW_BARS = 600;
+
 const defaultConfig: BacktestConfig = {
   instrumentName: 'BTC_USDC',
   interval: '60',
@@ -27,6 +33,18 @@ export function Dashboard() {
   const [candles, setCandles] = useState<Candle[]>([]);
   const [report, setReport] = useState<BacktestReport | null>(null);
   const [error, setError] = useState<string | null>(null);
+  const [zoomed, setZoomed] = useState(false);
+
+  const showRange = async (viewStart: number | null, viewEnd: number | null) => {
+    try {
+      setCandles(
+        await fetchCandlesForConfig(lastConfig, { maxBars: PREVIEW_BARS, viewStart, viewEnd })
+      );
+      setZoomed(viewStart !== null);
+    } catch (caught) {
+      setError(caught instanceof Error ? caught.message : 'Unexpected error while zooming');
+    }
+  };
 
   const handleSubmit = async (config: BacktestConfig) => {
     setLastConfig(config);
@@ -34,9 +52,10 @@ export function Dashboard() {
     setReport(null);
     setPhase('fetchingCandles');
     setCandles([]);
+    setZoomed(false);
 
     try {
-      const fetchedCandles = await fetchCandlesForConfig(config);
+      const fetchedCandles = await fetchCandlesForConfig(config, { maxBars: PREVIEW_BARS });
       setCandles(fetchedCandles);
 
       if (!fetchedCandles.length) {
@@ -44,8 +63,9 @@ export function Dashboard() {
         return;
       }
 
+      // The preview may be aggregated, so the server backtests its own copy of the raw candles.
       setPhase('runningBacktest');
-      const response = await runBacktest({ config, candles: fetchedCandles });
+      const response = await runBacktest({ config, maxPoints: EQUITY_POINTS });
       setReport(response.report);
     } catch (caught) {
       const message =
@@ -81,9 +101,20 @@ export function Dashboard() {
         </div>
       </div>
 
+      <div className="card">
+        <h2>Equity Curve</h2>
+        <EquityChart equity={report?.equity} />
+      </div>
+
       <div className="card">
         <h2>Candle Preview</h2>
-        <CandlesChart candles={candles} phase={phase} error={error} />
+        <CandlesChart
+          candles={candles}
+          phase={phase}
+          error={error}
+          onZoom={showRange}
+          onResetZoom={zoomed ? () => showRange(null, null) : undefined}
+        />
       </div>
 
       <ResultsTable report={report} phase={phase} />
@@ -0,0 +1,101 @@
+import { ChartPlaceholder } from '@/components/chart-placeholder';
+import { toEpochMs } from '@/lib/api';
+import type { EquityCurve } from '@/types/backtest';
+
+interface EquityChartProps {
+  equity?: EquityCurve | null;
+}
+
+const width = 600;
+const height = 260;
+const drawdownHeight = 80;
+const padding = 24;
+
+function toPoints(
+  times: number[],
+  values: number[],
+  top: number,
+  bottom: number
+): string {
+  const minTime = times[0];
+  const spanTime = times[times.length - 1] - minTime || 1;
+  const minValue = Math.min(...values);
+  const spanValue = Math.max(...values) - minValue || 1;
+
+  return values
+    .map((value, index) => {
+      const x = padding + ((times[index] - minTime) / spanTime) * (width - padding * 2);
+      const y = bottom - ((value - minValue) / spanValue) * (bottom - top);
+      return `${x},${y}`;
+    })
+    .join(' ');
+}
+
+export function EquityChart({ equity }: EquityChartProps) {
+  if (!equity || !equity.equity.length) {
+    return <ChartPlaceholder />;
+  }
+
+  // The server already downsampled the curve, so every point can be drawn.
+  const times = equity.timestamps.map((timestamp) => toEpochMs(timestamp));
+  const equityPoints = toPoints(times, equity.equity, padding, height - padding);
+  const baseline = height + padding / 2;
+  const drawdownPoints = toPoints(
+    times,
+    equity.drawdown.map((value) => -value),
+    baseline,
+    height + drawdownHeight - padding / 2
+  );
+  const right = width - padding;
+
+  return (
+    <div className="chart-container">
+      <svg
+        className="chart"
+        viewBox={`0 0 ${width} ${height + drawdownHeight}`}
+        role="img"
+        aria-label="Equity and drawdown over time"
+      >
+        <polyline
+          fill="none"
+          stroke="rgba(74, 222, 128, 0.85)"
+          strokeWidth={2}
+          strokeLinejoin="round"
+          points={equityPoints}
+        />
+        <polyline
+          fill="rgba(248, 113, 113, 0.2)"
+          stroke="rgba(248, 113, 113, 0.85)"
+          strokeWidth={1.5}
+          points={`${padding},${baseline} ${drawdownPoints} ${right},${baseline}`}
+        />
+      </svg>
+      <div className="chart-meta">
+        <div>
+          <span className="chart-meta-label">Max drawdown</span>
+          <span className="chart-meta-value">
+            {(equity.maxDrawdown * 100).toFixed(2)}%
+          </span>
+        </div>
+        <div>
+          <span className="chart-meta-label">Sharpe</span>
+          <span className="chart-meta-value">
+            {equity.sharpe === null ? '–' : equity.sharpe.toFixed(2)}
+          </span>
+        </div>
+        <div>
+          <span className="chart-meta-label">Exposure</span>
+          <span className="chart-meta-value">
+            {(equity.exposure * 100).toFixed(1)}%
+          </span>
+        </div>
+        <div>
+          <span className="chart-meta-label">Bars</span>
+          <span className="chart-meta-value">
+            {equity.bars.toLocaleString()} ({equity.equity.length} plotted)
+          </span>
+        </div>
+      </div>
+    </div>
+  );
+}
@@ -2,9 +2,14 @@ import type {
   BacktestConfig,
   BacktestRequestBody,
   BacktestResponseBody,
-  Candle
+  Candle,
+  EquityCurve,
+  Timestamp,
+  TradeResult
 } from '@/types/backtest';
 
+const NDJSON_CONTENT_TYPE = 'application/x-ndjson';
+
 export interface CandlesRequest {
   instrumentName: string;
   interval: string;
@@ -12,14 +17,41 @@ export interface CandlesRequest {
   end?: string | null;
 }
 
+/**
+ * Visible time range (epoch milliseconds) and the most candles worth drawing in it. The
+ * server merges candles into coarser buckets until they fit.
+ */
+export interface CandleViewport {
+  maxBars: number;
+  viewStart?: number | null;
+  viewEnd?: number | null;
+}
+
+/**
+ * Convert a server timestamp to epoch milliseconds. ISO strings without an offset are UTC,
+ * not browser-local time.
+ */
+export function toEpochMs(value: Timestamp): number {
+  if (typeof value === 'number') {
+    return value;
+  }
+  const hasZone = /(Z|[+-]\d{2}:?\d{2})$/i.test(value);
+  return new Date(hasZone ? value : `${value}Z`).getTime();
+}
+
 export interface CandlesResponse {
   candles: Candle[];
 }
 
-function toQueryParams({ instrumentName, interval, start, end }: CandlesRequest): string {
+function toQueryParams(
+  { instrumentName, interval, start, end }: CandlesRequest,
+  viewport?: CandleViewport
+): string {
+  // Epoch timestamps keep zoom ranges in the same UTC time base as the server.
   const params = new URLSearchParams({
     instrument_name: instrumentName,
-    resolution: interval
+    resolution: interval,
+    timestamp_format: 'epoch'
   });
 
   if (start) {
@@ -28,6 +60,15 @@ function toQueryParams({ instrumentName, interval, start, end }: CandlesRequest)
   if (end) {
     params.set('end', end);
   }
+  if (viewport) {
+    params.set('max_bars', String(viewport.maxBars));
+    if (viewport.viewStart != null) {
+      params.set('view_start', new Date(viewport.viewStart).toISOString());
+    }
+    if (viewport.viewEnd != null) {
+      params.set('view_end', new Date(viewport.viewEnd).toISOString());
+    }
+  }
 
   return params.toString();
 }
@@ -52,21 +93,75 @@ function normalizeCandles(payload: unknown): Candle[] {
   return [];
 }
 
-export async function fetchCandlesForConfig(config: BacktestConfig): Promise<Candle[]> {
-  const query = toQueryParams({
-    instrumentName: config.instrumentName,
-    interval: config.interval,
-    start: config.start,
-    end: config.end
-  });
+/**
+ * Yield each line of an NDJSON response as it arrives, so large candle and
+ * trade lists are parsed incrementally instead of as one JSON document.
+ */
+export async function* readNdjson<T>(response: Response): AsyncGenerator<T> {
+  if (!response.body) {
+    const text = await response.text();
+    for (const line of text.split('\n')) {
+      if (line.trim()) {
+        yield JSON.parse(line) as T;
+      }
+    }
+    return;
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    buffered += done ? decoder.decode() : decoder.decode(value, { stream: true });
+    const lines = buffered.split('\n');
+    buffered = done ? '' : lines.pop() ?? '';
+    for (const line of lines) {
+      if (line.trim()) {
+        yield JSON.parse(line) as T;
+      }
+    }
+    if (done) {
+      return;
+    }
+  }
+}
+
+function isNdjson(response: Response): boolean {
+  return (response.headers.get('Content-Type') ?? '').startsWith(NDJSON_CONTENT_TYPE);
+}
+
+export async function fetchCandlesForConfig(
+  config: BacktestConfig,
+  viewport?: CandleViewport
+): Promise<Candle[]> {
+  const query = toQueryParams(
+    {
+      instrumentName: config.instrumentName,
+      interval: config.interval,
+      start: config.start,
+      end: config.end
+    },
+    viewport
+  );
 
-  const response = await fetch(`/api/candles?${query}`);
+  const response = await fetch(`/api/candles?${query}`, {
+    headers: { Accept: NDJSON_CONTENT_TYPE }
+  });
   if (!response.ok) {
     throw new Error(`Failed to fetch candles (${response.status})`);
   }
 
-  const data = await response.json();
-  return normalizeCandles(data).map((candle) => ({
+  let candles: Candle[];
+  if (isNdjson(response)) {
+    candles = [];
+    for await (const candle of readNdjson<Candle>(response)) {
+      candles.push(candle);
+    }
+  } else {
+    candles = normalizeCandles(await response.json());
+  }
+  return candles.map((candle) => ({
     ...candle,
     open: Number(candle.open),
     high: Number(candle.high),
@@ -76,20 +171,76 @@ export async function fetchCandlesForConfig(config: BacktestConfig): Promise<Can
   }));
 }
 
+interface ReportSummary {
+  finalCash: number;
+  wins: number;
+  losses: number;
+  equity?: EquityCurve;
+}
+
+async function readReportNdjson(response: Response): Promise<BacktestResponseBody> {
+  let summary: ReportSummary | null = null;
+  const trades: TradeResult[] = [];
+  for await (const line of readNdjson<ReportSummary | TradeResult>(response)) {
+    if (summary === null) {
+      summary = line as ReportSummary;
+    } else {
+      trades.push(line as TradeResult);
+    }
+  }
+  if (summary === null) {
+    throw new Error('Backtest response was empty');
+  }
+  return { report: { ...summary, trades } };
+}
+
+interface CachedBacktest {
+  etag: string;
+  body: BacktestResponseBody;
+}
+
+const MAX_CACHED_BACKTESTS = 16;
+const backtestCache = new Map<string, CachedBacktest>();
+
 export async function runBacktest(
   payload: BacktestRequestBody
 ): Promise<BacktestResponseBody> {
+  const requestBody = JSON.stringify(payload);
+  const cached = backtestCache.get(requestBody);
+  const headers: Record<string, string> = {
+    Accept: NDJSON_CONTENT_TYPE,
+    'Content-Type': 'application/json'
+  };
+  if (cached) {
+    headers['If-None-Match'] = cached.etag;
+  }
+
   const response = await fetch('/api/backtest', {
     method: 'POST',
-    headers: {
-      'Content-Type': 'application/json'
-    },
-    body: JSON.stringify(payload)
+    headers,
+    body: requestBody
   });
 
+  if (response.status === 304 && cached) {
+    return cached.body;
+  }
   if (!response.ok) {
     throw new Error(`Backtest failed (${response.status})`);
   }
 
-  return (await response.json()) as BacktestResponseBody;
+  const body = isNdjson(response)
+    ? await readReportNdjson(response)
+    : ((await response.json()) as BacktestResponseBody);
+  const etag = response.headers.get('ETag');
+  if (etag) {
+    backtestCache.delete(requestBody);
+    backtestCache.set(requestBody, { etag, body });
+    if (backtestCache.size > MAX_CACHED_BACKTESTS) {
+      const oldest = backtestCache.keys().next().value;
+      if (oldest !== undefined) {
+        backtestCache.delete(oldest);
+      }
+    }
+  }
+  return body;
 }
@@ -11,8 +11,13 @@ export interface BacktestConfig {
   longWindow: number;
 }
 
+/** ISO-8601 strings by default, epoch milliseconds with `timestampFormat: 'epoch'`. */
+export type Timestamp = string | number;
+
+export type TimestampFormat = 'iso' | 'epoch';
+
 export interface Candle {
-  timestamp: string;
+  timestamp: Timestamp;
   open: number;
   high: number;
   low: number;
@@ -22,10 +27,10 @@ export interface Candle {
 
 export interface Position {
   entryPrice: number;
-  entryTime: string;
+  entryTime: Timestamp;
   size: number;
   exitPrice?: number;
-  exitTime?: string;
+  exitTime?: Timestamp;
   stopLoss?: number;
   takeProfit?: number;
 }
@@ -35,16 +40,30 @@ export interface TradeResult {
   profit: number;
 }
 
+/** Equity curve downsampled on the server to at most `maxPoints` points. */
+export interface EquityCurve {
+  bars: number;
+  timestamps: Timestamp[];
+  equity: number[];
+  drawdown: number[];
+  maxDrawdown: number;
+  sharpe: number | null;
+  exposure: number;
+}
+
 export interface BacktestReport {
   trades: TradeResult[];
   finalCash: number;
   wins: number;
   losses: number;
+  equity?: EquityCurve;
 }
 
 export interface BacktestRequestBody {
   config: BacktestConfig;
   candles?: Candle[];
+  timestampFormat?: TimestampFormat;
+  maxPoints?: number;
 }
 
 export interface BacktestResponseBody {
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from benchmarks import run
+
+
+def test_benchmark_suite_runs_and_compares_with_baseline(tmp_path: Path) -> None:
+    results = run.run_benchmarks(sizes=[500], generators=["random_walk"], repeat=1)
+
+    assert {result.case for result in results} == {case.name for case in run.CASES}
+    assert all(result.bars == 500 and result.bars_per_sec > 0 for result in results)
+
+    baseline = run.baseline_document(results)
+    first = results[0]
+    baseline["results"][first.key]["bars_per_sec"] = first.bars_per_sec * 2
+    rows = {row["key"]: row for row in run.compare(results, baseline, tolerance=0.2)}
+    assert rows[first.key]["regression"]
+    assert rows[first.key]["ratio"] == 0.5
+    assert not any(row["regression"] for key, row in rows.items() if key != first.key)
+
+    baseline_path = tmp_path / "baseline.json"
+    baseline_path.write_text(json.dumps(baseline))
+    argv = ["--sizes", "500", "--generator", "random_walk", "--case", "run_vectorized", "--repeat", "1"]
+    assert run.main([*argv, "--baseline", str(baseline_path), "--tolerance", "0.99", "--fail-on-regression"]) == 0
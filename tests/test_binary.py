@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import pickle
+from datetime import datetime
+from http import HTTPStatus
+
+import numpy as np
+import pytest
+
+from backtester import http
+from backtester.binary import CONTENT_TYPE, decode_candles, encode_candles
+from backtester.frame import CandleFrame
+from backtester.timeutils import to_epoch_ms
+
+CLOSES = [14.0, 13.0, 12.0, 11.0, 10.0, 11.0, 12.0, 13.0, 14.0, 15.0]
+CONFIG = {"shortWindow": 3, "longWindow": 5, "takeProfit": 0.02, "stopLoss": 0.05}
+
+
+def _frame() -> CandleFrame:
+    start = to_epoch_ms(datetime(2024, 1, 1))
+    ticks = start + np.arange(len(CLOSES), dtype=np.int64) * 60_000
+    closes = np.array(CLOSES)
+    return CandleFrame(ticks, closes - 0.5, closes + 1, closes - 1, closes, np.full(len(CLOSES), 2.0))
+
+
+def test_round_trip_views_the_body_without_copying() -> None:
+    frame = _frame()
+    body = bytearray(encode_candles(frame, {"config": CONFIG}))
+
+    header, decoded = decode_candles(body)
+
+    assert header == {"config": CONFIG, "length": len(CLOSES)}
+    for name, column in frame.columns().items():
+        np.testing.assert_array_equal(getattr(decoded, name), column)
+        assert np.shares_memory(getattr(decoded, name), np.frombuffer(body, dtype=np.uint8))
+    assert decoded.ticks.dtype == np.int64
+    assert decoded.close.ctypes.data % 8 == 0
+
+
+def test_empty_frame_round_trips() -> None:
+    header, decoded = decode_candles(encode_candles(CandleFrame.empty()))
+    assert header == {"length": 0}
+    assert len(decoded) == 0
+
+
+@pytest.mark.parametrize(
+    "body",
+    [b"", b"XXXX\x00\x00\x00\x00", b"BTCF\xff\x00\x00\x00{}", encode_candles(CandleFrame.empty()) + b"\0" * 8],
+)
+def test_rejects_malformed_bodies(body: bytes) -> None:
+    with pytest.raises(ValueError):
+        decode_candles(body)
+
+
+def test_truncated_columns_are_rejected() -> None:
+    with pytest.raises(ValueError, match="does not hold 10 candles"):
+        decode_candles(encode_candles(_frame())[:-8])
+
+
+def test_binary_upload_matches_json_upload() -> None:
+    frame = _frame()
+    json_payload = {"config": CONFIG, "candles": http._serialize_candles(frame)}
+    binary_payload = http.payload_from_body(encode_candles(frame, {"config": CONFIG}), f"{CONTENT_TYPE}; v=1")
+
+    assert isinstance(binary_payload["candles"], CandleFrame)
+    assert http.run_backtest_response(binary_payload) == http.run_backtest_response(json_payload)
+    # Binary payloads can be handed to the job queue's worker processes.
+    assert len(pickle.loads(pickle.dumps(binary_payload))["candles"]) == len(CLOSES)
+
+
+def test_payload_from_body_reports_bad_input() -> None:
+    status, body = http.run_backtest_response({"config": CONFIG, "candles": CandleFrame.empty()})
+    assert status is HTTPStatus.OK
+    assert body["report"]["trades"] == []
+
+    with pytest.raises(http._RequestError) as excinfo:
+        http.payload_from_body(b"nope", CONTENT_TYPE)
+    assert excinfo.value.status is HTTPStatus.BAD_REQUEST
+
+    with pytest.raises(http._RequestError):
+        http.payload_from_body(b"[1, 2]", "application/json")
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from backtester.cache import ResultCache, config_fingerprint, etag_matches, frame_fingerprint, make_etag
+from backtester.config import BacktestConfig
+from backtester.frame import CandleFrame
+
+
+def _frame(closes: list[float]) -> CandleFrame:
+    size = len(closes)
+    return CandleFrame(np.arange(size) * 60_000, closes, closes, closes, closes, np.ones(size))
+
+
+def test_result_cache_evicts_least_recently_used_and_expired_entries() -> None:
+    now = [0.0]
+    cache: ResultCache[str] = ResultCache(max_entries=2, ttl=10.0, clock=lambda: now[0])
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"
+
+    cache.put("c", "C")
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+
+    now[0] = 10.0
+    assert cache.get("c") is None
+    assert cache.stats() == {"entries": 1, "hits": 2, "misses": 2, "evictions": 2}
+
+
+def test_result_cache_rejects_invalid_bounds() -> None:
+    with pytest.raises(ValueError):
+        ResultCache(max_entries=0)
+    with pytest.raises(ValueError):
+        ResultCache(ttl=0)
+
+
+def test_fingerprints_identify_content() -> None:
+    config = BacktestConfig(start=datetime(2024, 1, 1), initial_cash=1000)
+    assert config_fingerprint(config) == config_fingerprint(BacktestConfig(start=datetime(2024, 1, 1)))
+    assert config_fingerprint(config) != config_fingerprint(BacktestConfig(short_window=8))
+
+    frame = _frame([1.0, 2.0, 3.0, 4.0])
+    assert frame_fingerprint(frame) == frame_fingerprint(_frame([1.0, 2.0, 3.0, 4.0]))
+    strided = CandleFrame(np.array([0, 120_000]), [1.0, 3.0], [1.0, 3.0], [1.0, 3.0], [1.0, 3.0], [1.0, 1.0])
+    assert frame_fingerprint(frame[::2]) == frame_fingerprint(strided)
+    assert frame_fingerprint(frame) != frame_fingerprint(_frame([1.0, 2.0, 3.0, 5.0]))
+
+
+def test_etag_matching() -> None:
+    etag = make_etag("abc")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+
+from backtester.backtest import Backtester
+from backtester.config import BacktestConfig
+from backtester.frame import CandleFrame
+from backtester.models import Candle
+from backtester.strategy import crossover, simple_moving_average
+
+
+def _random_frame(seed: int, size: int, rounded: bool = False) -> CandleFrame:
+    rng = np.random.default_rng(seed)
+    closes = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, size)))
+    if rounded:
+        # Coarse prices create flat stretches where the averages tie exactly.
+        closes = np.round(closes)
+    ticks = np.arange(size, dtype=np.int64) * 60_000 + 1_704_067_200_000
+    return CandleFrame(ticks, closes, closes, closes, closes, np.ones(size))
+
+
+CONFIGS = [
+    BacktestConfig(short_window=3, long_window=5, take_profit=0.01, stop_loss=0.01, max_open_positions=1),
+    BacktestConfig(short_window=5, long_window=20, take_profit=0.03, stop_loss=0.02, max_open_positions=3),
+    BacktestConfig(short_window=2, long_window=7, take_profit=0.005, stop_loss=0.05, max_open_positions=10),
+    BacktestConfig(short_window=9, long_window=21, take_profit=0.5, stop_loss=0.5, max_open_positions=2),
+]
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("config", CONFIGS)
+@pytest.mark.parametrize("rounded", [False, True])
+def test_vectorized_engine_matches_loop_engine(seed: int, config: BacktestConfig, rounded: bool) -> None:
+    frame = _random_frame(seed, 2_000, rounded=rounded)
+
+    expected = Backtester(config, engine="loop").run(frame)
+    actual = Backtester(config, engine="vectorized").run(frame)
+
+    assert actual.trades == expected.trades
+    assert actual.final_cash == expected.final_cash
+    assert (actual.wins, actual.losses) == (expected.wins, expected.losses)
+
+
+def _original_engine(candles: List[Candle], config: BacktestConfig) -> Tuple[float, List[Tuple[float, float]]]:
+    """The bar-by-bar engine as first written, reduced to its final cash and trade prices."""
+
+    short_ma = simple_moving_average([candle.close for candle in candles], config.short_window)
+    long_ma = simple_moving_average([candle.close for candle in candles], config.long_window)
+    cash = config.initial_cash
+    open_positions: List[Tuple[float, float, float]] = []
+    trades: List[Tuple[float, float]] = []
+    for index, candle in enumerate(candles):
+        for position in list(open_positions):
+            entry_price, take_profit, stop_loss = position
+            if candle.close >= take_profit or candle.close <= stop_loss or index == len(candles) - 1:
+                open_positions.remove(position)
+                trades.append((entry_price, candle.close))
+                cash += candle.close - entry_price
+        if index == 0 or math.isnan(short_ma[index]) or math.isnan(long_ma[index]):
+            continue
+        if math.isnan(short_ma[index - 1]) or math.isnan(long_ma[index - 1]):
+            continue
+        if len(open_positions) >= config.max_open_positions:
+            continue
+        if crossover(short_ma[index - 1], long_ma[index - 1], short_ma[index], long_ma[index]):
+            open_positions.append(
+                (candle.close, candle.close * (1 + config.take_profit), candle.close * (1 - config.stop_loss))
+            )
+    return cash, trades
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("tick", [0.1, 1.0])
+@pytest.mark.parametrize("windows", [(3, 5), (9, 21)])
+def test_engines_reproduce_the_original_engine_on_rounded_prices(
+    seed: int, tick: float, windows: Tuple[int, int]
+) -> None:
+    rng = np.random.default_rng(seed)
+    closes = np.round(100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.002, 600))) / tick) * tick
+    start = datetime(2024, 1, 1)
+    candles = [
+        Candle(timestamp=start + timedelta(minutes=index), open=close, high=close, low=close, close=close, volume=1.0)
+        for index, close in enumerate(closes.tolist())
+    ]
+    config = BacktestConfig(
+        short_window=windows[0], long_window=windows[1], take_profit=0.002, stop_loss=0.002, max_open_positions=1
+    )
+    final_cash, trades = _original_engine(candles, config)
+
+    for engine in ("loop", "vectorized"):
+        report = Backtester(config, engine=engine).run(candles)
+        assert report.final_cash == final_cash
+        assert [(trade.position.entry_price, trade.position.exit_price) for trade in report.trades] == trades
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 5, 6])
+def test_engines_agree_on_tiny_inputs(size: int) -> None:
+    frame = _random_frame(42, size)
+    config = BacktestConfig(short_window=2, long_window=4)
+
+    expected = Backtester(config, engine="loop").run(frame)
+    actual = Backtester(config, engine="vectorized").run(frame)
+
+    assert actual == expected
+
+
+def test_unknown_engine_is_rejected() -> None:
+    with pytest.raises(ValueError, match="engine"):
+        Backtester(BacktestConfig(), engine="gpu")
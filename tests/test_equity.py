@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from http import HTTPStatus
+
+import numpy as np
+import pytest
+
+from backtester import http as api_http
+from backtester.backtest import Backtester
+from backtester.cache import ResultCache
+from backtester.config import BacktestConfig
+from backtester.equity import equity_curve, lttb_indices
+from backtester.models import BacktestReport
+from backtester.synthetic import random_walk
+
+CONFIG = BacktestConfig(max_open_positions=3, take_profit=0.004, stop_loss=0.003, short_window=5, long_window=20)
+
+
+def _reference_equity(frame, report: BacktestReport, initial_cash: float) -> np.ndarray:
+    values = []
+    for index, tick in enumerate(frame.ticks.tolist()):
+        value = initial_cash
+        for trade in report.trades:
+            position = trade.position
+            if position.exit_time <= tick:
+                value += trade.profit
+            elif position.entry_time <= tick:
+                value += (frame.close[index] - position.entry_price) * position.size
+        values.append(value)
+    return np.asarray(values)
+
+
+@pytest.mark.parametrize("engine", ["loop", "vectorized"])
+def test_equity_curve_marks_open_positions_to_market(engine: str) -> None:
+    frame = random_walk(800, seed=6, volatility=0.002)
+    report = Backtester(CONFIG, engine=engine, timestamps="epoch").run(frame)
+
+    curve = equity_curve(frame, report, CONFIG.initial_cash)
+
+    assert np.allclose(curve.equity, _reference_equity(frame, report, CONFIG.initial_cash))
+    assert curve.equity[-1] == pytest.approx(report.final_cash)
+    peaks = np.maximum.accumulate(curve.equity)
+    assert curve.max_drawdown == pytest.approx(float(np.max((peaks - curve.equity) / peaks)))
+    assert 0 < curve.exposure < 1
+    assert curve.sharpe is not None
+
+    # Reports holding plain trade lists with datetime timestamps give the same curve.
+    listed = Backtester(CONFIG, engine=engine).run(frame)
+    plain = BacktestReport(trades=list(listed.trades), final_cash=listed.final_cash)
+    assert np.allclose(equity_curve(frame, plain, CONFIG.initial_cash).equity, curve.equity)
+
+
+def test_lttb_keeps_endpoints_and_extremes() -> None:
+    x = np.arange(10_000)
+    y = np.sin(x / 500.0)
+    y[4_321] = 25.0
+
+    indices = lttb_indices(x, y, 200)
+
+    assert len(indices) == 200
+    assert indices[0] == 0 and indices[-1] == 9_999
+    assert np.all(np.diff(indices) > 0)
+    assert 4_321 in indices
+    assert lttb_indices(x[:50], y[:50], 200).tolist() == list(range(50))
+    with pytest.raises(ValueError):
+        lttb_indices(x, y, 2)
+
+
+def test_backtest_response_includes_downsampled_equity() -> None:
+    cache: ResultCache[BacktestReport] = ResultCache()
+    payload = {
+        "config": {"shortWindow": 5, "longWindow": 20, "takeProfit": 0.004, "stopLoss": 0.003},
+        "candles": random_walk(5_000, seed=2, volatility=0.002),
+    }
+
+    _, plain, plain_etag = api_http.cached_backtest_response(payload, cache)
+    status, body, etag = api_http.cached_backtest_response({**payload, "maxPoints": 300}, cache)
+
+    assert status == HTTPStatus.OK
+    assert "equity" not in plain["report"]
+    assert etag != plain_etag
+    assert cache.stats()["hits"] == 1
+    equity = body["report"]["equity"]
+    assert equity["bars"] == 5_000
+    assert len(equity["timestamps"]) == len(equity["equity"]) == len(equity["drawdown"]) == 300
+    assert equity["equity"][-1] == pytest.approx(body["report"]["finalCash"])
+    assert set(equity) >= {"maxDrawdown", "sharpe", "exposure"}
+    for invalid in (2, 10**6, "100", True):
+        assert api_http.cached_backtest_response({**payload, "maxPoints": invalid}, cache)[0] == HTTPStatus.BAD_REQUEST
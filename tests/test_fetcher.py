@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from backtester.fetcher import ChartDataFetcher, RetryableError
+
+MINUTE = 60_000
+
+
+class FakeDeribit:
+    """Serve deterministic one-minute candles, failing selected windows first."""
+
+    def __init__(self) -> None:
+        self.requests: List[Dict[str, int]] = []
+        self.failures: Dict[int, List[int]] = {}
+        self.error_body = b""
+        self.lock = threading.Lock()
+
+    def handler(self) -> type[BaseHTTPRequestHandler]:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler signature
+                query = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+                start = int(query["start_timestamp"])
+                end = int(query["end_timestamp"])
+                with fake.lock:
+                    fake.requests.append({"start": start, "end": end})
+                    pending = fake.failures.get(start)
+                    status = pending.pop(0) if pending else 200
+                if status != 200:
+                    self.send_response(status)
+                    self.send_header("Retry-After", "0")
+                    self.send_header("Content-Length", str(len(fake.error_body)))
+                    self.end_headers()
+                    self.wfile.write(fake.error_body)
+                    return
+                # Deribit includes the candle at end_timestamp, so windows overlap by one bar.
+                ticks = list(range(start, end + 1, MINUTE))
+                body = json.dumps(
+                    {
+                        "result": {
+                            "ticks": ticks,
+                            "open": [tick / MINUTE for tick in ticks],
+                            "high": [tick / MINUTE + 1 for tick in ticks],
+                            "low": [tick / MINUTE - 1 for tick in ticks],
+                            "close": [tick / MINUTE for tick in ticks],
+                            "volume": [1.0 for _ in ticks],
+                            "status": "ok",
+                        }
+                    }
+                ).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A003 - following base signature
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def fake_deribit() -> Iterator[tuple[FakeDeribit, str]]:
+    fake = FakeDeribit()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), fake.handler())
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    try:
+        yield fake, f"http://127.0.0.1:{server.server_address[1]}/chart"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_windows_cover_range_without_gaps() -> None:
+    fetcher = ChartDataFetcher(window_candles=10)
+    windows = fetcher.windows("1", 0, 25 * MINUTE)
+    assert windows == [(0, 10 * MINUTE), (10 * MINUTE, 20 * MINUTE), (20 * MINUTE, 25 * MINUTE)]
+
+
+def test_fetch_stitches_windows_in_order_and_deduplicates(fake_deribit: tuple[FakeDeribit, str]) -> None:
+    fake, url = fake_deribit
+    fetcher = ChartDataFetcher(url, max_workers=4, window_candles=10, sleep=lambda _seconds: None)
+
+    columns = fetcher.fetch("BTC_USDC", "1", 0, 95 * MINUTE)
+
+    assert len(fake.requests) == 10
+    # Every window returns its closing bar too; the overlap is collapsed and the bar at the end dropped.
+    assert columns["ticks"].tolist() == list(range(0, 95 * MINUTE, MINUTE))
+    assert columns["close"].tolist() == [float(index) for index in range(95)]
+
+
+def test_fetch_retries_transient_failures(fake_deribit: tuple[FakeDeribit, str]) -> None:
+    fake, url = fake_deribit
+    fake.failures = {10 * MINUTE: [429, 503], 20 * MINUTE: [500]}
+    delays: List[float] = []
+    fetcher = ChartDataFetcher(url, max_workers=3, window_candles=10, backoff=0.01, sleep=delays.append)
+
+    columns = fetcher.fetch("BTC_USDC", "1", 0, 30 * MINUTE)
+
+    assert columns["ticks"].size == 30
+    assert len(fake.requests) == 6
+    assert len(delays) >= 3
+
+
+def test_fetch_gives_up_after_max_retries(fake_deribit: tuple[FakeDeribit, str]) -> None:
+    fake, url = fake_deribit
+    fake.failures = {0: [503, 503, 503]}
+    fetcher = ChartDataFetcher(url, window_candles=10, max_retries=2, sleep=lambda _seconds: None)
+
+    with pytest.raises(RetryableError, match="503"):
+        fetcher.fetch("BTC_USDC", "1", 0, 5 * MINUTE)
+    assert len(fake.requests) == 3
+
+
+def test_fetch_raises_client_errors_immediately(fake_deribit: tuple[FakeDeribit, str]) -> None:
+    fake, url = fake_deribit
+    fake.failures = {0: [400]}
+    fetcher = ChartDataFetcher(url, window_candles=10, sleep=lambda _seconds: None)
+
+    with pytest.raises(requests.HTTPError):
+        fetcher.fetch("BTC_USDC", "1", 0, 5 * MINUTE)
+    assert len(fake.requests) == 1
+
+
+def test_fetch_reports_non_json_client_errors_as_http_errors(fake_deribit: tuple[FakeDeribit, str]) -> None:
+    fake, url = fake_deribit
+    fake.failures = {0: [404]}
+    fake.error_body = b"<html>Not Found</html>"
+    fetcher = ChartDataFetcher(url, window_candles=10, sleep=lambda _seconds: None)
+
+    with pytest.raises(requests.HTTPError):
+        fetcher.fetch("BTC_USDC", "1", 0, 5 * MINUTE)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from backtester.backtest import Backtester
+from backtester.config import BacktestConfig
+from backtester.frame import CandleFrame, as_frame
+from backtester.models import Candle
+from backtester.timeutils import display_bucket_ms, format_iso_ms, from_epoch_ms
+
+MINUTE = 60_000
+
+
+def _frame(closes: list[float]) -> CandleFrame:
+    ticks = np.arange(len(closes), dtype=np.int64) * MINUTE + 1_704_067_200_000
+    close = np.asarray(closes, dtype=np.float64)
+    return CandleFrame(ticks, close, close + 1, close - 1, close, np.ones(len(closes)))
+
+
+def test_frame_rows_are_candles() -> None:
+    frame = _frame([10.0, 11.0, 12.0])
+
+    assert len(frame) == 3
+    assert frame[0] == Candle(
+        timestamp=datetime(2024, 1, 1, 0, 0), open=10.0, high=11.0, low=9.0, close=10.0, volume=1.0
+    )
+    assert [candle.close for candle in frame] == [10.0, 11.0, 12.0]
+    assert frame[-1].timestamp == datetime(2024, 1, 1, 0, 2)
+
+
+def test_frame_slicing_is_zero_copy() -> None:
+    frame = _frame([float(value) for value in range(10)])
+
+    window = frame[2:5]
+    by_time = frame.between(1_704_067_200_000 + 2 * MINUTE, 1_704_067_200_000 + 5 * MINUTE)
+
+    assert window.close.tolist() == [2.0, 3.0, 4.0]
+    assert by_time.ticks.tolist() == window.ticks.tolist()
+    assert np.shares_memory(window.close, frame.close)
+    assert np.shares_memory(by_time.ticks, frame.ticks)
+
+
+def test_as_frame_round_trips_candles() -> None:
+    frame = _frame([1.0, 2.0])
+    assert as_frame(frame) is frame
+
+    rebuilt = as_frame(frame.to_candles())
+    assert rebuilt.ticks.tolist() == frame.ticks.tolist()
+    assert rebuilt.close.tolist() == frame.close.tolist()
+
+
+def test_backtester_accepts_frames_and_candle_lists_alike() -> None:
+    closes = [14, 13, 12, 11, 10, 11, 12, 13, 14, 15, 14, 13, 12, 11, 12, 13, 14]
+    frame = _frame([float(close) for close in closes])
+    config = BacktestConfig(take_profit=0.02, stop_loss=0.05, short_window=3, long_window=5)
+
+    from_frame = Backtester(config).run(frame)
+    from_list = Backtester(config).run(frame.to_candles())
+
+    assert from_frame.total_trades > 0
+    assert from_frame == from_list
+
+
+def test_epoch_timestamp_mode_matches_datetime_mode() -> None:
+    frame = _frame((100 + 5 * np.sin(np.arange(200) / 6)).tolist())
+    config = BacktestConfig(short_window=3, long_window=8, take_profit=0.01, stop_loss=0.01, max_open_positions=3)
+
+    expected = Backtester(config).run(frame)
+    for engine in ("loop", "vectorized"):
+        report = Backtester(config, engine=engine, timestamps="epoch").run(frame)
+        assert report.trades
+        assert all(isinstance(trade.position.entry_time, int) for trade in report.trades)
+        assert [from_epoch_ms(trade.position.exit_time) for trade in report.trades] == [
+            trade.position.exit_time for trade in expected.trades
+        ]
+
+    with pytest.raises(ValueError):
+        Backtester(config, timestamps="unix")
+
+
+def test_format_iso_ms_matches_isoformat_for_mixed_precision() -> None:
+    ticks = np.array([0, 1_500, 60_000, 61_001])
+    assert format_iso_ms(ticks) == [from_epoch_ms(tick).isoformat() for tick in ticks]
+    rows = CandleFrame(ticks, *[np.ones(4)] * 5).rows(epoch=True)
+    assert [row.timestamp for row in rows] == [0, 1_500, 60_000, 61_001]
+
+
+def test_resample_aggregates_ohlcv_into_aligned_buckets() -> None:
+    frame = _frame([float(value) for value in range(1, 11)])[1:]
+    frame.volume[:] = np.arange(1.0, 10.0)
+
+    buckets = frame.resample(3 * MINUTE)
+
+    assert buckets.ticks.tolist() == [frame.ticks[0] - MINUTE + offset * 3 * MINUTE for offset in range(4)]
+    assert buckets.open.tolist() == [2.0, 4.0, 7.0, 10.0]
+    assert buckets.high.tolist() == [4.0, 7.0, 10.0, 11.0]
+    assert buckets.low.tolist() == [1.0, 3.0, 6.0, 9.0]
+    assert buckets.close.tolist() == [3.0, 6.0, 9.0, 10.0]
+    assert buckets.volume.tolist() == [3.0, 12.0, 21.0, 9.0]
+    assert len(CandleFrame.empty().resample(MINUTE)) == 0
+
+
+def test_display_bucket_ms_picks_deribit_resolutions() -> None:
+    assert display_bucket_ms(100 * MINUTE, MINUTE, 500) == MINUTE
+    assert display_bucket_ms(365 * 1440 * MINUTE, MINUTE, 1000) == 720 * MINUTE
+    assert display_bucket_ms(10 * 1440 * MINUTE, 60 * MINUTE, 100) == 180 * MINUTE
+    assert display_bucket_ms(10 * 365 * 1440 * MINUTE, MINUTE, 1000) == 4 * 1440 * MINUTE
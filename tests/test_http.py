@@ -63,8 +63,9 @@ def test_run_backtest_uses_posted_candles(monkeypatch: pytest.MonkeyPatch) -> No
     class DummyBacktester:
         last_instance: "DummyBacktester" | None = None
 
-        def __init__(self, config: http.BacktestConfig):
+        def __init__(self, config: http.BacktestConfig, timestamps: str = "datetime"):
             self.config = config
+            self.timestamps = timestamps
             self.candles = []
             DummyBacktester.last_instance = self
 
@@ -102,6 +103,7 @@ def test_run_backtest_uses_posted_candles(monkeypatch: pytest.MonkeyPatch) -> No
     dummy = DummyBacktester.last_instance
     assert dummy is not None
     assert dummy.config.instrument_name == "BTC_USDC"
+    assert dummy.timestamps == "epoch"
     assert len(dummy.candles) == len(candles)
     assert all(isinstance(item, Candle) for item in dummy.candles)
 
@@ -115,7 +117,7 @@ def test_run_backtest_fetches_when_candles_missing(monkeypatch: pytest.MonkeyPat
         return fetched
 
     class DummyBacktester:
-        def __init__(self, config: http.BacktestConfig):
+        def __init__(self, config: http.BacktestConfig, timestamps: str = "datetime"):
             self.config = config
 
         def run(self, received_candles: list[Candle]) -> BacktestReport:
@@ -151,3 +153,149 @@ def test_run_backtest_fetches_when_candles_missing(monkeypatch: pytest.MonkeyPat
     assert called["resolution"] == "5"
     assert called["start"] == datetime(2024, 1, 1, 0, 0)
     assert called["end"] == datetime(2024, 1, 1, 1, 0)
+
+
+def _crossover_payload(**config: Any) -> Dict[str, Any]:
+    closes = [14, 13, 12, 11, 10, 11, 12, 13, 14, 15]
+    return {
+        "config": {"shortWindow": 3, "longWindow": 5, "takeProfit": 0.02, "stopLoss": 0.05, **config},
+        "candles": [
+            {
+                "timestamp": _make_candle(offset_minutes=minute).timestamp.isoformat(),
+                "open": close,
+                "high": close,
+                "low": close,
+                "close": close,
+                "volume": 1,
+            }
+            for minute, close in enumerate(closes)
+        ],
+    }
+
+
+def test_cached_backtest_reuses_reports_and_honours_etags(monkeypatch: pytest.MonkeyPatch) -> None:
+    cache: http.ResultCache[Dict[str, Any]] = http.ResultCache()
+    runs = []
+    original_run = http.Backtester.run
+
+    def counting_run(self: http.Backtester, candles: Any) -> BacktestReport:
+        runs.append(self.config)
+        return original_run(self, candles)
+
+    monkeypatch.setattr(http.Backtester, "run", counting_run)
+
+    status, first, etag = http.cached_backtest_response(_crossover_payload(), cache)
+    assert status is HTTPStatus.OK
+    assert etag is not None and etag.startswith('"')
+
+    # Equivalent configs (1000 vs 1000.0) map to the same cached report.
+    status, second, second_etag = http.cached_backtest_response(_crossover_payload(initialCash=1000), cache)
+    assert (status, second, second_etag) == (HTTPStatus.OK, first, etag)
+    assert len(runs) == 1
+    assert cache.hits == 1
+
+    status, body, _ = http.cached_backtest_response(_crossover_payload(), cache, if_none_match=f"W/{etag}")
+    assert (status, body) == (HTTPStatus.NOT_MODIFIED, {})
+
+    status, _, other_etag = http.cached_backtest_response(_crossover_payload(takeProfit=0.03), cache)
+    assert status is HTTPStatus.OK
+    assert other_etag != etag
+    assert len(runs) == 2
+
+
+def test_cached_candles_skip_repeated_fetches(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    def fake_fetch(**kwargs: Any) -> list[Candle]:
+        calls.append(kwargs)
+        return [_make_candle(), _make_candle(offset_minutes=1, close=101.0)]
+
+    monkeypatch.setattr(http, "fetch_candles", fake_fetch)
+    cache: http.ResultCache[Any] = http.ResultCache()
+    query = {"instrument_name": "BTC_USDC", "resolution": "1", "start": "2024-01-01T00:00:00"}
+
+    status, body, etag = http.cached_candles_response(query, cache)
+    assert status is HTTPStatus.OK
+    assert len(body["candles"]) == 2
+
+    assert http.cached_candles_response(dict(query), cache, if_none_match=etag)[0] is HTTPStatus.NOT_MODIFIED
+    assert http.cached_candles_response(dict(query), cache)[1] == body
+    assert len(calls) == 1
+
+    status, _, etag = http.cached_candles_response({"resolution": "1"}, cache)
+    assert (status, etag) == (HTTPStatus.BAD_REQUEST, None)
+
+
+def test_candles_are_aggregated_to_the_viewport(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    def fake_fetch(**kwargs: Any) -> list[Candle]:
+        calls.append(kwargs)
+        return [_make_candle(offset_minutes=minute, close=100.0 + minute) for minute in range(24 * 60)]
+
+    monkeypatch.setattr(http, "fetch_candles", fake_fetch)
+    cache: http.ResultCache[Any] = http.ResultCache()
+    query = {"instrument_name": "BTC_USDC", "resolution": "1", "start": "2024-01-01T00:00:00"}
+
+    _, full, full_etag = http.cached_candles_response(query, cache)
+    status, day, day_etag = http.cached_candles_response({**query, "max_bars": "100"}, cache)
+    assert status is HTTPStatus.OK
+    assert len(full["candles"]) == 1440
+    # 1440 minutes in at most 100 buckets: 15-minute bars.
+    assert len(day["candles"]) == 96
+    first = day["candles"][0]
+    assert (first["timestamp"], first["open"], first["close"]) == ("2024-01-01T00:00:00", 99.0, 114.0)
+    assert (first["high"], first["low"], first["volume"]) == (115.0, 98.0, 150.0)
+    assert day_etag != full_etag
+
+    zoomed = {**query, "max_bars": "100", "view_start": "2024-01-01T06:00:00", "view_end": "2024-01-01T07:00:00"}
+    status, hour, _ = http.cached_candles_response(zoomed, cache)
+    assert status is HTTPStatus.OK
+    assert [candle["close"] for candle in hour["candles"]] == [100.0 + minute for minute in range(360, 420)]
+    assert len(calls) == 1
+
+    for invalid in ("1", "x", str(http.MAX_CANDLE_BARS + 1)):
+        assert http.cached_candles_response({**query, "max_bars": invalid}, cache)[0] is HTTPStatus.BAD_REQUEST
+
+
+def test_timestamp_format_epoch_returns_raw_ticks() -> None:
+    payload = _crossover_payload()
+    status, iso_body = http.run_backtest_response(payload)
+    assert status is HTTPStatus.OK
+    trade = iso_body["report"]["trades"][0]["position"]
+    assert trade["entryTime"] == "2024-01-01T00:07:00"
+
+    status, epoch_body = http.run_backtest_response({**payload, "timestampFormat": "epoch"})
+    assert status is HTTPStatus.OK
+    epoch_trade = epoch_body["report"]["trades"][0]["position"]
+    assert epoch_trade["entryTime"] == 1704067620000
+    assert epoch_trade["exitTime"] == 1704067680000
+
+    status, body = http.run_backtest_response({**payload, "timestampFormat": "unix"})
+    assert status is HTTPStatus.BAD_REQUEST
+    assert "timestampFormat" in body["detail"]
+
+
+def test_epoch_format_gets_its_own_etag() -> None:
+    cache: http.ResultCache[Any] = http.ResultCache()
+    _, _, iso_etag = http.cached_backtest_response(_crossover_payload(), cache)
+    _, body, epoch_etag = http.cached_backtest_response({**_crossover_payload(), "timestampFormat": "epoch"}, cache)
+
+    assert epoch_etag != iso_etag
+    assert isinstance(body["report"]["trades"][0]["position"]["entryTime"], int)
+    # Both representations are served from the one cached report.
+    assert (cache.misses, cache.hits, len(cache)) == (1, 1, 1)
+
+
+@pytest.mark.parametrize("timestamp_format", ["iso", "epoch"])
+def test_ledger_trades_serialize_like_trade_objects(timestamp_format: str) -> None:
+    from backtester.ledger import TradeLedger
+
+    ledger = TradeLedger()
+    ledger.append(1_704_067_200_000, 1_704_067_260_500, 100.0, 101.5, 1.0, 99.0, 102.0)
+    ledger.append(1_704_067_320_000, 1_704_067_380_000, 101.0, 100.0, 2.0, None, None)
+
+    assert http._serialize_trades(ledger, timestamp_format) == http._serialize_trades(list(ledger), timestamp_format)
+    batches = [trade for batch in http._trade_batches(ledger, timestamp_format) for trade in batch]
+    assert batches == http._serialize_trades(list(ledger), timestamp_format)
+    assert batches[1]["position"]["stopLoss"] is None
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import gc
+import threading
+
+import numpy as np
+import pytest
+
+from backtester.backtest import Backtester
+from backtester.config import BacktestConfig
+from backtester.frame import CandleFrame
+from backtester import indicators
+from backtester.indicators import IndicatorCache
+from backtester.strategy import moving_average, simple_moving_average
+
+
+def test_cached_sma_matches_reference_and_is_reused() -> None:
+    values = np.random.default_rng(3).normal(100.0, 5.0, 500)
+    cache = IndicatorCache()
+
+    first = cache.sma(values, 20)
+    second = cache.sma(values, 20)
+    other = cache.sma(values, 7)
+
+    assert second is first
+    np.testing.assert_array_equal(first, moving_average(values, 20))
+    np.testing.assert_array_equal(other, simple_moving_average(values.tolist(), 7))
+    assert (cache.misses, cache.hits) == (2, 1)
+    with pytest.raises(ValueError):
+        first[0] = 1.0
+
+
+def test_cache_evicts_least_recently_used_series() -> None:
+    values = np.arange(1_000, dtype=np.float64)
+    # Room for two averages.
+    cache = IndicatorCache(max_bytes=2 * 8 * 1_000)
+
+    cache.sma(values, 2)
+    cache.sma(values, 3)
+    cache.sma(values, 2)
+    cache.sma(values, 4)
+
+    assert cache.evictions == 1
+    assert cache.nbytes <= cache.max_bytes
+    hits = cache.hits
+    cache.sma(values, 4)
+    assert cache.hits == hits + 1
+
+
+def test_cache_forgets_collected_datasets() -> None:
+    cache = IndicatorCache()
+    values = np.ones(100)
+    cache.sma(values, 5)
+    assert len(cache) == 1
+
+    del values
+    gc.collect()
+
+    assert len(cache) == 0
+    assert cache.nbytes == 0
+
+
+def test_cached_sources_cannot_change_under_their_averages() -> None:
+    cache = IndicatorCache()
+    values = np.arange(100, dtype=np.float64)
+    base = np.arange(200, dtype=np.float64)
+    view = base[:100]
+    cache.sma(values, 5)
+    cache.sma(view, 5)
+
+    with pytest.raises(ValueError):
+        values[0] = 1.0
+    with pytest.raises(ValueError):
+        base[0] = 1.0
+
+    # Views of a buffer that stays writable elsewhere are recomputed every time.
+    buffer = bytearray(800)
+    foreign = np.frombuffer(buffer)
+    cache.sma(foreign, 5)
+    buffer[:] = np.ones(100).tobytes()
+    np.testing.assert_array_equal(cache.sma(foreign, 5), moving_average(np.ones(100), 5))
+    assert len(cache) == 2
+
+
+def test_averages_are_computed_outside_the_cache_lock(monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = IndicatorCache()
+    acquired = []
+
+    def try_lock() -> None:
+        if cache._lock.acquire(timeout=1):
+            acquired.append(True)
+            cache._lock.release()
+
+    def probe(values: np.ndarray, window: int) -> np.ndarray:
+        other = threading.Thread(target=try_lock)
+        other.start()
+        other.join()
+        return moving_average(values, window)
+
+    monkeypatch.setattr(indicators, "moving_average", probe)
+    cache.sma(np.ones(10), 3)
+
+    assert acquired == [True]
+
+
+def test_backtester_reuses_indicators_across_runs() -> None:
+    closes = 100.0 + np.sin(np.linspace(0, 40, 2_000)) * 5
+    frame = CandleFrame(np.arange(2_000) * 60_000, closes, closes, closes, closes, np.ones(2_000))
+    cache = IndicatorCache()
+
+    first = Backtester(BacktestConfig(short_window=5, long_window=20), indicator_cache=cache).run(frame)
+    misses = cache.misses
+    Backtester(BacktestConfig(short_window=5, long_window=30), indicator_cache=cache).run(frame)
+    again = Backtester(BacktestConfig(short_window=5, long_window=20), indicator_cache=cache).run(frame)
+
+    assert cache.misses == misses + 1
+    assert again == first
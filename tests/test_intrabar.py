@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pytest
+
+from backtester import cli
+from backtester.backtest import Backtester
+from backtester.config import BacktestConfig
+from backtester.frame import CandleFrame
+from backtester.intrabar import STOP_LOSS, TAKE_PROFIT, IntrabarResolver, find_intrabar_exit
+from backtester.synthetic import random_walk
+from backtester.timeutils import MINUTE_MS
+
+HOUR_MS = 60 * MINUTE_MS
+
+
+def _bars(rows: list[tuple[float, float, float, float]], step_ms: int = HOUR_MS, start_ms: int = 0) -> CandleFrame:
+    opens, highs, lows, closes = (np.array(column, dtype=float) for column in zip(*rows))
+    ticks = start_ms + np.arange(len(rows), dtype=np.int64) * step_ms
+    return CandleFrame(ticks, opens, highs, lows, closes, np.ones(len(rows)))
+
+
+def _hourly(minutes: CandleFrame) -> CandleFrame:
+    bars = len(minutes) // 60
+    shape = (bars, 60)
+    return CandleFrame(
+        minutes.ticks[: bars * 60 : 60],
+        minutes.open[: bars * 60 : 60],
+        minutes.high[: bars * 60].reshape(shape).max(axis=1),
+        minutes.low[: bars * 60].reshape(shape).min(axis=1),
+        minutes.close[59 : bars * 60 : 60],
+        minutes.volume[: bars * 60].reshape(shape).sum(axis=1),
+    )
+
+
+def test_exit_at_level_gap_and_final_close() -> None:
+    resolver = IntrabarResolver(None, HOUR_MS)
+    frame = _bars([(100, 100, 100, 100), (100, 104, 99, 101), (101, 101, 90, 95), (95, 96, 94, 95)])
+
+    # The close never reaches 103, but the high of bar 1 does.
+    assert find_intrabar_exit(frame, 0, 103.0, 97.0, resolver) == (1, 103.0)
+    # Bar 2 opens below the 99.5 stop, so it fills at the open rather than the level.
+    gap = _bars([(100, 100, 100, 100), (98, 99, 97, 98)])
+    assert find_intrabar_exit(gap, 0, 110.0, 99.5, resolver) == (1, 98.0)
+    assert find_intrabar_exit(frame, 0, 200.0, 10.0, resolver) == (3, 95.0)
+    index, price = find_intrabar_exit(frame, 3, 200.0, 10.0, resolver)
+    assert index == 4 and math.isnan(price)
+    assert resolver.stats() == {"ambiguous": 0, "fetches": 0, "unresolved": 0}
+
+
+def test_ambiguous_bar_is_resolved_from_fine_candles_once() -> None:
+    requests = []
+    fine = _bars([(100, 101, 99.5, 100.5), (100.5, 103.5, 100, 103), (103, 103, 96, 97)], MINUTE_MS, HOUR_MS)
+
+    def fetch(start_ms: int, end_ms: int) -> CandleFrame:
+        requests.append((start_ms, end_ms))
+        return fine.between(start_ms, end_ms)
+
+    resolver = IntrabarResolver(fetch, HOUR_MS)
+    frame = _bars([(100, 100, 100, 100), (100, 103.5, 96, 97)])
+
+    assert find_intrabar_exit(frame, 0, 103.0, 97.0, resolver) == (1, 103.0)
+    assert resolver.first_hit(HOUR_MS, 103.0, 97.0) == (TAKE_PROFIT, 103.0)
+    # A position with other levels on the same bar reuses the cached minute candles.
+    assert resolver.first_hit(HOUR_MS, 103.6, 96.5) == (STOP_LOSS, 96.5)
+    assert requests == [(0, 8 * HOUR_MS)]
+    assert resolver.stats() == {"ambiguous": 3, "fetches": 1, "unresolved": 0}
+
+    unresolved = IntrabarResolver(None, HOUR_MS)
+    assert unresolved.first_hit(HOUR_MS, 103.0, 97.0) == (STOP_LOSS, 97.0)
+    assert unresolved.stats()["unresolved"] == 1
+
+
+def test_adjacent_ambiguous_bars_share_one_fetch() -> None:
+    requests = []
+    fine = _bars([(100, 104, 100, 103), (103, 103, 96, 97)] * 4, 30 * MINUTE_MS, 8 * HOUR_MS)
+
+    def fetch(start_ms: int, end_ms: int) -> CandleFrame:
+        requests.append((start_ms, end_ms))
+        return fine.between(start_ms, end_ms)
+
+    resolver = IntrabarResolver(fetch, HOUR_MS, batch_bars=4)
+
+    for bar in range(8, 12):
+        assert resolver.first_hit(bar * HOUR_MS, 103.0, 97.0) == (TAKE_PROFIT, 103.0)
+    assert resolver.first_hit(12 * HOUR_MS, 103.0, 97.0) == (STOP_LOSS, 97.0)
+    assert requests == [(8 * HOUR_MS, 12 * HOUR_MS), (12 * HOUR_MS, 16 * HOUR_MS)]
+    assert resolver.stats() == {"ambiguous": 5, "fetches": 2, "unresolved": 1}
+
+    with pytest.raises(ValueError):
+        IntrabarResolver(fetch, HOUR_MS, batch_bars=0)
+
+
+def test_backtester_drills_down_only_into_ambiguous_bars() -> None:
+    minutes = random_walk(60 * 400, seed=11, volatility=0.002)
+    hours = _hourly(minutes)
+    config = BacktestConfig(max_open_positions=3, take_profit=0.01, stop_loss=0.01, short_window=3, long_window=8)
+    fetched = []
+
+    def fetch(start_ms: int, end_ms: int) -> CandleFrame:
+        fetched.append((start_ms, end_ms))
+        return minutes.between(start_ms, end_ms)
+
+    resolver = IntrabarResolver(fetch, HOUR_MS)
+    report = Backtester(config, engine="loop", timestamps="epoch", intrabar=resolver).run(hours)
+
+    assert report.total_trades > 0
+    assert 0 < len(fetched) < len(hours) // 10
+    assert len(set(fetched)) == len(fetched)
+    for trade in report.trades:
+        position = trade.position
+        bar = int(np.searchsorted(hours.ticks, position.exit_time))
+        take_profit, stop_loss = position.take_profit, position.stop_loss
+        if hours.high[bar] >= take_profit and hours.low[bar] <= stop_loss and hours.open[bar] < take_profit:
+            # Ambiguous bars are settled by the first minute that reaches a level.
+            assert any(start <= position.exit_time < end for start, end in fetched)
+            window = minutes.between(position.exit_time, position.exit_time + HOUR_MS)
+            first = int(np.flatnonzero((window.high >= take_profit) | (window.low <= stop_loss))[0])
+            expected = take_profit if window.high[first] >= take_profit else stop_loss
+            assert position.exit_price in (pytest.approx(expected), pytest.approx(window.open[first]))
+        elif bar == len(hours) - 1 and hours.high[bar] < take_profit and hours.low[bar] > stop_loss:
+            assert position.exit_price == hours.close[bar]
+        else:
+            assert position.exit_price in (take_profit, stop_loss, hours.open[bar])
+    assert report.final_cash == pytest.approx(config.initial_cash + report.cumulative_profit)
+
+
+def test_cli_intrabar_summary(monkeypatch: pytest.MonkeyPatch) -> None:
+    minutes = random_walk(60 * 200, seed=3, volatility=0.002)
+    monkeypatch.setattr(cli, "_fetch_for_config", lambda _args, _config: _hourly(minutes))
+    monkeypatch.setattr(
+        cli,
+        "_intrabar_resolver",
+        lambda _args, _config: IntrabarResolver(lambda start, end: minutes.between(start, end), HOUR_MS),
+    )
+    args = cli.create_parser().parse_args(
+        ["BTC_USDC", "60", "--intrabar", "--short-window", "3", "--long-window", "8", "--take-profit", "0.01"]
+    )
+
+    summary = cli.run_from_args(args)
+
+    assert set(summary["intrabar"]) == {"ambiguous", "fetches", "unresolved"}
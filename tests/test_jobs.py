@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+import pytest
+
+from backtester import http
+from backtester.jobs import CANCELLED, CANCELLING, RUNNING, SUCCEEDED, JobQueue, QueueFullError
+from backtester.singleflight import default_single_flight
+from backtester.store import empty_columns
+
+RELEASE = threading.Event()
+
+
+def _blocking_job(payload: Dict[str, Any], progress: Callable[[float], None]) -> Tuple[HTTPStatus, Dict[str, Any]]:
+    progress(0.5)
+    RELEASE.wait(timeout=5)
+    return HTTPStatus.OK, {"echo": payload["value"]}
+
+
+def _fetch_candles_job(payload: Dict[str, Any], progress: Callable[[float], None]) -> Tuple[HTTPStatus, Dict[str, Any]]:
+    columns = default_single_flight().fetch(payload["key"], 0, 60_000, lambda start, end: empty_columns())
+    return HTTPStatus.OK, {"rows": len(columns["ticks"])}
+
+
+def _wait_for(predicate: Callable[[], bool], timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            pytest.fail("condition not reached in time")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def thread_queue() -> Iterator[JobQueue]:
+    RELEASE.clear()
+    job_queue = JobQueue(_blocking_job, max_workers=1, max_pending=2, ttl=60.0, executor_factory=ThreadPoolExecutor)
+    try:
+        yield job_queue
+    finally:
+        RELEASE.set()
+        job_queue.shutdown()
+
+
+def test_jobs_report_progress_and_result(thread_queue: JobQueue) -> None:
+    job = thread_queue.submit({"value": 1})
+
+    _wait_for(lambda: thread_queue.get(job.id).progress == 0.5)
+    assert thread_queue.get(job.id).status == RUNNING
+
+    RELEASE.set()
+    _wait_for(lambda: thread_queue.get(job.id).finished)
+    finished = thread_queue.get(job.id).to_dict()
+    assert finished["status"] == SUCCEEDED
+    assert finished["progress"] == 1.0
+    assert finished["result"] == {"echo": 1}
+
+
+def test_queue_applies_backpressure_and_cancels_queued_jobs(thread_queue: JobQueue) -> None:
+    running = thread_queue.submit({"value": 1})
+    queued = thread_queue.submit({"value": 2})
+
+    with pytest.raises(QueueFullError):
+        thread_queue.submit({"value": 3})
+
+    assert thread_queue.cancel(queued.id).status == CANCELLED
+    # The cancelled job frees its slot immediately.
+    thread_queue.submit({"value": 4})
+
+    RELEASE.set()
+    _wait_for(lambda: thread_queue.get(running.id).finished)
+    assert thread_queue.get(queued.id).result is None
+
+
+def test_cancelled_running_jobs_hold_their_slot_until_they_end(thread_queue: JobQueue) -> None:
+    running = thread_queue.submit({"value": 1})
+    _wait_for(lambda: thread_queue.get(running.id).status == RUNNING)
+    thread_queue.submit({"value": 2})
+
+    assert thread_queue.cancel(running.id).status == CANCELLING
+    assert not thread_queue.get(running.id).finished
+    with pytest.raises(QueueFullError):
+        thread_queue.submit({"value": 3})
+
+    RELEASE.set()
+    _wait_for(lambda: thread_queue.get(running.id).finished)
+    cancelled = thread_queue.get(running.id)
+    assert cancelled.status == CANCELLED
+    assert cancelled.result is None
+
+
+def test_finished_jobs_expire_after_ttl() -> None:
+    now = [1_000.0]
+    job_queue = JobQueue(_blocking_job, max_workers=1, ttl=10.0, executor_factory=ThreadPoolExecutor, clock=lambda: now[0])
+    RELEASE.set()
+    try:
+        job = job_queue.submit({"value": 1})
+        _wait_for(lambda: job_queue.get(job.id).finished)
+        now[0] += 11.0
+        assert job_queue.get(job.id) is None
+    finally:
+        job_queue.shutdown()
+
+
+def test_http_job_endpoints_run_backtests_in_worker_processes() -> None:
+    job_queue = JobQueue(http.run_backtest_response, max_workers=1, max_pending=2)
+    closes = [14, 13, 12, 11, 10, 11, 12, 13, 14, 15]
+    payload = {
+        "config": {"shortWindow": 3, "longWindow": 5, "takeProfit": 0.02, "stopLoss": 0.05},
+        "candles": [
+            {"timestamp": f"2024-01-01T00:{minute:02d}:00", "open": c, "high": c, "low": c, "close": c, "volume": 1}
+            for minute, c in enumerate(closes)
+        ],
+    }
+    try:
+        status, body = http.submit_job_response(payload, job_queue)
+        assert status is HTTPStatus.ACCEPTED
+        job_id = body["job"]["id"]
+
+        _wait_for(lambda: http.get_job_response(job_id, job_queue)[1]["job"]["status"] == SUCCEEDED, timeout=20)
+        status, body = http.get_job_response(job_id, job_queue)
+        assert status is HTTPStatus.OK
+        assert len(body["job"]["result"]["report"]["trades"]) == 1
+
+        assert http.cancel_job_response(job_id, job_queue)[0] is HTTPStatus.CONFLICT
+        assert http.get_job_response("missing", job_queue)[0] is HTTPStatus.NOT_FOUND
+        assert http.submit_job_response({}, job_queue)[0] is HTTPStatus.BAD_REQUEST
+    finally:
+        job_queue.shutdown()
+
+
+def test_worker_jobs_ignore_downloads_in_flight_in_the_server() -> None:
+    key = ("jobs-test", "1")
+    release = threading.Event()
+
+    def slow_download(start_ms: int, end_ms: int) -> Dict[str, Any]:
+        release.wait(timeout=30)
+        return empty_columns()
+
+    download = threading.Thread(target=default_single_flight().fetch, args=(key, 0, 60_000, slow_download))
+    download.start()
+    job_queue = JobQueue(_fetch_candles_job, max_workers=1, max_pending=1)
+    try:
+        _wait_for(lambda: default_single_flight().in_flight(key) == [(0, 60_000)])
+        job = job_queue.submit({"key": key})
+
+        # A forked worker would wait on the server's download, which never lands in its copy of the table.
+        _wait_for(lambda: job_queue.get(job.id).finished, timeout=20)
+        assert job_queue.get(job.id).result == {"rows": 0}
+    finally:
+        release.set()
+        download.join()
+        job_queue.shutdown()
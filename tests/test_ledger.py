@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from backtester.backtest import Backtester
+from backtester.config import BacktestConfig
+from backtester.ledger import TRADE_DTYPE, TradeLedger, trade_stats
+from backtester.models import BacktestReport, Position, TradeResult
+from backtester.montecarlo import simulate
+from backtester.synthetic import random_walk
+from backtester.timeutils import from_epoch_ms
+
+CONFIG = BacktestConfig(max_open_positions=3, take_profit=0.004, stop_loss=0.003, short_window=5, long_window=20)
+
+
+def test_ledger_grows_and_caches_stats() -> None:
+    ledger = TradeLedger(capacity=1)
+    assert ledger.append(0, 60_000, 100.0, 110.0, 1.0, 98.0, 103.0) == 10.0
+    ledger.append(60_000, 120_000, 110.0, 105.0, 2.0, 107.8, 113.3)
+    stats = ledger.stats()
+
+    assert (stats.total_trades, stats.wins, stats.losses) == (2, 1, 1)
+    assert stats.cumulative_profit == 0.0
+    assert stats.profit_factor == 1.0
+    assert ledger.stats() is stats
+
+    ledger.append(120_000, 180_000, 105.0, 106.0, 1.0, None, None)
+    assert ledger.stats() is not stats
+    assert ledger.stats().average_trade == pytest.approx(1 / 3)
+    assert ledger.records.nbytes == 3 * TRADE_DTYPE.itemsize == 3 * 64
+    assert trade_stats(np.array([1.0, 2.0])).profit_factor is None
+
+
+def test_ledger_builds_trades_on_access() -> None:
+    ledger = TradeLedger()
+    ledger.append(0, 60_000, 100.0, 110.0, 1.0, 98.0, None)
+    ledger.append(60_000, 120_000, 110.0, 105.0, 1.0, 107.8, 113.3)
+
+    first = TradeResult(
+        position=Position(
+            entry_price=100.0,
+            entry_time=datetime(1970, 1, 1),
+            exit_price=110.0,
+            exit_time=datetime(1970, 1, 1, 0, 1),
+            stop_loss=98.0,
+        ),
+        profit=10.0,
+    )
+    assert ledger[0] == first
+    assert ledger[-1].position.take_profit == 113.3
+    assert ledger[:1] == [first]
+    assert list(ledger)[0] == first
+    assert ledger == [first, ledger[1]]
+    with pytest.raises(IndexError):
+        ledger[2]
+
+    epoch = TradeLedger.from_records(ledger.records, epoch=True)
+    assert epoch[1].position.exit_time == 120_000
+    assert epoch != ledger
+
+
+@pytest.mark.parametrize("engine", ["loop", "vectorized"])
+@pytest.mark.parametrize("timestamps", ["datetime", "epoch"])
+def test_engines_record_trades_in_a_ledger(engine: str, timestamps: str) -> None:
+    frame = random_walk(3_000, seed=4, volatility=0.002)
+
+    report = Backtester(CONFIG, engine=engine, timestamps=timestamps).run(frame)
+
+    assert isinstance(report.trades, TradeLedger)
+    assert report.total_trades > 10
+    profits = [trade.profit for trade in report.trades]
+    assert report.cumulative_profit == sum(profits)
+    assert report.final_cash == CONFIG.initial_cash + report.cumulative_profit
+    assert report.wins == sum(1 for profit in profits if profit > 0)
+    plain = BacktestReport(trades=list(report.trades), final_cash=report.final_cash, wins=report.wins)
+    assert plain.stats == report.stats
+    entry_tick = int(report.trades.records["entry_tick"][0])
+    expected_time = entry_tick if timestamps == "epoch" else from_epoch_ms(entry_tick)
+    assert report.trades[0].position.entry_time == expected_time
+
+
+def test_monte_carlo_reads_ledger_profits() -> None:
+    report = Backtester(CONFIG, engine="vectorized").run(random_walk(2_000, seed=9, volatility=0.002))
+
+    from_ledger = simulate(report, iterations=50, seed=1)
+    profits = [trade.profit for trade in report.trades]
+    from_list = simulate(profits, report.final_cash - report.cumulative_profit, iterations=50, seed=1)
+
+    assert np.array_equal(from_ledger.final_equity, from_list.final_equity)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import http.client
+import json
+import threading
+from http.server import ThreadingHTTPServer
+from typing import Any, Iterator
+
+import pytest
+
+from backtester import cli
+from backtester import http as api_http
+from backtester.metrics import MetricsRegistry, PhaseTimer
+from backtester.synthetic import random_walk
+
+
+def test_phase_timer_accumulates_and_renders_server_timing() -> None:
+    ticks = iter([0.0, 0.010, 0.010, 0.0125, 1.0, 1.005])
+    timer = PhaseTimer(clock=lambda: next(ticks))
+    with timer.phase("fetch"):
+        pass
+    with timer.phase("backtest"):
+        pass
+    with timer.phase("fetch"):
+        pass
+
+    assert list(timer.phases) == ["fetch", "backtest"]
+    assert timer.as_milliseconds() == {"fetch": 15.0, "backtest": 2.5}
+    assert timer.server_timing() == "fetch;dur=15.0, backtest;dur=2.5"
+
+
+def test_registry_renders_prometheus_text() -> None:
+    registry = MetricsRegistry()
+    requests = registry.counter("demo_requests_total", "Requests.", ("endpoint",))
+    latency = registry.histogram("demo_latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    registry.counter_callback("demo_hits_total", "Hits.", ("cache",), lambda: [(("result",), 3)])
+
+    requests.inc(endpoint="/api/candles")
+    requests.inc(2, endpoint="/api/candles")
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    text = registry.render()
+    assert "# TYPE demo_requests_total counter" in text
+    assert 'demo_requests_total{endpoint="/api/candles"} 3' in text
+    assert 'demo_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'demo_latency_seconds_bucket{le="1"} 2' in text
+    assert 'demo_latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "demo_latency_seconds_sum 5.55" in text
+    assert "demo_latency_seconds_count 3" in text
+    assert 'demo_hits_total{cache="result"} 3' in text
+
+    assert registry.counter("demo_requests_total", "Requests.", ("endpoint",)) is requests
+    with pytest.raises(ValueError):
+        registry.histogram("demo_requests_total", "Clash.")
+    with pytest.raises(ValueError):
+        registry.counter_callback("demo_requests_total", "Clash.", ("endpoint",), lambda: [])
+    with pytest.raises(ValueError):
+        registry.counter_callback("demo_hits_total", "Clash.", ("instance",), lambda: [])
+    with pytest.raises(ValueError):
+        requests.inc(method="GET")
+
+
+def test_run_backtest_response_reports_timings() -> None:
+    payload = {
+        "config": {"shortWindow": 3, "longWindow": 8, "takeProfit": 0.01, "stopLoss": 0.01},
+        "candles": api_http._serialize_candles(random_walk(200)),
+        "includeTimings": True,
+    }
+    bars_before = api_http.BARS_PROCESSED.value()
+
+    status, body = api_http.run_backtest_response(payload)
+
+    assert status == 200
+    assert list(body["report"]["timings"]) == ["parse", "backtest", "serialize"]
+    assert api_http.BARS_PROCESSED.value() == bars_before + 200
+    assert "timings" not in api_http.run_backtest_response({**payload, "includeTimings": False})[1]["report"]
+
+
+@pytest.fixture
+def server(monkeypatch: pytest.MonkeyPatch) -> Iterator[tuple[str, int]]:
+    monkeypatch.setattr(api_http, "_RESULT_CACHE", api_http.ResultCache())
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), api_http.BacktesterRequestHandler)
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    try:
+        yield httpd.server_address[:2]
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_server_timing_header_and_metrics_endpoint(server: tuple[str, int]) -> None:
+    connection = http.client.HTTPConnection(*server, timeout=5)
+    payload = {
+        "config": {"shortWindow": 3, "longWindow": 8, "takeProfit": 0.01, "stopLoss": 0.01},
+        "candles": api_http._serialize_candles(random_walk(300)),
+        "includeTimings": True,
+    }
+
+    connection.request("POST", "/api/backtest", body=json.dumps(payload), headers={"Content-Type": "application/json"})
+    response = connection.getresponse()
+    body = json.loads(response.read())
+    assert response.status == 200
+    phases = [entry.split(";")[0] for entry in response.getheader("Server-Timing").split(", ")]
+    assert phases == ["parse", "cache", "backtest"]
+    assert set(body["report"]["timings"]) == {"parse", "cache", "backtest"}
+
+    connection.request("GET", "/api/backtest/jobs/unknown")
+    connection.getresponse().read()
+
+    connection.request("GET", "/api/metrics")
+    response = connection.getresponse()
+    text = response.read().decode()
+    assert response.getheader("Content-Type").startswith("text/plain")
+    assert (
+        'backtester_http_request_duration_seconds_count{method="POST",endpoint="/api/backtest",status="200"}' in text
+    )
+    assert 'endpoint="/api/backtest/jobs/{id}",status="404"' in text
+    assert 'backtester_phase_duration_seconds_count{phase="serialize"}' in text
+    assert 'backtester_cache_misses_total{cache="result"} 1' in text
+    assert "backtester_bars_processed_total" in text
+    assert "# TYPE backtester_upstream_fetch_duration_seconds histogram" in text
+    connection.close()
+
+
+def test_cli_summary_includes_timings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cli, "_fetch_for_config", lambda _args, _config: random_walk(100))
+    args = cli.create_parser().parse_args(["BTC_USDC", "1", "--timings", "--short-window", "3", "--long-window", "8"])
+
+    summary: Any = cli.run_from_args(args)
+
+    assert list(summary["timings"]) == ["fetch", "backtest"]
+    assert "timings" not in cli.run_from_args(cli.create_parser().parse_args(["BTC_USDC", "1"]))
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from http import HTTPStatus
+
+import numpy as np
+import pytest
+
+from backtester import cli
+from backtester import http as api_http
+from backtester.cache import ResultCache
+from backtester.models import BacktestReport, Position, TradeResult
+from backtester.montecarlo import simulate
+from backtester.synthetic import random_walk
+
+PROFITS = [10.0, -5.0, 20.0, -15.0, 5.0, -2.0]
+
+
+def test_shuffle_keeps_totals_and_bounds_drawdown() -> None:
+    result = simulate(PROFITS, 100.0, iterations=500, method="shuffle", seed=1)
+
+    assert np.allclose(result.final_equity, 100.0 + sum(PROFITS))
+    assert np.allclose(result.win_rate, 0.5)
+    # Worst ordering: every loss first, 22 off the 100 peak.
+    assert result.max_drawdown.max() <= 0.22 + 1e-12
+    assert result.max_drawdown.min() >= 0.0
+    assert result.probability_of_loss == 0.0
+
+
+def test_bootstrap_matches_loop_reference_and_is_seeded() -> None:
+    first = simulate(PROFITS, 100.0, iterations=50, seed=7)
+    second = simulate(PROFITS, 100.0, iterations=50, seed=7)
+    assert np.array_equal(first.final_equity, second.final_equity)
+    assert not np.array_equal(first.final_equity, simulate(PROFITS, 100.0, iterations=50, seed=8).final_equity)
+
+    rng = np.random.default_rng(7)
+    indices = rng.integers(0, len(PROFITS), size=(50, len(PROFITS)))
+    for row, sample in enumerate(indices):
+        equity, peak, drawdown = 100.0, 100.0, 0.0
+        for index in sample:
+            equity += PROFITS[index]
+            peak = max(peak, equity)
+            drawdown = max(drawdown, (peak - equity) / peak)
+        assert first.final_equity[row] == pytest.approx(equity)
+        assert first.max_drawdown[row] == pytest.approx(drawdown)
+        assert first.win_rate[row] == pytest.approx(sum(PROFITS[index] > 0 for index in sample) / len(sample))
+
+
+def test_summary_percentiles_and_report_input() -> None:
+    trades = [TradeResult(Position(entry_price=1.0, entry_time=0), profit) for profit in PROFITS]
+    report = BacktestReport(trades=trades, final_cash=1013.0, wins=3, losses=3)
+
+    summary = simulate(report, iterations=2000, seed=0).to_dict(percentiles=(5, 50, 95))
+
+    assert summary["trades"] == len(PROFITS)
+    distribution = summary["final_equity"]
+    assert distribution["p5"] <= distribution["p50"] <= distribution["p95"]
+    assert distribution["mean"] == pytest.approx(1000.0 + np.mean(PROFITS) * len(PROFITS), abs=2.0)
+    assert simulate([], 50.0, iterations=3).final_equity.tolist() == [50.0, 50.0, 50.0]
+    with pytest.raises(ValueError):
+        simulate(PROFITS, iterations=0)
+
+
+def test_monte_carlo_response_reuses_cached_report() -> None:
+    cache: ResultCache[BacktestReport] = ResultCache()
+    payload = {
+        "config": {"shortWindow": 3, "longWindow": 8, "takeProfit": 0.002, "stopLoss": 0.002},
+        "candles": random_walk(2000, seed=5),
+        "iterations": 300,
+        "seed": 3,
+    }
+
+    status, body = api_http.monte_carlo_response(payload, cache)
+    again = api_http.monte_carlo_response(payload, cache)[1]
+
+    assert status == HTTPStatus.OK
+    assert body == again
+    assert cache.stats()["hits"] == 1
+    result = body["monteCarlo"]
+    assert result["iterations"] == 300 and result["trades"] > 0
+    assert set(result["maxDrawdown"]) >= {"mean", "p5", "p50", "p95"}
+    assert api_http.monte_carlo_response({**payload, "iterations": 10**9}, cache)[0] == HTTPStatus.BAD_REQUEST
+    assert api_http.monte_carlo_response({**payload, "method": "jackknife"}, cache)[0] == HTTPStatus.BAD_REQUEST
+
+
+def test_cli_monte_carlo_summary(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cli, "_fetch_for_config", lambda _args, _config: random_walk(2000, seed=5))
+    args = cli.create_parser().parse_args(
+        ["BTC_USDC", "1", "--take-profit", "0.002", "--stop-loss", "0.002", "--monte-carlo", "200", "--seed", "4"]
+    )
+
+    summary = cli.run_from_args(args)
+
+    assert summary["monte_carlo"]["iterations"] == 200
+    assert summary["monte_carlo"] == cli.run_from_args(args)["monte_carlo"]
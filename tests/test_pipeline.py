@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+import pytest
+
+from backtester import api, cli
+from backtester.backtest import Backtester
+from backtester.config import BacktestConfig
+from backtester.fetcher import ChartDataFetcher
+from backtester.frame import CandleFrame
+from backtester.pipeline import PrefetchedPages
+from backtester.store import CandleStore
+from backtester.synthetic import random_walk
+from backtester.timeutils import to_epoch_ms
+
+MINUTE = 60_000
+
+
+def _config() -> BacktestConfig:
+    return BacktestConfig(
+        instrument_name="BTC_USDC",
+        interval="1",
+        max_open_positions=3,
+        take_profit=0.004,
+        stop_loss=0.003,
+        short_window=5,
+        long_window=20,
+    )
+
+
+def _pages(frame: CandleFrame, cuts: List[int]) -> List[CandleFrame]:
+    bounds = [0, *cuts, len(frame)]
+    return [frame[lo:hi] for lo, hi in zip(bounds, bounds[1:])]
+
+
+class FakeFetcher(ChartDataFetcher):
+    def __init__(self, frame: CandleFrame, window_candles: int):
+        super().__init__(max_workers=3, window_candles=window_candles)
+        self.frame = frame
+        self.calls: List[Tuple[int, int]] = []
+        self._lock = threading.Lock()
+
+    def fetch_window(self, instrument_name: str, resolution: str, start_ms, end_ms) -> Dict[str, np.ndarray]:
+        with self._lock:
+            self.calls.append((start_ms, end_ms))
+        page = self.frame.between(start_ms, end_ms)
+        return {name: getattr(page, name).copy() for name in ("ticks", "open", "high", "low", "close", "volume")}
+
+
+@pytest.mark.parametrize("engine", ["loop", "vectorized"])
+def test_run_pages_matches_run(engine: str) -> None:
+    frame = random_walk(2_000, seed=3, volatility=0.002)
+    expected = Backtester(_config(), engine=engine).run(frame)
+
+    report = Backtester(_config(), engine=engine).run_pages(_pages(frame, [1, 7, 300, 301, 1_500]))
+
+    assert report.final_cash == expected.final_cash
+    assert [trade.profit for trade in report.trades] == [trade.profit for trade in expected.trades]
+    assert [trade.position.exit_time for trade in report.trades] == [
+        trade.position.exit_time for trade in expected.trades
+    ]
+
+
+def test_feed_matches_step() -> None:
+    frame = random_walk(500, seed=8, volatility=0.002)
+    stepped = Backtester(_config(), timestamps="epoch")
+    closed_by_step = [trade for candle in frame.rows(epoch=True) for trade in stepped.step(candle)]
+
+    fed = Backtester(_config(), timestamps="epoch")
+    closed_by_feed = [trade for page in _pages(frame, [19, 20, 250]) for trade in fed.feed(page)]
+
+    assert [trade.profit for trade in closed_by_feed] == [trade.profit for trade in closed_by_step]
+    assert fed.snapshot().final_cash == stepped.snapshot().final_cash
+
+
+def test_prefetched_pages_keep_order_and_forward_errors() -> None:
+    def pages() -> Iterator[int]:
+        yield from range(10)
+        raise RuntimeError("connection reset")
+
+    received = []
+    with PrefetchedPages(pages(), maxsize=2) as prefetched:  # type: ignore[arg-type]
+        with pytest.raises(RuntimeError, match="connection reset"):
+            for page in prefetched:
+                received.append(page)
+    assert received == list(range(10))
+
+    with pytest.raises(ValueError):
+        PrefetchedPages(iter([]), maxsize=0)
+
+
+def test_iter_windows_yields_in_order() -> None:
+    frame = random_walk(1_000, seed=1)
+    fetcher = FakeFetcher(frame, window_candles=64)
+    start = int(frame.ticks[0])
+    end = start + len(frame) * MINUTE
+
+    windows = list(fetcher.iter_windows("BTC_USDC", "1", start, end))
+
+    assert [(lo, hi) for lo, hi, _ in windows] == fetcher.windows("1", start, end)
+    ticks = np.concatenate([columns["ticks"] for _, _, columns in windows])
+    assert np.array_equal(ticks, frame.ticks)
+
+
+def test_iter_candle_pages_reads_store_and_downloads_the_rest(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    start = datetime(2024, 1, 1)
+    frame = random_walk(300, seed=5, start_ms=to_epoch_ms(start))
+    fetcher = FakeFetcher(frame, window_candles=50)
+    monkeypatch.setattr(api, "default_fetcher", lambda: fetcher)
+    store = CandleStore(tmp_path)
+    end = datetime(2024, 1, 1, 5)
+
+    first = list(api.iter_candle_pages("BTC_USDC", "1", start, datetime(2024, 1, 1, 2), store=store))
+    assert [len(page) for page in first] == [50, 50, 20]
+    downloaded = len(fetcher.calls)
+
+    pages = list(api.iter_candle_pages("BTC_USDC", "1", start, end, store=store))
+
+    assert [len(page) for page in pages] == [50] * 6
+    # The first two windows were fully covered by the earlier call.
+    assert len(fetcher.calls) - downloaded == 4
+    assert np.array_equal(np.concatenate([page.ticks for page in pages]), frame.ticks)
+    assert np.array_equal(np.concatenate([page.close for page in pages]), frame.close)
+
+
+def test_cli_pipeline_matches_regular_run(monkeypatch: pytest.MonkeyPatch) -> None:
+    frame = random_walk(1_200, seed=11, volatility=0.002)
+    monkeypatch.setattr(cli, "_fetch_for_config", lambda _args, _config: frame)
+    monkeypatch.setattr(cli, "_pages_for_config", lambda _args, _config: iter(_pages(frame, [100, 700])))
+    argv = ["BTC_USDC", "1", "--short-window", "5", "--long-window", "20", "--timings"]
+
+    regular = cli.run_from_args(cli.create_parser().parse_args(argv))
+    pipelined = cli.run_from_args(cli.create_parser().parse_args([*argv, "--pipeline"]))
+
+    assert pipelined["final_cash"] == regular["final_cash"]
+    assert pipelined["total_trades"] == regular["total_trades"]
+    assert set(pipelined["timings"]) == {"pipeline"}
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from backtester import cli
+from backtester.backtest import Backtester
+from backtester.config import BacktestConfig
+from backtester.frame import CandleFrame
+from backtester.portfolio import PortfolioBacktester, fetch_portfolio
+from backtester.synthetic import random_walk, regime_switching
+
+CONFIG = BacktestConfig(
+    initial_cash=10_000.0,
+    max_open_positions=3,
+    take_profit=0.004,
+    stop_loss=0.003,
+    short_window=5,
+    long_window=13,
+)
+
+
+def test_single_instrument_trades_match_the_engine() -> None:
+    frame = random_walk(3000, seed=4)
+
+    report = PortfolioBacktester(CONFIG).run({"BTC_USDC": frame})
+    expected = Backtester(CONFIG, engine="vectorized").run(frame)
+
+    assert report.total_trades == expected.total_trades
+    assert [
+        (trade.position.entry_time, trade.position.exit_time, trade.position.exit_price) for trade in report.trades
+    ] == [(trade.position.entry_time, trade.position.exit_time, trade.position.exit_price) for trade in expected.trades]
+    assert set(report.instruments) == {"BTC_USDC"}
+    assert report.final_cash == pytest.approx(CONFIG.initial_cash + report.cumulative_profit)
+    assert report.equity[-1] == pytest.approx(report.final_cash)
+
+
+def test_shared_cash_and_global_position_limit() -> None:
+    frames = {
+        "BTC_USDC": random_walk(2000, seed=1),
+        # Starts later and trades every other minute, so the timeline is the union of both.
+        "ETH_USDC": regime_switching(
+            800,
+            seed=2,
+            start_price=2000.0,
+            start_ms=1_704_067_200_000 + 600_000,
+            resolution_ms=120_000,
+            mean_duration=200,
+        ),
+    }
+    config = BacktestConfig(**{**CONFIG.__dict__, "max_open_positions": 2})
+
+    report = PortfolioBacktester(config, workers=2, timestamps="epoch").run(frames)
+
+    assert set(report.instruments) == {"BTC_USDC", "ETH_USDC"}
+    assert np.array_equal(report.ticks, np.union1d(frames["BTC_USDC"].ticks, frames["ETH_USDC"].ticks))
+    assert report.equity.shape == report.ticks.shape
+    assert report.equity[-1] == pytest.approx(report.final_cash)
+
+    # Never more than two positions open and never more cash committed than available.
+    events = sorted(
+        [(trade.position.entry_time, 1, trade) for trade in report.trades]
+        + [(trade.position.exit_time, 0, trade) for trade in report.trades],
+        key=lambda event: (event[0], event[1]),
+    )
+    cash, open_count = config.initial_cash, 0
+    for _, is_entry, trade in events:
+        notional = trade.position.entry_price * trade.position.size
+        if is_entry:
+            open_count += 1
+            cash -= notional
+        else:
+            open_count -= 1
+            cash += trade.position.exit_price * trade.position.size
+        assert open_count <= 2
+        assert cash >= -1e-6
+    summary = report.by_instrument()
+    assert sum(item["total_trades"] for item in summary.values()) == report.total_trades
+
+
+def test_empty_portfolio_and_instrument() -> None:
+    report = PortfolioBacktester(CONFIG).run({"BTC_USDC": random_walk(500), "EMPTY": CandleFrame.empty()})
+    assert set(report.instruments) <= {"BTC_USDC"}
+    assert PortfolioBacktester(CONFIG).run({}).final_cash == CONFIG.initial_cash
+
+
+def test_fetch_portfolio_fetches_every_instrument() -> None:
+    calls = []
+
+    def fetch(**kwargs):
+        calls.append(kwargs)
+        return random_walk(10, seed=len(kwargs["instrument_name"]))
+
+    frames = fetch_portfolio(["BTC_USDC", "ETH_USDC"], "1", fetch=fetch, use_store=False)
+
+    assert list(frames) == ["BTC_USDC", "ETH_USDC"]
+    assert sorted(call["instrument_name"] for call in calls) == ["BTC_USDC", "ETH_USDC"]
+    assert all(call["resolution"] == "1" and call["use_store"] is False for call in calls)
+
+
+def test_cli_portfolio_summary(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    monkeypatch.setattr(
+        cli,
+        "_fetch_portfolio_for_config",
+        lambda args, _config: {name: random_walk(1000, seed=index) for index, name in enumerate(args.instruments)},
+    )
+    export = tmp_path / "equity.json"
+    args = cli.create_portfolio_parser().parse_args(
+        ["BTC_USDC,ETH_USDC", "1", "--max-open-positions", "2", "--export-equity", str(export)]
+    )
+
+    summary = cli.portfolio_from_args(args)
+
+    assert summary["instruments"] == ["BTC_USDC", "ETH_USDC"]
+    assert summary["final_cash"] == pytest.approx(1000.0 + summary["cumulative_profit"])
+    assert export.read_text(encoding="utf-8").startswith("[")
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import numpy as np
+
+from backtester.backtest import Backtester
+from backtester.config import BacktestConfig
+from backtester.frame import CandleFrame
+from backtester.models import Position
+from backtester.positions import EXIT_SEARCH_CHUNK, PositionBook, first_level_hit
+
+
+def _position(entry: float, take_profit: float | None, stop_loss: float | None) -> Position:
+    return Position(entry_price=entry, entry_time=datetime(2024, 1, 1), take_profit=take_profit, stop_loss=stop_loss)
+
+
+def test_book_pops_only_triggered_positions_in_opening_order() -> None:
+    book = PositionBook()
+    first = _position(100.0, 110.0, 90.0)
+    second = _position(100.0, 105.0, 95.0)
+    third = _position(100.0, 120.0, 80.0)
+    untracked = _position(100.0, None, None)
+    for position in (first, second, third, untracked):
+        book.add(position)
+
+    assert book.pop_triggered(100.0) == []
+    assert [position for _, position in book.pop_triggered(111.0)] == [first, second]
+    assert [position for _, position in book.pop_triggered(79.0)] == [third]
+    assert len(book) == 1
+    # Stale heap entries of closed positions never trigger again.
+    assert book.pop_triggered(200.0) == []
+    assert [position for _, position in book.pop_all()] == [untracked]
+    assert len(book) == 0
+
+
+def test_book_compacts_stale_entries() -> None:
+    book = PositionBook()
+    for index in range(500):
+        book.add(_position(100.0, 100.0 + index, 50.0))
+    # Every position exits through its take-profit, leaving stale stop-loss entries behind.
+    assert len(book.pop_triggered(1_000.0)) == 500
+    book.add(_position(100.0, 101.0, 99.0))
+    book.pop_triggered(100.0)
+    assert len(book._stop_losses) <= 4 * len(book) + 64
+
+
+def test_engines_agree_with_hundreds_of_open_positions() -> None:
+    rng = np.random.default_rng(11)
+    closes = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.002, 20_000)))
+    frame = CandleFrame(np.arange(20_000) * 60_000, closes, closes, closes, closes, np.ones(20_000))
+    config = BacktestConfig(short_window=2, long_window=3, take_profit=0.05, stop_loss=0.05, max_open_positions=300)
+
+    expected = Backtester(config, engine="loop").run(frame)
+    streaming = Backtester(config)
+    peak = 0
+    for candle in frame:
+        streaming.step(candle)
+        peak = max(peak, len(streaming._book))
+
+    assert peak > 100
+    assert Backtester(config, engine="vectorized").run(frame) == expected
+    assert streaming.snapshot() == expected
+
+
+def test_first_level_hit_searches_past_the_first_chunk() -> None:
+    size = 10 * EXIT_SEARCH_CHUNK
+    highs = np.full(size, 101.0)
+    lows = np.full(size, 99.0)
+    highs[3 * EXIT_SEARCH_CHUNK] = 105.0
+    lows[5 * EXIT_SEARCH_CHUNK] = 95.0
+
+    assert first_level_hit(highs, lows, 1, 104.0, 96.0) == 3 * EXIT_SEARCH_CHUNK
+    assert first_level_hit(highs, lows, 3 * EXIT_SEARCH_CHUNK + 1, 104.0, 96.0) == 5 * EXIT_SEARCH_CHUNK
+    assert first_level_hit(highs, lows, 0, 110.0, 90.0) == size
+    # Closes passed as both bounds only compare the close.
+    assert first_level_hit(highs, highs, 0, 104.0, 100.0) == 3 * EXIT_SEARCH_CHUNK
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+import pytest
+
+from backtester.backtest import Backtester
+from backtester.config import BacktestConfig
+from backtester.frame import CandleFrame
+from backtester.models import Candle, TradeResult
+from backtester.replay import SimulatedFeed, replay
+
+
+def _frame(seed: int, size: int) -> CandleFrame:
+    rng = np.random.default_rng(seed)
+    closes = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, size)))
+    ticks = np.arange(size, dtype=np.int64) * 60_000 + 1_704_067_200_000
+    return CandleFrame(ticks, closes, closes, closes, closes, np.ones(size))
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("max_open_positions", [1, 4])
+def test_step_matches_run_at_every_prefix(seed: int, max_open_positions: int) -> None:
+    frame = _frame(seed, 400)
+    config = BacktestConfig(
+        short_window=3,
+        long_window=8,
+        take_profit=0.01,
+        stop_loss=0.01,
+        max_open_positions=max_open_positions,
+    )
+    streaming = Backtester(config)
+
+    for length in range(1, len(frame) + 1):
+        streaming.step(frame[length - 1])
+        if length % 37 == 0 or length == len(frame):
+            assert streaming.snapshot() == Backtester(config).run(frame[:length])
+
+
+def test_snapshot_does_not_close_live_positions() -> None:
+    frame = _frame(1, 300)
+    config = BacktestConfig(short_window=3, long_window=8, max_open_positions=3)
+    streaming = Backtester(config)
+    for candle in frame:
+        streaming.step(candle)
+        if streaming.open_positions:
+            break
+
+    open_before = streaming.open_positions
+    streaming.snapshot()
+    assert streaming.open_positions == open_before
+    assert all(position.is_open() for position in open_before)
+
+
+def test_replay_simulated_feed_matches_run() -> None:
+    frame = _frame(5, 500)
+    config = BacktestConfig(short_window=5, long_window=13, take_profit=0.02, stop_loss=0.01)
+    closed: List[TradeResult] = []
+
+    def on_step(_candle: Candle, trades: List[TradeResult]) -> None:
+        closed.extend(trades)
+
+    with SimulatedFeed(frame) as feed:
+        report = replay(feed, Backtester(config), on_step=on_step)
+
+    expected = Backtester(config).run(frame)
+    assert report == expected
+    # Only the forced exits on the final bar are missing from the live stream.
+    assert closed == expected.trades[: len(closed)]
+
+
+def test_replay_paces_candles_by_timestamp() -> None:
+    frame = _frame(2, 4)
+    now = [0.0]
+    sleeps: List[float] = []
+
+    def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    replay(
+        frame,
+        Backtester(BacktestConfig(short_window=1, long_window=2)),
+        speed=60.0,
+        clock=lambda: now[0],
+        sleep=fake_sleep,
+    )
+
+    # One-minute candles replayed at 60x arrive one second apart.
+    assert sleeps == pytest.approx([1.0, 1.0, 1.0])
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import threading
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+
+from backtester.fetcher import ChartDataFetcher
+from backtester.singleflight import SingleFlight
+from backtester.store import Columns
+
+MINUTE = 60_000
+
+
+def _minutes(start_ms: int, end_ms: int) -> Columns:
+    ticks = np.arange(start_ms, end_ms, MINUTE, dtype=np.int64)
+    values = ticks.astype(np.float64)
+    return {"ticks": ticks, "open": values, "high": values, "low": values, "close": values, "volume": values}
+
+
+class GatedDownload:
+    """Record requested ranges and hold each download until released."""
+
+    def __init__(self) -> None:
+        self.calls: List[Tuple[int, int]] = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, start_ms: int, end_ms: int) -> Columns:
+        self.calls.append((start_ms, end_ms))
+        self.started.set()
+        assert self.release.wait(5)
+        return _minutes(start_ms, end_ms)
+
+
+def _in_thread(target, *args) -> Tuple[threading.Thread, List[object]]:  # type: ignore[no-untyped-def]
+    results: List[object] = []
+    thread = threading.Thread(target=lambda: results.append(target(*args)))
+    thread.start()
+    return thread, results
+
+
+def _wait_for_coalesced(flight: SingleFlight, count: int) -> None:
+    for _ in range(500):
+        if flight.stats()["coalesced"] >= count:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("fetches did not join the download in flight")
+
+
+def test_concurrent_overlapping_fetches_share_downloads() -> None:
+    flight = SingleFlight()
+    download = GatedDownload()
+    key = ("BTC_USDC", "1")
+    first, first_result = _in_thread(flight.fetch, key, 0, 60 * MINUTE, download)
+    assert download.started.wait(5)
+    # Contained in the first range, then overlapping its end.
+    second, second_result = _in_thread(flight.fetch, key, 10 * MINUTE, 20 * MINUTE, download)
+    third, third_result = _in_thread(flight.fetch, key, 30 * MINUTE, 90 * MINUTE, download)
+    _wait_for_coalesced(flight, 2)
+    download.release.set()
+    for thread in (first, second, third):
+        thread.join(5)
+
+    assert sorted(download.calls) == [(0, 60 * MINUTE), (60 * MINUTE, 90 * MINUTE)]
+    assert flight.stats() == {"downloads": 2, "coalesced": 2}
+    assert flight.in_flight(key) == []
+    assert np.array_equal(first_result[0]["ticks"], _minutes(0, 60 * MINUTE)["ticks"])  # type: ignore[index]
+    assert np.array_equal(second_result[0]["ticks"], _minutes(10 * MINUTE, 20 * MINUTE)["ticks"])  # type: ignore[index]
+    assert np.array_equal(third_result[0]["close"], _minutes(30 * MINUTE, 90 * MINUTE)["close"])  # type: ignore[index]
+
+
+def test_results_exclude_the_end_tick_whether_or_not_fetches_coalesce() -> None:
+    def inclusive(start_ms: int, end_ms: int) -> Columns:
+        # Deribit's end_timestamp is inclusive.
+        return _minutes(start_ms, end_ms + 1)
+
+    solo = SingleFlight().fetch(("BTC_USDC", "1"), 0, 10 * MINUTE, inclusive)
+
+    flight = SingleFlight()
+    download = GatedDownload()
+    key = ("BTC_USDC", "1")
+    first, _ = _in_thread(flight.fetch, key, 0, 5 * MINUTE, download)
+    assert download.started.wait(5)
+    second, second_result = _in_thread(flight.fetch, key, 0, 10 * MINUTE, inclusive)
+    _wait_for_coalesced(flight, 1)
+    download.release.set()
+    for thread in (first, second):
+        thread.join(5)
+
+    assert solo["ticks"].tolist() == list(range(0, 10 * MINUTE, MINUTE))
+    assert second_result[0]["ticks"].tolist() == solo["ticks"].tolist()  # type: ignore[index]
+
+
+def test_failed_download_raises_in_waiting_callers() -> None:
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing(start_ms: int, end_ms: int) -> Columns:
+        started.set()
+        assert release.wait(5)
+        raise RuntimeError("upstream down")
+
+    key = ("BTC_USDC", "60")
+    leader = threading.Thread(target=lambda: pytest.raises(RuntimeError, flight.fetch, key, 0, MINUTE, failing))
+    leader.start()
+    assert started.wait(5)
+    errors: List[BaseException] = []
+
+    def follow() -> None:
+        try:
+            flight.fetch(key, 0, MINUTE, failing)
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    follower = threading.Thread(target=follow)
+    follower.start()
+    _wait_for_coalesced(flight, 1)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert [str(error) for error in errors] == ["upstream down"]
+    assert flight.in_flight(key) == []
+    # The next fetch starts a fresh download.
+    assert flight.fetch(key, 0, MINUTE, _minutes)["ticks"].tolist() == [0]
+
+
+def test_fetcher_limits_concurrent_requests() -> None:
+    fetcher = ChartDataFetcher(max_workers=4, max_concurrent_requests=2, window_candles=1)
+    lock = threading.Lock()
+    active = peak = 0
+
+    def send(params: object) -> Columns:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        threading.Event().wait(0.02)
+        with lock:
+            active -= 1
+        return _minutes(0, 0)
+
+    fetcher._send = send  # type: ignore[method-assign]
+    threads = [threading.Thread(target=fetcher.fetch, args=("BTC_USDC", "1", 0, 8 * MINUTE)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert peak == 2
+    with pytest.raises(ValueError):
+        ChartDataFetcher(max_concurrent_requests=0)
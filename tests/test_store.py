@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pytest
+
+from backtester import api, store as store_module
+from backtester.store import CandleStore, merge_ranges, subtract_ranges
+from backtester.timeutils import to_epoch_ms
+
+MINUTE = 60_000
+
+
+def _columns(ticks: List[int], close: float = 100.0) -> Dict[str, np.ndarray]:
+    size = len(ticks)
+    return {
+        "ticks": np.asarray(ticks, dtype=np.int64),
+        "open": np.full(size, close),
+        "high": np.full(size, close + 1),
+        "low": np.full(size, close - 1),
+        "close": np.full(size, close),
+        "volume": np.ones(size),
+    }
+
+
+def test_range_helpers() -> None:
+    assert merge_ranges([(5, 10), (0, 5), (20, 30), (25, 40)]) == [(0, 10), (20, 40)]
+    assert subtract_ranges(0, 50, [(10, 20), (30, 60)]) == [(0, 10), (20, 30)]
+    assert subtract_ranges(0, 10, []) == [(0, 10)]
+    assert subtract_ranges(0, 10, [(0, 10)]) == []
+
+
+def test_store_merges_and_overwrites_duplicate_ticks(tmp_path: Path) -> None:
+    store = CandleStore(tmp_path)
+    store.write("BTC_USDC", "1", _columns([0, MINUTE, 2 * MINUTE]), covered=(0, 3 * MINUTE))
+    store.write("BTC_USDC", "1", _columns([2 * MINUTE, 3 * MINUTE], close=200.0), covered=(2 * MINUTE, 4 * MINUTE))
+
+    assert store.coverage("BTC_USDC", "1") == [(0, 4 * MINUTE)]
+    assert store.missing_ranges("BTC_USDC", "1", 0, 6 * MINUTE) == [(4 * MINUTE, 6 * MINUTE)]
+
+    columns = store.read("BTC_USDC", "1", MINUTE, 4 * MINUTE)
+    assert columns["ticks"].tolist() == [MINUTE, 2 * MINUTE, 3 * MINUTE]
+    assert columns["close"].tolist() == [100.0, 200.0, 200.0]
+    # Column files are tagged with their generation and writer; the previous generation is removed.
+    names = sorted(path.name for path in (tmp_path / "BTC_USDC" / "1").iterdir())
+    assert [name for name in names if not name.endswith(".npy")] == [".lock", "index.json"]
+    assert sorted(name.split(".")[0] for name in names if name.endswith(".npy")) == sorted(
+        ["ticks", "open", "high", "low", "close", "volume"]
+    )
+    assert all(name.split(".")[1] == "2" for name in names if name.endswith(".npy"))
+
+
+def test_writes_only_rewrite_the_segments_they_touch(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(store_module, "SEGMENT_ROWS", 100)
+    store = CandleStore(tmp_path)
+    for batch in range(5):
+        ticks = [(batch * 60 + minute) * MINUTE for minute in range(60)]
+        store.write("BTC_USDC", "1", _columns(ticks), covered=(ticks[0], ticks[-1] + MINUTE))
+    directory = tmp_path / "BTC_USDC" / "1"
+    first = json.loads((directory / "index.json").read_text())["segments"][0]
+    first_files = sorted(directory.glob(f"*.{first['file']}.npy"))
+    written = [path.stat().st_mtime_ns for path in first_files]
+
+    store.write("BTC_USDC", "1", _columns([300 * MINUTE]), covered=(300 * MINUTE, 301 * MINUTE))
+    store.write("BTC_USDC", "1", _columns([200 * MINUTE], close=200.0))
+
+    segments = json.loads((directory / "index.json").read_text())["segments"]
+    assert segments[0] == first
+    assert [path.stat().st_mtime_ns for path in first_files] == written
+    assert all(segment["rows"] <= 100 for segment in segments[:-1])
+    assert len(list(directory.glob("*.npy"))) == 6 * len({segment["file"] for segment in segments})
+    columns = store.read("BTC_USDC", "1", 0, 400 * MINUTE)
+    assert columns["ticks"].tolist() == list(range(0, 301 * MINUTE, MINUTE))
+    assert columns["close"][200] == 200.0
+    assert store.read("BTC_USDC", "1", 150 * MINUTE, 250 * MINUTE)["ticks"].tolist() == list(
+        range(150 * MINUTE, 250 * MINUTE, MINUTE)
+    )
+
+
+def test_store_reads_and_replaces_single_generation_datasets(tmp_path: Path) -> None:
+    directory = tmp_path / "BTC_USDC" / "1"
+    directory.mkdir(parents=True)
+    for name, values in _columns([0, MINUTE]).items():
+        np.save(directory / f"{name}.3.99-1.npy", values)
+    index = {"generation": 3, "writer": "99-1", "coverage": [[0, 2 * MINUTE]]}
+    (directory / "index.json").write_text(json.dumps(index))
+    store = CandleStore(tmp_path)
+
+    assert store.read("BTC_USDC", "1", 0, 2 * MINUTE)["ticks"].tolist() == [0, MINUTE]
+    store.write("BTC_USDC", "1", _columns([MINUTE, 2 * MINUTE], close=200.0), covered=(2 * MINUTE, 3 * MINUTE))
+
+    assert store.read("BTC_USDC", "1", 0, 3 * MINUTE)["close"].tolist() == [100.0, 200.0, 200.0]
+    assert not list(directory.glob("*.3.99-1.npy"))
+
+
+def _write_batches(root: str, writer: int, batches: int) -> None:
+    store = CandleStore(root)
+    for batch in range(batches):
+        start = (writer * batches + batch) * 10 * MINUTE
+        ticks = list(range(start, start + 10 * MINUTE, MINUTE))
+        store.write("BTC_USDC", "1", _columns(ticks), covered=(start, start + 10 * MINUTE))
+        store.read("BTC_USDC", "1", 0, start)
+
+
+def test_concurrent_writer_processes_keep_coverage_and_candles_consistent(tmp_path: Path) -> None:
+    context = multiprocessing.get_context("fork")
+    writers = [context.Process(target=_write_batches, args=(str(tmp_path), writer, 15)) for writer in range(4)]
+    for process in writers:
+        process.start()
+    for process in writers:
+        process.join(60)
+    assert [process.exitcode for process in writers] == [0, 0, 0, 0]
+
+    store = CandleStore(tmp_path)
+    assert store.coverage("BTC_USDC", "1") == [(0, 600 * MINUTE)]
+    assert store.read("BTC_USDC", "1", 0, 600 * MINUTE)["ticks"].tolist() == list(range(0, 600 * MINUTE, MINUTE))
+    # Only the column files of the current segments are left behind.
+    assert len(list((tmp_path / "BTC_USDC" / "1").glob("*.npy"))) == 6
+
+
+def test_fetch_candles_only_downloads_missing_ranges(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: List[Tuple[int, int]] = []
+
+    def fake_download(instrument_name: str, resolution: str, start_ms: int, end_ms: int) -> Dict[str, Any]:
+        calls.append((start_ms, end_ms))
+        return _columns(list(range(start_ms, end_ms, MINUTE)))
+
+    monkeypatch.setattr(api, "_download", fake_download)
+    store = CandleStore(tmp_path)
+
+    first = api.fetch_candles("BTC_USDC", "1", datetime(2024, 1, 1, 0, 0), datetime(2024, 1, 1, 0, 10), store=store)
+    second = api.fetch_candles("BTC_USDC", "1", datetime(2024, 1, 1, 0, 5), datetime(2024, 1, 1, 0, 20), store=store)
+    third = api.fetch_candles("BTC_USDC", "1", datetime(2024, 1, 1, 0, 0), datetime(2024, 1, 1, 0, 20), store=store)
+
+    base = to_epoch_ms(datetime(2024, 1, 1))
+    assert calls == [(base, base + 10 * MINUTE), (base + 10 * MINUTE, base + 20 * MINUTE)]
+    assert len(first) == 10
+    assert len(second) == 15
+    assert len(third) == 20
+    assert third[0].timestamp == datetime(2024, 1, 1, 0, 0)
+    assert third[-1].timestamp == datetime(2024, 1, 1, 0, 19)
+
+
+def test_coarser_resolutions_are_derived_from_stored_minutes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    base = to_epoch_ms(datetime(2024, 1, 1))
+    ticks = [base + minute * MINUTE for minute in range(3 * 60)]
+    minutes = _columns(ticks)
+    minutes["close"] = np.arange(len(ticks), dtype=np.float64)
+    minutes["high"] = minutes["close"] + 0.5
+    store = CandleStore(tmp_path)
+    store.write("BTC_USDC", "1", minutes, covered=(base, base + 3 * 60 * MINUTE))
+
+    downloads: List[Tuple[str, Any, Any]] = []
+
+    def fake_download(instrument_name: str, resolution: str, start_ms: Any, end_ms: Any) -> Dict[str, np.ndarray]:
+        downloads.append((resolution, start_ms, end_ms))
+        return _columns([start_ms])
+
+    monkeypatch.setattr(api, "_download", fake_download)
+
+    hourly = api.fetch_candles("BTC_USDC", "60", datetime(2024, 1, 1, 0, 30), datetime(2024, 1, 1, 2, 30), store=store)
+    assert downloads == []
+    assert hourly.ticks.tolist() == [base + 60 * MINUTE, base + 120 * MINUTE]
+    assert hourly.close.tolist() == [119.0, 179.0]
+    assert hourly.high.tolist() == [119.5, 179.5]
+    assert hourly.volume.tolist() == [60.0, 60.0]
+    pages = list(api.iter_candle_pages("BTC_USDC", "60", datetime(2024, 1, 1), datetime(2024, 1, 1, 3), store=store))
+    assert [len(page) for page in pages] == [3]
+    assert downloads == []
+
+    # The last hour is not fully covered by stored minutes, so it is downloaded instead.
+    api.fetch_candles("BTC_USDC", "60", datetime(2024, 1, 1), datetime(2024, 1, 1, 3, 1), store=store)
+    assert downloads == [("60", base, base + 181 * MINUTE)]
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import gzip
+import http.client
+import io
+import json
+import threading
+import zlib
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer
+from typing import Any, Iterator
+
+import pytest
+
+from backtester import http as api_http
+from backtester.models import BacktestReport, Candle, Position, TradeResult
+from backtester.streaming import ChunkedWriter, iter_batches, iter_json_document, iter_ndjson, negotiate_encoding
+
+
+def _candles(count: int) -> list[Candle]:
+    base = datetime(2024, 1, 1)
+    return [
+        Candle(timestamp=base + timedelta(minutes=i), open=i, high=i + 1, low=i - 1, close=i + 0.5, volume=2.0)
+        for i in range(count)
+    ]
+
+
+def _dechunk(raw: bytes) -> bytes:
+    body = b""
+    while True:
+        size_line, raw = raw.split(b"\r\n", 1)
+        size = int(size_line, 16)
+        if size == 0:
+            return body
+        body += raw[:size]
+        raw = raw[size + 2 :]
+
+
+def test_incremental_documents_match_json_dumps() -> None:
+    batches = list(iter_batches(5, lambda start, stop: [{"i": i} for i in range(start, stop)], batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+
+    document = b"".join(iter_json_document({"total": 5}, "items", batches))
+    assert json.loads(document) == {"total": 5, "items": [{"i": i} for i in range(5)]}
+    assert json.loads(b"".join(iter_json_document({}, "items", []))) == {"items": []}
+
+    lines = b"".join(iter_ndjson({"total": 5}, batches)).decode().splitlines()
+    assert [json.loads(line) for line in lines] == [{"total": 5}] + [{"i": i} for i in range(5)]
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        (None, None),
+        ("gzip, deflate, br", "gzip"),
+        ("deflate", "deflate"),
+        ("gzip;q=0, deflate;q=0.5", "deflate"),
+        ("*", "gzip"),
+        ("identity", None),
+    ],
+)
+def test_negotiate_encoding(header: str | None, expected: str | None) -> None:
+    assert negotiate_encoding(header) == expected
+
+
+@pytest.mark.parametrize("encoding", [None, "gzip", "deflate"])
+def test_chunked_writer_round_trips(encoding: str | None) -> None:
+    payload = [json.dumps({"row": i}).encode() for i in range(5000)]
+    stream = io.BytesIO()
+    ChunkedWriter(stream, encoding=encoding, buffer_size=1024).write_all(payload)
+
+    body = _dechunk(stream.getvalue())
+    if encoding == "gzip":
+        body = gzip.decompress(body)
+    elif encoding == "deflate":
+        body = zlib.decompress(body)
+    assert body == b"".join(payload)
+
+
+def test_stream_report_matches_serialized_report() -> None:
+    candle = _candles(1)[0]
+    trades = [
+        TradeResult(position=Position(entry_price=float(i), entry_time=candle.timestamp), profit=float(i))
+        for i in range(3)
+    ]
+    report = BacktestReport(trades=trades, final_cash=1003.0, wins=2, losses=1)
+
+    assert json.loads(b"".join(api_http.stream_report(report))) == {"report": api_http._serialize_report(report)}
+    lines = [json.loads(line) for line in b"".join(api_http.stream_report(report, ndjson=True)).splitlines()]
+    assert lines[0] == {"finalCash": 1003.0, "wins": 2, "losses": 1}
+    assert lines[1:] == [api_http._serialize_trade(trade) for trade in trades]
+
+
+@pytest.fixture
+def server(monkeypatch: pytest.MonkeyPatch) -> Iterator[tuple[str, int]]:
+    candles = _candles(5000)
+
+    def fake_fetch(**_kwargs: Any) -> list[Candle]:
+        return candles
+
+    monkeypatch.setattr(api_http, "fetch_candles", fake_fetch)
+    monkeypatch.setattr(api_http, "_CANDLE_CACHE", api_http.ResultCache(max_entries=4, ttl=60.0))
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), api_http.BacktesterRequestHandler)
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    try:
+        yield httpd.server_address[:2]
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_candles_endpoint_streams_compressed_ndjson(server: tuple[str, int]) -> None:
+    connection = http.client.HTTPConnection(*server, timeout=5)
+    path = "/api/candles?instrument_name=BTC_USDC&resolution=1"
+
+    connection.request("GET", path, headers={"Accept-Encoding": "gzip", "Accept": "application/x-ndjson"})
+    response = connection.getresponse()
+    assert response.status == 200
+    assert response.getheader("Transfer-Encoding") == "chunked"
+    assert response.getheader("Content-Encoding") == "gzip"
+    rows = [json.loads(line) for line in gzip.decompress(response.read()).splitlines()]
+    assert len(rows) == 5000
+    assert rows[0]["timestamp"] == "2024-01-01T00:00:00"
+    etag = response.getheader("ETag")
+
+    # The connection is kept alive, and the plain JSON form is still available.
+    connection.request("GET", path)
+    response = connection.getresponse()
+    assert response.getheader("Content-Encoding") is None
+    assert response.getheader("ETag") != etag
+    assert len(json.loads(response.read())["candles"]) == 5000
+
+    connection.request(
+        "GET", path, headers={"If-None-Match": etag, "Accept-Encoding": "gzip", "Accept": "application/x-ndjson"}
+    )
+    response = connection.getresponse()
+    assert response.status == 304
+    assert response.read() == b""
+    connection.close()
+
+
+def test_each_representation_gets_its_own_etag(server: tuple[str, int]) -> None:
+    connection = http.client.HTTPConnection(*server, timeout=5)
+    path = "/api/candles?instrument_name=BTC_USDC&resolution=1"
+    variants = [
+        {},
+        {"Accept-Encoding": "gzip"},
+        {"Accept-Encoding": "deflate"},
+        {"Accept": "application/x-ndjson"},
+        {"Accept": "application/x-ndjson", "Accept-Encoding": "gzip"},
+    ]
+    etags = []
+    for headers in variants:
+        connection.request("GET", path, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        etags.append(response.getheader("ETag"))
+
+    assert len(set(etags)) == len(variants)
+    # A validator for one representation does not match another.
+    connection.request("GET", path, headers={"If-None-Match": etags[1]})
+    response = connection.getresponse()
+    assert response.status == 200
+    response.read()
+    connection.close()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import numpy as np
+
+from backtester.backtest import Backtester
+from backtester.config import BacktestConfig
+from backtester.frame import CandleFrame
+from backtester.sweep import Leaderboard, SharedCandles, SweepResult, attach_frame, expand_grid, run_sweep
+
+
+def _frame(size: int = 3_000) -> CandleFrame:
+    rng = np.random.default_rng(7)
+    closes = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, size)))
+    ticks = np.arange(size, dtype=np.int64) * 60_000
+    return CandleFrame(ticks, closes, closes, closes, closes, np.ones(size))
+
+
+GRID = {
+    "short_window": [3, 5, 9],
+    "long_window": [5, 21],
+    "take_profit": [0.01, 0.03],
+    "max_open_positions": [1, 3],
+}
+
+
+def test_expand_grid_skips_invalid_combinations() -> None:
+    combinations = expand_grid(BacktestConfig(), GRID)
+
+    # (5, 5) and (9, 5) are rejected because short_window must be below long_window.
+    assert len(combinations) == 4 * 2 * 2
+    assert all(params["short_window"] < params["long_window"] for params in combinations)
+
+
+def test_shared_candles_round_trip() -> None:
+    frame = _frame(10)
+    with SharedCandles(frame) as shared:
+        shm, attached = attach_frame(shared.descriptor)
+        try:
+            assert attached.ticks.tolist() == frame.ticks.tolist()
+            assert attached.close.tolist() == frame.close.tolist()
+            assert not attached.close.flags.writeable
+        finally:
+            del attached
+            shm.close()
+
+
+def test_parallel_sweep_matches_serial_backtests() -> None:
+    frame = _frame()
+    base = BacktestConfig(initial_cash=1000.0)
+
+    parallel = list(run_sweep(frame, base, GRID, processes=2))
+    serial = list(run_sweep(frame, base, GRID, processes=1))
+
+    def key(result: SweepResult) -> tuple:
+        return tuple(sorted(result.parameters.items()))
+
+    assert sorted(parallel, key=key) == sorted(serial, key=key)
+
+    sample = serial[0]
+    config = BacktestConfig(initial_cash=1000.0, **sample.parameters)
+    report = Backtester(config).run(frame)
+    assert sample.final_cash == report.final_cash
+    assert sample.total_trades == report.total_trades
+
+
+def test_leaderboard_ranks_best_first() -> None:
+    leaderboard = Leaderboard(key="final_cash")
+
+    def result(cash: float) -> SweepResult:
+        return SweepResult({}, cash, cash - 1000, 0.5, 1, 1, 0)
+
+    assert leaderboard.add(result(1010.0)) == 1
+    assert leaderboard.add(result(1050.0)) == 1
+    assert leaderboard.add(result(990.0)) == 3
+    assert [item.final_cash for item in leaderboard.top(2)] == [1050.0, 1010.0]
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from backtester.synthetic import GENERATORS, random_walk, regime_switching
+
+
+@pytest.mark.parametrize("name", sorted(GENERATORS))
+def test_generators_are_deterministic_and_consistent(name: str) -> None:
+    frame = GENERATORS[name](5_000, seed=7)
+    again = GENERATORS[name](5_000, seed=7)
+    other = GENERATORS[name](5_000, seed=8)
+
+    assert len(frame) == 5_000
+    for column, values in frame.columns().items():
+        np.testing.assert_array_equal(values, getattr(again, column))
+    assert not np.array_equal(frame.close, other.close)
+
+    assert np.all(np.diff(frame.ticks) == 60_000)
+    assert np.all(frame.high >= np.maximum(frame.open, frame.close))
+    assert np.all(frame.low <= np.minimum(frame.open, frame.close))
+    assert np.all(frame.low > 0)
+    assert np.all(frame.volume > 0)
+    np.testing.assert_array_equal(frame.open[1:], frame.close[:-1])
+
+
+def test_regime_switching_changes_volatility() -> None:
+    frame = regime_switching(50_000, seed=1, regimes=((0.0, 0.0001), (0.0, 0.01)), mean_duration=500)
+    returns = np.abs(np.diff(np.log(frame.close)))
+    rolling = np.convolve(returns, np.ones(200) / 200, mode="valid")
+    # Calm and turbulent stretches differ by roughly the ratio of their volatilities.
+    assert rolling.max() / rolling.min() > 20
+
+
+def test_generators_validate_arguments() -> None:
+    assert len(random_walk(0)) == 0
+    with pytest.raises(ValueError):
+        random_walk(-1)
+    with pytest.raises(ValueError):
+        regime_switching(10, regimes=())
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import threading
+from http import HTTPStatus
+
+import pytest
+
+from backtester import cli
+from backtester import http as api_http
+from backtester.config import BacktestConfig
+from backtester.indicators import default_indicator_cache
+from backtester.sweep import run_sweep
+from backtester.synthetic import regime_switching
+from backtester.walkforward import run_walk_forward, split_folds
+
+GRID = {"short_window": [3, 5], "long_window": [13, 21], "take_profit": [0.005, 0.01]}
+
+
+def test_split_folds_rolls_equal_windows_over_the_range() -> None:
+    folds = split_folds(1000, 4, in_sample_ratio=0.6)
+
+    assert [(fold.out_of_sample_start, fold.out_of_sample_stop) for fold in folds] == [
+        (276, 457),
+        (457, 638),
+        (638, 819),
+        (819, 1000),
+    ]
+    # 276 in-sample bars per 181 out-of-sample ones is the requested 60/40 split.
+    assert {fold.in_sample_stop - fold.in_sample_start for fold in folds} == {276}
+    assert all(fold.in_sample_stop == fold.out_of_sample_start for fold in folds)
+
+    anchored = split_folds(1000, 4, in_sample_ratio=0.6, anchored=True)
+    assert {fold.in_sample_start for fold in anchored} == {0}
+    assert [fold.out_of_sample_start for fold in anchored] == [fold.out_of_sample_start for fold in folds]
+
+    with pytest.raises(ValueError):
+        split_folds(5, 10)
+    with pytest.raises(ValueError):
+        split_folds(1000, 4, in_sample_ratio=1.0)
+
+
+def test_walk_forward_picks_in_sample_winner_and_matches_in_parallel() -> None:
+    frame = regime_switching(6000, seed=3, mean_duration=500)
+    base = BacktestConfig(initial_cash=1000.0, max_open_positions=2, stop_loss=0.01)
+
+    serial = run_walk_forward(frame, base, GRID, folds=3, processes=1)
+    parallel = run_walk_forward(frame, base, GRID, folds=3, processes=2)
+
+    assert serial.to_dict() == parallel.to_dict()
+    assert len(serial.folds) == 3
+    first = serial.folds[0]
+    in_sample = frame[0 : first.in_sample_bars]
+    best = max(run_sweep(in_sample, base, GRID, processes=1), key=lambda result: result.final_cash)
+    assert first.in_sample.final_cash == best.final_cash
+    assert first.out_of_sample.parameters == first.in_sample.parameters
+    assert first.out_of_sample_start == int(frame.ticks[first.in_sample_bars])
+    assert serial.cumulative_profit == pytest.approx(sum(f.out_of_sample.cumulative_profit for f in serial.folds))
+    assert serial.aggregate()["folds"] == 3
+
+
+def test_parallel_folds_ignore_locks_held_by_other_threads() -> None:
+    frame = regime_switching(3000, seed=2, mean_duration=300)
+    held, release = threading.Event(), threading.Event()
+
+    def hold_indicator_lock() -> None:
+        with default_indicator_cache()._lock:
+            held.set()
+            release.wait(timeout=30)
+
+    holder = threading.Thread(target=hold_indicator_lock)
+    holder.start()
+    held.wait()
+    try:
+        # Forked fold workers would inherit the lock in its held state and never acquire it.
+        report = run_walk_forward(frame, BacktestConfig(initial_cash=1000.0), GRID, folds=2, processes=2)
+    finally:
+        release.set()
+        holder.join()
+    assert len(report.folds) == 2
+
+
+def test_walk_forward_response_serializes_folds() -> None:
+    frame = regime_switching(3000, seed=1, mean_duration=300)
+    payload = {
+        "config": {"initialCash": 1000, "stopLoss": 0.01},
+        "grid": {"shortWindow": [3, 5], "longWindow": 13, "takeProfit": [0.005, 0.01]},
+        "folds": 2,
+        "rankBy": "cumulativeProfit",
+        "timestampFormat": "epoch",
+        "candles": frame,
+    }
+
+    status, body = api_http.walk_forward_response(payload, processes=1)
+
+    assert status == HTTPStatus.OK
+    result = body["walkForward"]
+    assert result["rankBy"] == "cumulativeProfit"
+    assert len(result["folds"]) == 2
+    fold = result["folds"][1]
+    assert set(fold["inSample"]["parameters"]) == {"shortWindow", "longWindow", "takeProfit"}
+    assert fold["outOfSample"]["end"] == int(frame.ticks[-1])
+    assert result["aggregate"]["totalTrades"] == sum(item["outOfSample"]["totalTrades"] for item in result["folds"])
+
+    status, body = api_http.walk_forward_response({**payload, "grid": {"engine": ["loop"]}}, processes=1)
+    assert status == HTTPStatus.BAD_REQUEST
+    status, body = api_http.walk_forward_response({**payload, "folds": 5000}, processes=1)
+    assert status == HTTPStatus.UNPROCESSABLE_ENTITY
+    status, body = api_http.walk_forward_response({**payload, "rankBy": ["finalCash"]}, processes=1)
+    assert status == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.parametrize(
+    ("grid", "field"),
+    [
+        ({"shortWindow": ["a"]}, "shortWindow"),
+        ({"shortWindow": [5.5]}, "shortWindow"),
+        ({"longWindow": [None]}, "longWindow"),
+        ({"maxOpenPositions": [0]}, "maxOpenPositions"),
+        ({"maxOpenPositions": True}, "maxOpenPositions"),
+        ({"takeProfit": ["x"]}, "takeProfit"),
+        ({"stopLoss": [float("nan")]}, "stopLoss"),
+    ],
+)
+def test_walk_forward_response_rejects_invalid_grid_values(grid: dict, field: str) -> None:
+    payload = {"config": {"shortWindow": 3, "longWindow": 8}, "grid": grid, "candles": regime_switching(600, seed=1)}
+
+    status, body = api_http.walk_forward_response(payload, processes=1)
+
+    assert status == HTTPStatus.BAD_REQUEST
+    assert f"grid.{field}" in body["detail"]
+
+
+def test_walk_forward_response_rejects_requests_beyond_the_concurrency_cap() -> None:
+    frame = regime_switching(600, seed=1)
+    payload = {
+        "config": {"shortWindow": 3, "longWindow": 8},
+        "grid": {"shortWindow": [3]},
+        "folds": 2,
+        "candles": frame,
+    }
+    slots = [api_http._WALK_FORWARD_SLOTS.acquire(blocking=False) for _ in range(api_http.MAX_CONCURRENT_WALK_FORWARDS)]
+    assert all(slots)
+    try:
+        status, body = api_http.walk_forward_response(payload, processes=1)
+        assert status == HTTPStatus.TOO_MANY_REQUESTS
+    finally:
+        for _ in slots:
+            api_http._WALK_FORWARD_SLOTS.release()
+    assert api_http.walk_forward_response(payload, processes=1)[0] == HTTPStatus.OK
+
+
+def test_cli_walkforward_reports_folds(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cli, "_fetch_for_config", lambda _args, _config: regime_switching(2000, seed=2))
+    args = cli.create_walkforward_parser().parse_args(
+        ["BTC_USDC", "1", "--short-window", "3,5", "--long-window", "13", "--folds", "2", "--processes", "1"]
+    )
+
+    result = cli.walkforward_from_args(args)
+
+    assert len(result["folds"]) == 2
+    assert result["aggregate"]["folds"] == 2